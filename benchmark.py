@@ -0,0 +1,251 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+
+"""
+    simple benchmark
+    ~~~~~~~~~~~~~~~~
+
+    Compare the direct converters with the html round trip, e.g.:
+        creole2textile(markup) <-> html2textile(creole2html(markup))
+    the per call overhead of creole2html() and a reused Converter
+    on small snippets, the available html tokenizer backends and
+    the html entity handling.
+
+    With --output-size the markup is repeated up to the given MB and
+    the returned string is compared with out=file, e.g.:
+        ./benchmark.py --output-size 100
+
+    With --input-size the same for reading a file with \\r\\n line endings:
+    codecs.open().read() <-> read_text_file(), e.g.:
+        ./benchmark.py --input-size 100
+
+    usage:
+        ./benchmark.py [--number N] [--repeat N] [--output-size MB]
+                       [--input-size MB] [creole file]
+
+    Without a file, the README.creole would be used.
+
+    :copyleft: 2015 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import argparse
+import codecs
+import os
+import tempfile
+import time
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None # python 2
+
+from creole import creole2html, creole2rest, creole2textile, html2creole, \
+    html2rest, html2textile, parse_html, Converter
+from creole.emitter.html2creole_emitter import CreoleEmitter
+from creole.shared.html_parser import DEFAULT_TOKENIZER, TOKENIZERS
+from creole.shared.input_reader import read_text_file
+
+
+README = os.path.join(os.path.dirname(os.path.abspath(__file__)), "README.creole")
+
+SNIPPET = "This is **creole //markup//** with a [[/url/|link]]!"
+SNIPPET_CALLS = 100 # snippet conversions per benchmark call
+
+ENTITY_HTML = "<p>Caf&eacute; &amp; cr&egrave;me &ndash; a&nbsp;b &lt;tag&gt; &#169; &#x2014;</p>"
+ENTITY_COPIES = 500
+
+
+def get_benchmarks(markup):
+    """
+    returns a list of (group name, [(name, function), ...]) tuples.
+    All functions of one group should return the same result.
+    """
+    return [
+        ("rest", [
+            ("html2rest(creole2html())", lambda: html2rest(creole2html(markup))),
+            ("creole2rest()", lambda: creole2rest(markup)),
+        ]),
+        ("textile", [
+            ("html2textile(creole2html())", lambda: html2textile(creole2html(markup))),
+            ("creole2textile()", lambda: creole2textile(markup)),
+        ]),
+    ] + get_snippet_benchmarks(SNIPPET) + get_tokenizer_benchmarks(markup) \
+    + get_entity_benchmarks(ENTITY_HTML)
+
+
+def get_snippet_benchmarks(snippet):
+    """ The per call overhead: module functions <-> a reused Converter """
+    converter = Converter()
+    calls = range(SNIPPET_CALLS)
+    return [
+        ("%i x creole2html snippet" % SNIPPET_CALLS, [
+            ("creole2html()", lambda: tuple(creole2html(snippet) for _ in calls)),
+            ("Converter.render()", lambda: tuple(converter.render(snippet) for _ in calls)),
+        ]),
+    ]
+
+
+def get_tokenizer_benchmarks(markup):
+    """
+    html2creole() with the html tokenizer backends, the default first.
+    Note: lxml resolves all entities, so the results may be not the same.
+    """
+    html = creole2html(markup)
+    names = [DEFAULT_TOKENIZER] + sorted(set(TOKENIZERS) - set([DEFAULT_TOKENIZER]))
+    return [
+        ("html tokenizer", [
+            ("%s tokenizer" % name, lambda converter=Converter(html_tokenizer=name): converter.html2creole(html))
+            for name in names
+        ]),
+    ]
+
+
+def get_entity_benchmarks(html):
+    """ html2creole with entity nodes <-> with the replaced entities """
+    html = "\n".join([html] * ENTITY_COPIES)
+    return [
+        ("%i x entity html2creole" % ENTITY_COPIES, [
+            ("keep_entities=True", lambda: CreoleEmitter(parse_html(html, keep_entities=True)).emit()),
+            ("keep_entities=False", lambda: CreoleEmitter(parse_html(html)).emit()),
+        ]),
+    ]
+
+
+def run_benchmarks(markup, number, repeat):
+    for group_name, benchmarks in get_benchmarks(markup):
+        print("\n*** %s:" % group_name)
+        results = [func() for name, func in benchmarks]
+        if len(set(results)) != 1:
+            print("(Note: The results are not the same!)")
+
+        first_time = None
+        for name, func in benchmarks:
+            duration = min(timeit.repeat(func, number=number, repeat=repeat))
+            if first_time is None:
+                first_time = duration
+            print("%30s: %.4fsec. (%.1f%%)" % (
+                name, duration, duration / first_time * 100
+            ))
+
+
+def measure(func):
+    """
+    returns the duration and the peak memory (None in python 2) of func()
+    The memory is measured in a second call, because tracemalloc slows
+    down all allocations.
+    """
+    start_time = time.time()
+    func()
+    duration = time.time() - start_time
+    if tracemalloc is None:
+        return duration, None
+
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return duration, peak
+
+
+def get_big_markup(markup, size):
+    """ returns the markup repeated up to size MB """
+    copies = max(int(size * 1024 * 1024 / len(markup)), 1)
+    return "\n\n".join([markup] * copies)
+
+
+def print_measure(name, duration, peak):
+    if peak is None:
+        print("%30s: %.2fsec." % (name, duration))
+    else:
+        print("%30s: %.2fsec. peak memory: %.1f MB" % (
+            name, duration, peak / 1024 / 1024
+        ))
+
+
+def run_output_benchmarks(markup, size):
+    """ returned string <-> out=file with a document of size MB """
+    markup = get_big_markup(markup, size)
+    html = creole2html(markup)
+
+    print("\n*** Write %.1f MB markup into a file:" % (len(markup) / 1024 / 1024))
+    for func, text in ((creole2html, markup), (html2creole, html)):
+        for name, convert in (
+            ("%s() + write()" % func.__name__, lambda out: out.write(func(text).encode("utf-8"))),
+            ("%s(out=file)" % func.__name__, lambda out: func(text, out=out, encoding="utf-8")),
+        ):
+            with open(os.devnull, "wb") as out:
+                duration, peak = measure(lambda: convert(out))
+            print_measure(name, duration, peak)
+
+
+def read_with_codecs(filename):
+    """ The old way: CreoleCLI and CreoleParser.parse() """
+    with codecs.open(filename, "r", encoding="utf-8") as f:
+        text = f.read()
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def run_input_benchmarks(markup, size):
+    """ codecs.open().read() <-> read_text_file() with a file of size MB """
+    markup = get_big_markup(markup, size)
+    for newline in ("\n", "\r\n"):
+        f = tempfile.NamedTemporaryFile(suffix=".creole", delete=False)
+        try:
+            f.write(markup.replace("\n", newline).encode("utf-8"))
+            f.close()
+
+            print("\n*** Read a %.1f MB file with %r line endings:" % (
+                os.path.getsize(f.name) / 1024 / 1024, newline
+            ))
+            for name, func in (
+                ("codecs.open().read()", read_with_codecs),
+                ("read_text_file()", read_text_file),
+            ):
+                duration, peak = measure(lambda: func(f.name))
+                print_measure(name, duration, peak)
+        finally:
+            os.remove(f.name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="python-creole benchmark")
+    parser.add_argument("sourcefile", nargs="?", default=README,
+        help="creole markup file (default: README.creole)"
+    )
+    parser.add_argument("--number", type=int, default=10,
+        help="calls per measurement (default: 10)"
+    )
+    parser.add_argument("--repeat", type=int, default=3,
+        help="number of measurements, the best one is used (default: 3)"
+    )
+    parser.add_argument("--output-size", type=float, metavar="MB",
+        help="compare the returned string with out=file on a MB big document"
+    )
+    parser.add_argument("--input-size", type=float, metavar="MB",
+        help="compare codecs.open() with read_text_file() on a MB big file"
+    )
+    args = parser.parse_args()
+
+    with codecs.open(args.sourcefile, "r", encoding="utf-8") as f:
+        markup = f.read()
+
+    if args.output_size or args.input_size:
+        if args.output_size:
+            run_output_benchmarks(markup, args.output_size)
+        if args.input_size:
+            run_input_benchmarks(markup, args.input_size)
+        return
+
+    print("Use %r (%i chars), best of %i x %i calls" % (
+        args.sourcefile, len(markup), args.repeat, args.number
+    ))
+    run_benchmarks(markup, args.number, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
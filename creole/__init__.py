@@ -22,13 +22,21 @@ from __future__ import division, absolute_import, print_function, unicode_litera
 
 import warnings
 
+from creole.emitter.creol2creole_emitter import CreoleFormatter, split_blocks
 from creole.emitter.creol2html_emitter import HtmlEmitter
+from creole.emitter.creol2tree_emitter import HtmlTreeEmitter
+from creole.emitter.creol2etree_emitter import EtreeEmitter
 from creole.parser.creol2html_parser import CreoleParser
+from creole.parser.creol2text_parser import CreoleTextParser
+from creole.parser.creol_scanner import CreoleScanner
 from creole.emitter.html2creole_emitter import CreoleEmitter
 from creole.emitter.html2rest_emitter import ReStructuredTextEmitter
 from creole.emitter.html2textile_emitter import TextileEmitter
+from creole.parser.etree_parser import EtreeParser
 from creole.parser.html_parser import HtmlParser
 from creole.py3compat import TEXT_TYPE
+from creole.shared.input_reader import read_text_file
+from creole.converter import Converter
 
 
 __version__ = "1.3.1"
@@ -41,13 +49,34 @@ API_STRING = __api__ # remove in future
 def creole2html(markup_string, debug=False,
         parser_kwargs=None, emitter_kwargs=None,
         block_rules=None, blog_line_breaks=True,
-        macros=None, verbose=None, stderr=None,
+        macros=None, verbose=None, stderr=None, link_resolver=None,
+        macro_cache=None, macro_workers=None, macro_timeout=None,
+        macro_time_limits=None, render_deadline=None, macro_timing=None,
+        compact=False, out=None, encoding=None,
     ):
     """
     convert creole markup into html code
 
     >>> creole2html('This is **creole //markup//**!')
     '<p>This is <strong>creole <i>markup</i></strong>!</p>'
+
+    link_resolver would be called once with the set of all link targets,
+    see: HtmlEmitter
+
+    macro_cache is used for the results of @cacheable macros, default is
+    the shared creole.shared.macro_cache.macro_cache
+
+    With macro_workers the macros are called concurrently in threads and
+    macros running longer than macro_timeout seconds are replaced with
+    a error. macro_time_limits {macro name: seconds} and render_deadline
+    limit the run time of single macros and of all macros. The run time of
+    every macro is passed to the callback macro_timing, see: HtmlEmitter
+
+    With compact=True the html code contains no formatting whitespace.
+
+    With a file-like object as out, the html code is written into out
+    piece by piece and None is returned. With a encoding, the html code is
+    encoded and out must be a binary file.
     
     Info: parser_kwargs and emitter_kwargs are deprecated
     """
@@ -70,20 +99,114 @@ def creole2html(markup_string, debug=False,
         "macros": macros,
         "verbose": verbose,
         "stderr": stderr,
+        "link_resolver": link_resolver,
+        "macro_cache": macro_cache,
+        "macro_workers": macro_workers,
+        "macro_timeout": macro_timeout,
+        "macro_time_limits": macro_time_limits,
+        "render_deadline": render_deadline,
+        "macro_timing": macro_timing,
+        "compact": compact,
     }
     if emitter_kwargs is not None:
         warnings.warn("emitter_kwargs argument in creole2html would be removed in the future!", PendingDeprecationWarning)
         emitter_kwargs2.update(emitter_kwargs)
 
     # Build html code from document tree
-    return HtmlEmitter(document, **emitter_kwargs2).emit()
+    return HtmlEmitter(document, **emitter_kwargs2).emit(out=out, encoding=encoding)
+
+
+def parse_creole(markup_string, debug=False,
+        block_rules=None, blog_line_breaks=True,
+        macros=None, verbose=None, stderr=None,
+    ):
+    """
+    create the html document tree from creole markup
+    (The same tree as parse_html(creole2html(markup_string)) but
+    without the html round trip)
+    """
+    assert isinstance(markup_string, TEXT_TYPE), "given markup_string must be unicode!"
+
+    document = CreoleParser(markup_string,
+        block_rules=block_rules, blog_line_breaks=blog_line_breaks
+    ).parse()
+    if debug:
+        document.debug()
 
+    return HtmlTreeEmitter(document,
+        macros=macros, verbose=verbose, stderr=stderr
+    ).emit()
+
+
+def creole2etree(markup_string, debug=False,
+        block_rules=None, blog_line_breaks=True,
+        macros=None, verbose=None, stderr=None,
+        etree=None, root_tag="div"
+    ):
+    """
+    convert creole markup into a ElementTree element with the html
+    (without generating and parsing the html code)
+
+    >>> import xml.etree.ElementTree as ET
+    >>> root = creole2etree('This is **creole //markup//**!')
+    >>> print(ET.tostring(root).decode("ascii"))
+    <div><p>This is <strong>creole <i>markup</i></strong>!</p></div>
+
+    The elements are created with the module etree, e.g. lxml.etree,
+    default is xml.etree.ElementTree. The html is in a root_tag element.
+    """
+    assert isinstance(markup_string, TEXT_TYPE), "given markup_string must be unicode!"
+
+    document = CreoleParser(markup_string,
+        block_rules=block_rules, blog_line_breaks=blog_line_breaks
+    ).parse()
+    if debug:
+        document.debug()
+
+    return EtreeEmitter(document,
+        macros=macros, verbose=verbose, stderr=stderr,
+        etree=etree, root_tag=root_tag,
+    ).emit()
+
+
+def parse_etree(element, debug=False, include_root=True):
+    """
+    create the document tree from a ElementTree element, e.g. from
+    xml.etree.ElementTree or lxml (without serializing and parsing the
+    html code again)
+
+    With include_root=False only the content of the element is used and
+    with include_root=None only the content of a <div> or <body> element
+    without attributes (a container like the root of creole2etree()).
+    """
+    h2c = EtreeParser(debug=debug)
+    document_tree = h2c.parse(element, include_root=include_root)
+    if debug:
+        h2c.debug()
+    return document_tree
+
+
+def parse_html(html_string, debug=False, tokenizer=None, keep_entities=False,
+        include_root=None
+    ):
+    """
+    create the document tree from html code
+
+    tokenizer is the name of the html tokenizer backend, e.g. "lxml"
+    see: creole.shared.html_parser.TOKENIZERS
+    With keep_entities=True the html entities are not replaced, but
+    stored as entityref and charref nodes.
+
+    A already parsed ElementTree element is used directly, see: parse_etree()
+    The default include_root=None skips a <div> or <body> root element
+    without attributes, e.g. from creole2etree().
+    """
+    if hasattr(html_string, "tag"):
+        return parse_etree(html_string, debug=debug, include_root=include_root)
 
-def parse_html(html_string, debug=False):
-    """ create the document tree from html code """
     assert isinstance(html_string, TEXT_TYPE), "given html_string must be unicode!"
 
-    h2c = HtmlParser(debug=debug)
+    h2c = HtmlParser(debug=debug, tokenizer=tokenizer, keep_entities=keep_entities)
     document_tree = h2c.feed(html_string)
     if debug:
         h2c.debug()
@@ -92,18 +215,22 @@ def parse_html(html_string, debug=False):
 
 def html2creole(html_string, debug=False,
         parser_kwargs=None, emitter_kwargs=None,
-        unknown_emit=None
+        unknown_emit=None, out=None, encoding=None, include_root=None
     ):
     """
     convert html code into creole markup
 
     >>> html2creole('<p>This is <strong>creole <i>markup</i></strong>!</p>')
     'This is **creole //markup//**!'
+
+    html_string can be a ElementTree element, too, see: parse_html()
+
+    With out, the markup is written into the file-like object, see: creole2html()
     """
     if parser_kwargs is not None:
         warnings.warn("parser_kwargs argument in html2creole would be removed in the future!", PendingDeprecationWarning)
 
-    document_tree = parse_html(html_string, debug=debug)
+    document_tree = parse_html(html_string, debug=debug, include_root=include_root)
 
     emitter_kwargs2 = {
         "unknown_emit": unknown_emit,
@@ -114,23 +241,27 @@ def html2creole(html_string, debug=False,
 
     # create creole markup from the document tree
     emitter = CreoleEmitter(document_tree, debug=debug, **emitter_kwargs2)
-    return emitter.emit()
+    return emitter.emit(out=out, encoding=encoding)
 
 
 def html2textile(html_string, debug=False,
         parser_kwargs=None, emitter_kwargs=None,
-        unknown_emit=None
+        unknown_emit=None, out=None, encoding=None, include_root=None
     ):
     """
     convert html code into textile markup
     
     >>> html2textile('<p>This is <strong>textile <i>markup</i></strong>!</p>')
     'This is *textile __markup__*!'
+
+    html_string can be a ElementTree element, too, see: parse_html()
+
+    With out, the markup is written into the file-like object, see: creole2html()
     """
     if parser_kwargs is not None:
         warnings.warn("parser_kwargs argument in html2textile would be removed in the future!", PendingDeprecationWarning)
 
-    document_tree = parse_html(html_string, debug=debug)
+    document_tree = parse_html(html_string, debug=debug, include_root=include_root)
 
     emitter_kwargs2 = {
         "unknown_emit": unknown_emit,
@@ -141,23 +272,27 @@ def html2textile(html_string, debug=False,
 
     # create textile markup from the document tree
     emitter = TextileEmitter(document_tree, debug=debug, **emitter_kwargs2)
-    return emitter.emit()
+    return emitter.emit(out=out, encoding=encoding)
 
 
 def html2rest(html_string, debug=False,
         parser_kwargs=None, emitter_kwargs=None,
-        unknown_emit=None
+        unknown_emit=None, out=None, encoding=None, include_root=None
     ):
     """
     convert html code into ReStructuredText markup
     
     >>> html2rest('<p>This is <strong>ReStructuredText</strong> <em>markup</em>!</p>')
     'This is **ReStructuredText** *markup*!'
+
+    html_string can be a ElementTree element, too, see: parse_html()
+
+    With out, the markup is written into the file-like object, see: creole2html()
     """
     if parser_kwargs is not None:
         warnings.warn("parser_kwargs argument in html2rest would be removed in the future!", PendingDeprecationWarning)
 
-    document_tree = parse_html(html_string, debug=debug)
+    document_tree = parse_html(html_string, debug=debug, include_root=include_root)
 
     emitter_kwargs2 = {
         "unknown_emit": unknown_emit,
@@ -168,9 +303,207 @@ def html2rest(html_string, debug=False,
 
     # create ReStructuredText markup from the document tree
     emitter = ReStructuredTextEmitter(document_tree, debug=debug, **emitter_kwargs2)
+    return emitter.emit(out=out, encoding=encoding)
+
+
+def creole2rest(markup_string, debug=False,
+        block_rules=None, blog_line_breaks=True,
+        macros=None, verbose=None, stderr=None,
+        unknown_emit=None
+    ):
+    """
+    convert creole markup into ReStructuredText markup
+    (Same result as html2rest(creole2html(markup_string)))
+
+    >>> creole2rest('This is **creole //markup//**!')
+    'This is **creole *markup***!'
+    """
+    document_tree = parse_creole(markup_string, debug=debug,
+        block_rules=block_rules, blog_line_breaks=blog_line_breaks,
+        macros=macros, verbose=verbose, stderr=stderr,
+    )
+
+    # create ReStructuredText markup from the document tree
+    emitter = ReStructuredTextEmitter(document_tree, debug=debug, unknown_emit=unknown_emit)
+    return emitter.emit()
+
+
+def creole2textile(markup_string, debug=False,
+        block_rules=None, blog_line_breaks=True,
+        macros=None, verbose=None, stderr=None,
+        unknown_emit=None
+    ):
+    """
+    convert creole markup into textile markup
+    (Same result as html2textile(creole2html(markup_string)))
+
+    >>> creole2textile('This is **creole //markup//**!')
+    'This is *creole __markup__*!'
+    """
+    document_tree = parse_creole(markup_string, debug=debug,
+        block_rules=block_rules, blog_line_breaks=blog_line_breaks,
+        macros=macros, verbose=verbose, stderr=stderr,
+    )
+
+    # create textile markup from the document tree
+    emitter = TextileEmitter(document_tree, debug=debug, unknown_emit=unknown_emit)
     return emitter.emit()
 
 
+def creole2creole(markup_string, debug=False,
+        block_rules=None, blog_line_breaks=True,
+        previous=None
+    ):
+    """
+    normalize creole markup
+    (without the creole2html -> html2creole round trip)
+
+    >>> creole2creole('==Headline==\\n*one\\n** two')
+    '== Headline\\n\\n* one\\n** two'
+
+    If the previous formatted version of the markup is given, only the
+    changed blocks would be parsed and formatted:
+
+    >>> creole2creole('=Headline=\\n\\n*one', previous='= Headline\\n\\n* one')
+    '= Headline\\n\\n* one'
+    """
+    assert isinstance(markup_string, TEXT_TYPE), "given markup_string must be unicode!"
+
+    if previous is None:
+        document = CreoleParser(markup_string,
+            block_rules=block_rules, blog_line_breaks=blog_line_breaks
+        ).parse()
+        if debug:
+            document.debug()
+        return CreoleFormatter(document, debug=debug).emit()
+
+    parser = CreoleParser(markup_string,
+        block_rules=block_rules, blog_line_breaks=blog_line_breaks
+    )
+    formatted_blocks = set([
+        block.strip("\n") for block in split_blocks(previous, parser.block_re)
+    ])
+    blocks = split_blocks(markup_string, parser.block_re)
+
+    # Parse all changed blocks at once. The blocks are separated with a
+    # empty line, so every block would be emitted as one block again.
+    changed_blocks = [
+        block for block in blocks if block.strip("\n") not in formatted_blocks
+    ]
+    parser.raw = "\n\n".join(changed_blocks)
+    document = parser.parse()
+    if debug:
+        document.debug()
+    new_blocks = iter(CreoleFormatter(document, debug=debug).emit_blocks())
+
+    result = []
+    for block in blocks:
+        block = block.strip("\n")
+        if block not in formatted_blocks:
+            block = next(new_blocks)
+        if block:
+            result.append(block)
+    return "\n\n".join(result)
+
+
+def iter_creole2text(markup_string,
+        block_rules=None, blog_line_breaks=True,
+        include_pre=True, include_macros=False
+    ):
+    """
+    Generate the plain text of all blocks in the creole markup
+    (without building html code), e.g. for a full-text search index.
+
+    >>> for text in iter_creole2text('= Headline\\n\\nA [[/url/|link]]'):
+    ...     print(text)
+    Headline
+    A link
+    """
+    assert isinstance(markup_string, TEXT_TYPE), "given markup_string must be unicode!"
+
+    parser = CreoleTextParser(markup_string,
+        block_rules=block_rules, blog_line_breaks=blog_line_breaks,
+        include_pre=include_pre, include_macros=include_macros
+    )
+    return parser.iter_blocks()
+
+
+def creole2text(markup_string,
+        block_rules=None, blog_line_breaks=True,
+        include_pre=True, include_macros=False
+    ):
+    """
+    convert creole markup into plain text
+    The text of the blocks are separated with a empty line.
+
+    >>> creole2text('This is **creole //markup//**!')
+    'This is creole markup!'
+
+    Pre blocks are included and the text of macros excluded by default:
+
+    >>> creole2text('{{{\\npre\\n}}}\\n<<html>><b>macro</b><</html>>')
+    'pre'
+    >>> creole2text('{{{\\npre\\n}}}\\n<<html>><b>macro</b><</html>>',
+    ...     include_pre=False, include_macros=True)
+    '<b>macro</b>'
+    """
+    return "\n\n".join(iter_creole2text(markup_string,
+        block_rules=block_rules, blog_line_breaks=blog_line_breaks,
+        include_pre=include_pre, include_macros=include_macros,
+    ))
+
+
+def scan(markup_string, block_rules=None, blog_line_breaks=True):
+    """
+    Collect the metadata of the creole markup in one pass (without
+    rendering): headlines as (level, text) tuples, link targets, image
+    targets and macros as (name, arguments) tuples, all in document order.
+
+    >>> result = scan('= Headline\\n[[/url/|link]] {{image.png}} <<toc depth=1>>')
+    >>> result["headlines"] == [(1, 'Headline')]
+    True
+    >>> result["links"] == ['/url/'] and result["images"] == ['image.png']
+    True
+    >>> result["macros"] == [('toc', 'depth=1')]
+    True
+    """
+    assert isinstance(markup_string, TEXT_TYPE), "given markup_string must be unicode!"
+
+    scanner = CreoleScanner(markup_string,
+        block_rules=block_rules, blog_line_breaks=blog_line_breaks
+    )
+    scanner.scan()
+    return {
+        "headlines": scanner.headlines,
+        "links": scanner.links,
+        "images": scanner.images,
+        "macros": scanner.macros,
+    }
+
+
+def creole2html_file(filename, file_encoding="utf-8", **kwargs):
+    """
+    convert a creole markup file into html code.
+    The file is memory mapped and decoded in one pass, see: read_text_file()
+    All other arguments, e.g. out and encoding, see: creole2html()
+    """
+    return creole2html(read_text_file(filename, file_encoding), **kwargs)
+
+
+def html2creole_file(filename, file_encoding="utf-8", **kwargs):
+    """ convert a html file into creole markup, see: creole2html_file() """
+    return html2creole(read_text_file(filename, file_encoding), **kwargs)
+
+
+def html2textile_file(filename, file_encoding="utf-8", **kwargs):
+    """ convert a html file into textile markup, see: creole2html_file() """
+    return html2textile(read_text_file(filename, file_encoding), **kwargs)
+
+
+def html2rest_file(filename, file_encoding="utf-8", **kwargs):
+    """ convert a html file into ReStructuredText markup, see: creole2html_file() """
+    return html2rest(read_text_file(filename, file_encoding), **kwargs)
+
 
 if __name__ == '__main__':
     print("runing local doctest...")
@@ -11,10 +11,10 @@
 
 from __future__ import division, absolute_import, print_function, unicode_literals
 import argparse
-import codecs
 
 from creole import creole2html, html2creole, html2rest, html2textile
 from creole import VERSION_STRING
+from creole.shared.input_reader import read_text_file
 
 
 class CreoleCLI(object):
@@ -50,11 +50,12 @@ class CreoleCLI(object):
             sourcefile, destination, self.convert_func.__name__, encoding
         ))
         
-        with codecs.open(sourcefile, "r", encoding=encoding) as infile:
-            with codecs.open(destination, "w", encoding=encoding) as outfile:
-                content = infile.read()
-                converted = self.convert_func(content)
-                outfile.write(converted)
+        # memory mapped and decoded in one pass, with normalized line endings
+        content = read_text_file(sourcefile, encoding)
+        with open(destination, "wb") as outfile:
+            # The result is written and encoded in big chunks,
+            # without the whole converted text in memory.
+            self.convert_func(content, out=outfile, encoding=encoding)
         print("done. %r created." % destination)
 
 
@@ -0,0 +1,165 @@
+# coding: utf-8
+
+
+"""
+    python-creole converter objects
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    A Converter is created once with the configuration, e.g. the macros and
+    the block rules. The creole* calls use the prebuild rules and emitter
+    tables, so only the work for the given document is left.
+
+    :copyleft: 2015 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+from creole.emitter.creol2html_emitter import HtmlEmitter
+from creole.emitter.creol2tree_emitter import HtmlTreeEmitter
+from creole.emitter.creol2etree_emitter import EtreeEmitter
+from creole.emitter.html2creole_emitter import CreoleEmitter
+from creole.emitter.html2rest_emitter import ReStructuredTextEmitter
+from creole.emitter.html2textile_emitter import TextileEmitter
+from creole.parser.creol2html_parser import CreoleParser
+from creole.parser.etree_parser import EtreeParser
+from creole.parser.html_parser import HtmlParser
+from creole.py3compat import TEXT_TYPE
+from creole.shared.html_parser import get_tokenizer
+
+
+class Converter(object):
+    """
+    Reusable converter with a fixed configuration. The converter is not
+    changed by the conversions, so one instance can be used by many
+    threads at the same time.
+
+    >>> converter = Converter(macros={"html": lambda text: text})
+    >>> converter.render('This is **creole //markup//**!')
+    '<p>This is <strong>creole <i>markup</i></strong>!</p>'
+    >>> converter.render('A <<html>><b>macro</b><</html>>')
+    '<p>A <b>macro</b></p>'
+    >>> converter.html2creole('<p>This is <strong>creole <i>markup</i></strong>!</p>')
+    'This is **creole //markup//**!'
+    >>> converter.creole2rest('This is **creole //markup//**!')
+    'This is **creole *markup***!'
+
+    html_tokenizer is the html tokenizer backend for the html2* methods,
+    see: creole.shared.html_parser.TOKENIZERS
+    The html2* methods are not faster than the module functions: The html
+    parser and the emitters have only per-document state, so there is
+    nothing to prebuild. They use the html_tokenizer and unknown_emit of
+    the converter.
+    The html2* methods accept a ElementTree element, too, see:
+    creole.parse_html() for include_root.
+
+    More HtmlEmitter arguments can be given as keyword arguments, e.g.:
+    link_resolver, macro_cache, macro_workers, macro_timeout
+    They are used for the creole2rest, creole2textile and creole2etree
+    methods, too (compact has no effect on a tree).
+
+    The creole2html and html2* methods write into a file-like object with
+    out=file, see: creole.creole2html()
+    """
+    def __init__(self, block_rules=None, blog_line_breaks=True,
+            macros=None, verbose=None, stderr=None, unknown_emit=None,
+            html_tokenizer=None, **html_emitter_kwargs
+        ):
+        self.blog_line_breaks = blog_line_breaks
+        self.block_re = CreoleParser.compile_block_rules(block_rules, blog_line_breaks)
+
+        self.macros = macros
+        self.verbose = verbose
+        self.stderr = stderr
+        self.unknown_emit = unknown_emit
+        self.html_tokenizer = get_tokenizer(html_tokenizer)
+
+        html_emitter_kwargs.update({
+            "macros": macros,
+            "verbose": verbose,
+            "stderr": stderr,
+        })
+        self.html_emitter_kwargs = html_emitter_kwargs
+
+        # The tag tables of the emitters are the same for all renders
+        compact = html_emitter_kwargs.get("compact", False)
+        self.emitter_tables = dict(
+            (emitter_class, emitter_class.get_tables(compact))
+            for emitter_class in (HtmlEmitter, HtmlTreeEmitter, EtreeEmitter)
+        )
+
+    #--------------------------------------------------------------------------
+
+    def parse_creole(self, markup_string):
+        """ create the creole document tree """
+        assert isinstance(markup_string, TEXT_TYPE), "given markup_string must be unicode!"
+        return CreoleParser(markup_string,
+            blog_line_breaks=self.blog_line_breaks, block_re=self.block_re
+        ).parse()
+
+    def parse_html(self, html_string, include_root=None):
+        """
+        create the html document tree
+        from html code or from a ElementTree element
+        """
+        if hasattr(html_string, "tag"):
+            return EtreeParser().parse(html_string, include_root=include_root)
+        assert isinstance(html_string, TEXT_TYPE), "given html_string must be unicode!"
+        return HtmlParser(tokenizer=self.html_tokenizer).feed(html_string)
+
+    #--------------------------------------------------------------------------
+
+    def creole2html(self, markup_string, out=None, encoding=None):
+        """ convert creole markup into html code """
+        document = self.parse_creole(markup_string)
+        return self._emitter(HtmlEmitter, document).emit(out, encoding)
+    render = creole2html
+
+    def _emitter(self, emitter_class, document, **kwargs):
+        kwargs.update(self.html_emitter_kwargs)
+        return emitter_class(document,
+            tables=self.emitter_tables[emitter_class], **kwargs
+        )
+
+    def _creole2tree(self, markup_string):
+        document = self.parse_creole(markup_string)
+        return self._emitter(HtmlTreeEmitter, document).emit()
+
+    def creole2etree(self, markup_string, etree=None, root_tag="div"):
+        """ convert creole markup into a ElementTree element, see: creole.creole2etree() """
+        document = self.parse_creole(markup_string)
+        return self._emitter(EtreeEmitter, document,
+            etree=etree, root_tag=root_tag
+        ).emit()
+
+    def creole2rest(self, markup_string):
+        """ convert creole markup into ReStructuredText markup """
+        document_tree = self._creole2tree(markup_string)
+        return ReStructuredTextEmitter(document_tree, unknown_emit=self.unknown_emit).emit()
+
+    def creole2textile(self, markup_string):
+        """ convert creole markup into textile markup """
+        document_tree = self._creole2tree(markup_string)
+        return TextileEmitter(document_tree, unknown_emit=self.unknown_emit).emit()
+
+    #--------------------------------------------------------------------------
+
+    def html2creole(self, html_string, out=None, encoding=None, include_root=None):
+        """ convert html code into creole markup """
+        document_tree = self.parse_html(html_string, include_root)
+        return CreoleEmitter(document_tree, unknown_emit=self.unknown_emit).emit(out, encoding)
+
+    def html2rest(self, html_string, out=None, encoding=None, include_root=None):
+        """ convert html code into ReStructuredText markup """
+        document_tree = self.parse_html(html_string, include_root)
+        return ReStructuredTextEmitter(document_tree, unknown_emit=self.unknown_emit).emit(out, encoding)
+
+    def html2textile(self, html_string, out=None, encoding=None, include_root=None):
+        """ convert html code into textile markup """
+        document_tree = self.parse_html(html_string, include_root)
+        return TextileEmitter(document_tree, unknown_emit=self.unknown_emit).emit(out, encoding)
+
+
+if __name__ == "__main__":
+    import doctest
+    print(doctest.testmod())
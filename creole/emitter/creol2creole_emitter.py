@@ -0,0 +1,383 @@
+# coding: utf-8
+
+
+"""
+    WikiCreole normalizer
+
+    Emit canonical creole markup directly from the creole document tree
+    (Without the creole2html -> html2creole round trip).
+
+    :copyleft: 2008-2015 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import re
+
+from creole.parser.creol2html_parser import CreoleParser
+from creole.parser.creol2html_rules import BlockRules, InlineRules
+from creole.shared.markup_table import MarkupTable
+
+
+# A line in a pre block, witch must be escaped with "~"
+pre_end_re = re.compile(r"^(\s*)(\}\}\}\s*)$", re.MULTILINE | re.UNICODE)
+
+# The start of a paragraph line, witch would be parsed as a block element
+block_start_re = re.compile(r"""
+        [=|]
+    |
+        [*\#](?![*\#])
+    |
+        (----|{{{) \s* $
+""", re.VERBOSE | re.UNICODE)
+
+macro_block_re = re.compile(BlockRules.macro_block, BlockRules.re_flags)
+
+url_re = re.compile(r"(%s)://" % InlineRules.proto, re.UNICODE)
+
+
+def escape_inline(parts):
+    """
+    Join the given (is_text, markup) parts and escape all characters in
+    the text parts with "~", witch would start a inline markup.
+
+    >>> escape_inline([(True, 'Text with **stars**, ~tilde and http://domain.tld')])
+    'Text with ~**stars**, ~~tilde and ~http://domain.tld'
+    >>> escape_inline([(True, '{{{no pre}}}')])
+    '~{~{{no pre}}}'
+    >>> escape_inline([(True, 'no markup -- here')])
+    'no markup -- here'
+
+    The context of the text is used, e.g.: text before a emphasis:
+    >>> escape_inline([(True, 'a /'), (False, '//emphasis//')])
+    'a ~///emphasis//'
+    """
+    search_trigger = CreoleParser.inline_trigger_re.search
+    match_inline = CreoleParser.inline_re.match
+
+    line = "".join([markup for is_text, markup in parts])
+
+    escape_positions = []
+    pos = start = 0
+    for is_text, markup in parts:
+        end = start + len(markup)
+        if is_text:
+            pos = max(pos, start)
+            while pos < end:
+                trigger = search_trigger(line, pos)
+                if trigger is None or trigger.start() >= end:
+                    break
+                pos = trigger.start()
+                match = match_inline(line, pos)
+                if match.group("char") is None:
+                    escape_positions.append(pos)
+                    if match.group("url") is not None:
+                        # A escaped url would be consumed completely
+                        pos = match.end()
+                        continue
+                pos += 1
+        start = end
+
+    if not escape_positions:
+        return line
+
+    result = []
+    start = 0
+    for pos in escape_positions:
+        result.append(line[start:pos])
+        result.append("~")
+        start = pos
+    result.append(line[start:])
+    return "".join(result)
+
+
+class CreoleFormatter(object):
+    """
+    Generate canonical creole markup for the document tree consisting of
+    creole DocNodes.
+
+    >>> def format(markup):
+    ...     document = CreoleParser(markup).parse()
+    ...     print(CreoleFormatter(document).emit())
+    >>> format('''
+    ... ==Headline==
+    ... A **bold**
+    ... text.
+    ... *one
+    ... ** two
+    ... |=a|=b|
+    ... |cell|cell|
+    ... ''')
+    == Headline
+    <BLANKLINE>
+    A **bold**
+    text.
+    <BLANKLINE>
+    * one
+    ** two
+    <BLANKLINE>
+    |= a   |= b   |
+    | cell | cell |
+    """
+    def __init__(self, root, debug=False):
+        self.root = root
+        self.debugging = debug
+        self._list_markers = ""
+
+    def _typeface(self, node, key):
+        return key + self.emit_inline(node) + key
+
+    def _macro(self, node):
+        if node.macro_args:
+            return "<<%s %s>>" % (node.macro_name, node.macro_args)
+        return "<<%s>>" % node.macro_name
+
+    #--------------------------------------------------------------------------
+    # *_emit methods for emitting nodes of the document:
+
+    def document_emit(self, node):
+        return "\n\n".join([block for block in self.emit_blocks() if block])
+
+    def text_emit(self, node):
+        return node.content
+
+    def separator_emit(self, node):
+        return "----"
+
+    def _strip_breaks(self, children):
+        """ line breaks at the end are useless """
+        children = children[:]
+        while children and (children[-1].kind == "break" or
+                (children[-1].kind == "text" and not children[-1].content.strip())):
+            del children[-1]
+        return children
+
+    def paragraph_emit(self, node):
+        children = self._strip_breaks(node.children)
+        lines = self._escape_children(children).split("\n")
+        last = len(lines) - 1
+        for no, line in enumerate(lines):
+            stripped = line.strip()
+            if stripped.endswith("\\") and no < last:
+                # Keep the whitespace, otherwise the line break is lost
+                stripped = line.lstrip()
+            if block_start_re.match(stripped):
+                stripped = "~" + stripped
+            elif macro_block_re.match("\n".join([stripped] + lines[no + 1:])):
+                # Don't let a inline macro become a block macro
+                stripped = " " + stripped
+            lines[no] = stripped
+        return "\n".join(lines)
+
+    def _list_emit(self, node, marker):
+        self._list_markers += marker
+        content = "\n".join([self.emit_node(child) for child in node.children])
+        self._list_markers = self._list_markers[:-1]
+        return content
+
+    def bullet_list_emit(self, node):
+        return self._list_emit(node, marker="*")
+
+    def number_list_emit(self, node):
+        return self._list_emit(node, marker="#")
+
+    def list_item_emit(self, node):
+        text = []
+        lists = []
+        for child in node.children:
+            if child.kind in ("bullet_list", "number_list"):
+                lists.append(self.emit_node(child))
+            else:
+                text.append(child)
+        text = self._escape_children(self._strip_breaks(text)).strip()
+        return "\n".join(["%s %s" % (self._list_markers, text)] + lists)
+
+    def table_emit(self, node):
+        table = MarkupTable(head_prefix="= ", auto_width=True)
+        for row in node.children:
+            table.add_tr()
+            for cell in row.children:
+                content = self.emit_inline(cell)
+                if cell.kind == "table_head":
+                    table.add_th(content)
+                else:
+                    if content.startswith("="):
+                        content = "~" + content
+                    table.add_td(content)
+        return table.get_table_markup()
+
+    #--------------------------------------------------------------------------
+
+    def emphasis_emit(self, node):
+        return self._typeface(node, key="//")
+    def strong_emit(self, node):
+        return self._typeface(node, key="**")
+    def monospace_emit(self, node):
+        return self._typeface(node, key="##")
+    def superscript_emit(self, node):
+        return self._typeface(node, key="^^")
+    def subscript_emit(self, node):
+        return self._typeface(node, key=",,")
+    def underline_emit(self, node):
+        return self._typeface(node, key="__")
+    def small_emit(self, node):
+        return self._typeface(node, key="--")
+    def delete_emit(self, node):
+        return self._typeface(node, key="~~")
+
+    #--------------------------------------------------------------------------
+
+    def header_emit(self, node):
+        if node.content:
+            return "%s %s" % ("=" * node.level, node.content)
+        return "=" * node.level
+
+    def _target(self, target, end, start=None):
+        """ separate the link/image target from the markup, if needed """
+        if start is not None and target.startswith(start):
+            target = " " + target
+        if target.endswith(end):
+            target += " "
+        return target
+
+    def link_emit(self, node):
+        text = self.emit_children(node)
+        target = node.content
+        if not text or text == target:
+            if ("]]" in target or "|" in target[1:]) and url_re.match(target):
+                # Only possible with a free standing url
+                return target
+            return "[[%s]]" % self._target(target, "]")
+        return "[[%s|%s]]" % (self._target(target, "]"), text)
+
+    def image_emit(self, node):
+        text = self.emit_children(node)
+        target = self._target(node.content, "}", "{")
+        if not text or text == node.content:
+            return "{{%s}}" % target
+        return "{{%s|%s}}" % (target, text)
+
+    def macro_inline_emit(self, node):
+        if node.content is None:
+            # A single macro tag, e.g.: <<macro>>
+            return self._macro(node)
+        return "%s%s<</%s>>" % (self._macro(node), node.content, node.macro_name)
+
+    def macro_block_emit(self, node):
+        return "%s\n%s\n<</%s>>" % (self._macro(node), node.content, node.macro_name)
+
+    def break_emit(self, node):
+        if node.content == "" and node.parent.kind == "paragraph":
+            # line break from the markup (blog style line breaks)
+            return "\n"
+        return "\\\\"
+
+    def pre_block_emit(self, node):
+        return "{{{%s}}}" % pre_end_re.sub(r"\1~\2", node.content)
+
+    def pre_inline_emit(self, node):
+        return "{{{%s}}}" % node.content
+
+    def default_emit(self, node):
+        """Fallback function for emitting unknown nodes."""
+        raise NotImplementedError("Node '%s' unknown" % node.kind)
+
+    def emit_children(self, node):
+        """Emit all the children of a node."""
+        return "".join([self.emit_node(child) for child in node.children])
+
+    def _is_url(self, node):
+        """ a link, created from a free standing url in the markup """
+        return (
+            len(node.children) == 1 and node.children[0].kind == "text"
+            and node.children[0].content == node.content
+            and url_re.match(node.content) is not None
+        )
+
+    def _escape_children(self, children):
+        parts = []
+        for child in children:
+            if child.kind == "link" and self._is_url(child) and (
+                    not parts or parts[-1][1][-1:].isspace()):
+                # A url can only start after whitespace or at a line start
+                parts.append((False, child.content))
+            else:
+                parts.append((child.kind == "text", self.emit_node(child)))
+        return escape_inline(parts)
+
+    def emit_inline(self, node):
+        """
+        Emit all inline children of a node and escape the text nodes.
+        """
+        return self._escape_children(node.children)
+
+    def emit_node(self, node):
+        """Emit a single node."""
+        emit = getattr(self, "%s_emit" % node.kind, self.default_emit)
+        return emit(node)
+
+    def emit_blocks(self):
+        """
+        Returns a list with the markup of all blocks. The blocks are
+        separated by empty lines in the markup, so a block can contain
+        more than one block element, e.g.: a headline and a paragraph.
+        """
+        blocks = []
+        block = []
+        for child in self.root.children:
+            if child.kind == "line":
+                if block:
+                    blocks.append("\n\n".join([part for part in block if part]))
+                    block = []
+            else:
+                block.append(self.emit_node(child))
+        if block:
+            blocks.append("\n\n".join([part for part in block if part]))
+        return blocks
+
+    def emit(self):
+        """Emit the document represented by self.root DOM tree."""
+        return self.emit_node(self.root)
+
+
+def split_blocks(markup_string, block_re):
+    """
+    Split creole markup into the blocks, witch are separated by empty lines.
+    A empty line in a pre block or a block macro doesn't split it.
+
+    >>> parser = CreoleParser("")
+    >>> split_blocks("= a\\ntext\\n\\n\\n{{{\\n\\npre\\n}}}\\n\\n* one\\n", parser.block_re)
+    ['= a\\ntext', '{{{\\n\\npre\\n}}}', '* one']
+    """
+    markup_string = markup_string.replace("\r\n", "\n").replace("\r", "\n")
+
+    matches = []
+    def collect(match):
+        matches.append(match)
+        return ""
+    # Use re.sub() like CreoleParser.parse_block(), because finditer()
+    # handles empty matches differently in older python versions.
+    re.sub(block_re, collect, markup_string)
+
+    blocks = []
+    start = None
+    end = None
+    for match in matches:
+        if match.group("line") is not None:
+            if start is not None:
+                blocks.append(markup_string[start:end])
+                start = None
+        else:
+            if start is None:
+                start = match.start()
+            end = match.end()
+    if start is not None:
+        blocks.append(markup_string[start:end])
+    return blocks
+
+
+if __name__ == '__main__':
+    import doctest
+    print(doctest.testmod())
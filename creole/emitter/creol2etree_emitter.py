@@ -0,0 +1,92 @@
+# coding: utf-8
+
+
+"""
+    WikiCreole to ElementTree converter
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Build a ElementTree element with the html of a creole document from
+    the html document tree of the HtmlTreeEmitter. So the html can be used
+    with xml.etree.ElementTree or lxml without generating and parsing the
+    html code.
+
+    :copyleft: 2015 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import xml.etree.ElementTree
+
+from creole.emitter.creol2tree_emitter import HtmlTreeEmitter
+from creole.html_tools.deentity import Deentity
+from creole.py3compat import TEXT_TYPE
+
+
+class EtreeEmitter(HtmlTreeEmitter):
+    """
+    Generate a ElementTree element for the document tree consisting of
+    creole DocNodes. The html is in a root_tag element.
+
+    >>> from creole.parser.creol2html_parser import CreoleParser
+    >>> document = CreoleParser("= Head\\n\\nThis is **creole //markup//**!").parse()
+    >>> root = EtreeEmitter(document).emit()
+    >>> print(xml.etree.ElementTree.tostring(root).decode("ascii"))
+    <div><h1>Head</h1>
+    <p>This is <strong>creole <i>markup</i></strong>!</p></div>
+
+    With etree=lxml.etree the lxml elements are created.
+    """
+    def __init__(self, *args, **kwargs):
+        self.etree = kwargs.pop("etree", None) or xml.etree.ElementTree
+        self.root_tag = kwargs.pop("root_tag", "div")
+        super(EtreeEmitter, self).__init__(*args, **kwargs)
+        self.deentity = Deentity()
+
+    def emit(self):
+        """ returns the root element """
+        document = super(EtreeEmitter, self).emit()
+        root = self.etree.Element(self.root_tag)
+        self._add_children(document, root)
+
+        # The blocks in own lines, so a <pre> is a block for the EtreeParser
+        children = list(root)
+        for element in children[:-1]:
+            if not element.tail:
+                element.tail = "\n"
+        return root
+
+    def _add_children(self, node, element):
+        last = None # The last added child element
+        for child in node.children:
+            if child.kind != "data":
+                last = self._add_element(child, element)
+            elif last is None:
+                element.text = (element.text or "") + child.content
+            else:
+                last.tail = (last.tail or "") + child.content
+
+    def _add_element(self, node, parent):
+        kind = node.kind
+        if kind in ("blockdata_pre", "inlinedata_pre"):
+            # The content is html code, like from HtmlParser
+            element = self.etree.SubElement(parent, "pre")
+            element.text = self.deentity.replace_all(node.content)
+            return element
+
+        if kind == "headline":
+            tag = "h%i" % node.level
+        else:
+            tag = kind
+        attrib = dict(
+            (name, "" if value is None else TEXT_TYPE(value))
+            for name, value in node.attrs.items()
+        )
+        element = self.etree.SubElement(parent, tag, attrib)
+        self._add_children(node, element)
+        return element
+
+
+if __name__ == '__main__':
+    import doctest
+    print(doctest.testmod())
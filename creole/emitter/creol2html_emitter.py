@@ -11,13 +11,18 @@
 
 from __future__ import division, absolute_import, print_function, unicode_literals
 
+from functools import partial
 import json
 from xml.sax.saxutils import escape
 import sys
 import traceback
 
+from creole.exceptions import MacroImportError
 from creole.parser.creol2html_parser import CreoleParser
 from creole.py3compat import TEXT_TYPE
+from creole.shared.macro_cache import get_cache_key, macro_cache as default_macro_cache
+from creole.shared.macro_runner import MacroRunner, run_coroutine
+from creole.shared.output_writer import OutputWriter
 from creole.shared.utils import string2dict
 
 
@@ -67,24 +72,38 @@ class TableOfContent(object):
 
         return tree
 
-    def nested_headlines2html(self, nested_headlines, level=0):
+    def nested_headlines2html(self, nested_headlines, level=0, compact=False):
         """Convert a python nested list like the one representing the toc to an html equivalent."""
-        indent = "\t"*level
+        parts = []
+        if compact:
+            self._nested_headlines2html(nested_headlines, level, parts, "", "")
+        else:
+            self._nested_headlines2html(nested_headlines, level, parts, "\t", "\n")
+        return "".join(parts)
+
+    def _nested_headlines2html(self, nested_headlines, level, parts, tab, newline):
+        indent = tab * level
         if isinstance(nested_headlines, TEXT_TYPE):
-            return '%s<li><a href="#%s">%s</a></li>\n' % (indent, nested_headlines, nested_headlines)
+            parts.append('%s<li><a href="#%s">%s</a></li>%s' % (indent, nested_headlines, nested_headlines, newline))
         elif isinstance(nested_headlines, list):
-            html = '%s<ul>\n' % indent
+            parts.append('%s<ul>%s' % (indent, newline))
             for elt in nested_headlines:
-                html += self.nested_headlines2html(elt, level + 1)
-            html += '%s</ul>' % indent
+                self._nested_headlines2html(elt, level + 1, parts, tab, newline)
+            parts.append('%s</ul>' % indent)
             if level > 0:
-                html += "\n"
-            return html
+                parts.append(newline)
 
-    def emit(self, document):
-        """Emit the toc where the <<toc>> macro was."""
+    def get_html(self, compact=False):
+        """Returns the html code of the toc."""
         nested_headlines = self.flat_list2nest_list(self.headlines)
-        html = self.nested_headlines2html(nested_headlines)
+        return self.nested_headlines2html(nested_headlines, compact=compact)
+
+    def emit(self, document):
+        """
+        Emit the toc where the <<toc>> macro was.
+        Note: Not used by the HtmlEmitter anymore, see: HtmlEmitter.render_toc()
+        """
+        html = self.get_html()
 
         # FIXME: We should not use <p> here, because it doesn't match
         #        if no newline was made before <<toc>>
@@ -101,10 +120,98 @@ class HtmlEmitter(object):
     """
     Generate HTML output for the document
     tree consisting of DocNodes.
+
+    The optional link_resolver would be called once with the set of all
+    link targets in the document, before the emitting starts. It must
+    return a dict: {target: (href, css_class)}. Targets missing in the
+    dict are emitted as they are, a href or css_class of None is skipped.
+    e.g.: lookup all wiki pages with one query and mark missing pages:
+
+    >>> def link_resolver(targets):
+    ...     existing = set(["StartPage"]) # one lookup for all targets
+    ...     return dict(
+    ...         (target, ("/wiki/%s/" % target, None if target in existing else "missing"))
+    ...         for target in targets if "://" not in target
+    ...     )
+    >>> root = CreoleParser("[[StartPage]], [[NewPage|new]] and http://domain.tld").parse()
+    >>> sorted(root.used_links)
+    ['NewPage', 'StartPage', 'http://domain.tld']
+    >>> print(HtmlEmitter(root, link_resolver=link_resolver).emit())
+    <p><a href="/wiki/StartPage/">StartPage</a>, <a href="/wiki/NewPage/" class="missing">new</a> and <a href="http://domain.tld">http://domain.tld</a></p>
+
+    The macros dict/object is not changed, so it can be shared between
+    threads. Only a TableOfContent instance in macros["toc"] would be
+    shared between renders, use the TableOfContent class (or a subclass)
+    to get a new instance for every render.
+
+    With macro_workers all macros (except <<toc>>) are called before the
+    emitting in a thread pool. Macros that wait for I/O (a database or a
+    web service) don't wait for each other. A macro running longer than
+    macro_timeout seconds would be replaced with a error. Macros can be
+    coroutine functions (async def), too.
+
+    Time limits for single macros can be set with macro_time_limits:
+    {macro name: seconds} and render_deadline limits the time for all
+    macros. The run time of every macro would be passed to the callback
+    macro_timing(macro_name, duration, timed_out) or written to stderr
+    if verbose > 1.
+
+    With compact=True the html code contains no newlines and tabs for
+    formatting, only the newlines of the content (e.g. in <pre>):
+
+    >>> root = CreoleParser("* one\\\\\\\\two\\n** three\\n\\n|= a |= b |").parse()
+    >>> print(HtmlEmitter(root, compact=True).emit())
+    <ul><li>one<br />two<ul><li>three</li></ul></li></ul><table><tr><th>a</th><th>b</th></tr></table>
     """
-    def __init__(self, root, macros=None, verbose=None, stderr=None):
+    def __init__(self, root, macros=None, verbose=None, stderr=None,
+            link_resolver=None, macro_cache=None,
+            macro_workers=None, macro_timeout=None,
+            macro_time_limits=None, render_deadline=None, macro_timing=None,
+            compact=False, tables=None):
         self.root = root
 
+        # The tables are the same for all renders, see: get_tables()
+        if tables is None:
+            tables = self.get_tables(compact)
+        self.node_tags, self.write_kinds = tables
+
+        self.compact = compact
+        if compact:
+            self.newline = ""
+            self.indent = ""
+            # The output of a block macro can be inline html, e.g.
+            # two <<html>> macros: <b>a</b>\n<b>b</b> must not be joined
+            self.macro_separator = " "
+        else:
+            self.newline = "\n"
+            self.indent = "\t"
+            self.macro_separator = "\n"
+
+        self.macro_workers = macro_workers
+        self.macro_timeout = macro_timeout
+        self.macro_time_limits = macro_time_limits or {}
+        self.render_deadline = render_deadline
+        self.macro_timing = macro_timing
+        self.macro_results = {} # node: html code of the concurrent called macros
+
+        self.headline_count = 0 # The number of emitted headlines
+        self.toc_headlines = 0 # The number of headlines added to the toc
+        self.toc_node = None # The macro node with the emitted toc
+
+        # Results of @cacheable macros, see creole.shared.macro_cache
+        if macro_cache is None:
+            self.macro_cache = default_macro_cache
+        else:
+            self.macro_cache = macro_cache
+
+        if link_resolver is None:
+            self.resolved_links = {}
+        else:
+            # One call with all targets, instead of one call per link
+            self.resolved_links = link_resolver(
+                frozenset(getattr(root, "used_links", ()))
+            ) or {}
+
 
         if callable(macros) == True:
             # was a DeprecationWarning in the past
@@ -115,23 +222,20 @@ class HtmlEmitter(object):
         else:
             self.macros = macros
 
+        # The toc is a state of this render, so it's never stored in the
+        # macros: A macros dict/object can be shared between threads.
         if not "toc" in root.used_macros:
             # The document has no <<toc>>
             self.toc = None
         else:
             if isinstance(self.macros, dict):
-                if "toc" in self.macros:
-                    self.toc = self.macros["toc"]
-                else:
-                    self.toc = TableOfContent()
-                    self.macros["toc"] = self.toc
+                toc = self.macros.get("toc", TableOfContent)
             else:
-                try:
-                    self.toc = getattr(self.macros, "toc")
-                except AttributeError:
-                    self.toc = TableOfContent()
-                    self.macros.toc = self.toc
-
+                toc = getattr(self.macros, "toc", TableOfContent)
+            if isinstance(toc, type):
+                # A TableOfContent class: create a new instance for every render
+                toc = toc()
+            self.toc = toc
 
         if verbose is None:
             self.verbose = 1
@@ -156,6 +260,105 @@ class HtmlEmitter(object):
     def attr_escape(self, text):
         return self.html_escape(text).replace('"', '&quot')
 
+    #--------------------------------------------------------------------------
+
+    # Start and end tags of nodes with children, see: get_tags()
+    node_tags = {
+        "document": ("", ""),
+        "paragraph": ("<p>", "</p>\n"),
+        "table": ("<table>\n", "</table>\n"),
+        "table_row": ("<tr>\n", "</tr>\n"),
+        "table_cell": ("\t<td>", "</td>\n"),
+        "table_head": ("\t<th>", "</th>\n"),
+    }
+    typeface_tags = {
+        "emphasis": "i",
+        "strong": "strong",
+        "monospace": "tt",
+        "superscript": "sup",
+        "subscript": "sub",
+        "underline": "u",
+        "small": "small",
+        "delete": "del",
+    }
+    list_tags = {
+        "bullet_list": "ul",
+        "number_list": "ol",
+        "list_item": "li",
+    }
+
+    @classmethod
+    def get_tables(cls, compact=False):
+        """
+        Returns (node_tags, write_kinds) of the emitter class. They don't
+        depend on the document, so they can be computed once and given
+        to every new emitter with tables=..., e.g. by a Converter.
+        """
+        node_tags = cls.node_tags
+        if compact:
+            # Remove the formatting newlines and tabs of the tags
+            node_tags = dict(
+                (kind, tuple(tag.replace("\n", "").replace("\t", "") for tag in tags))
+                for kind, tags in node_tags.items()
+            )
+        return node_tags, cls.get_write_kinds()
+
+    @classmethod
+    def get_write_kinds(cls):
+        """
+        Returns the node kinds that can be written by write_node(): All
+        kinds with tags, if the *_emit method isn't overwritten in a subclass.
+        """
+        def is_overwritten(method_name):
+            return getattr(cls, method_name) != getattr(HtmlEmitter, method_name)
+
+        kinds = set(["paragraph"])
+        kinds.update(cls.node_tags)
+        if not is_overwritten("_typeface"):
+            kinds.update(cls.typeface_tags)
+        if not is_overwritten("_list_emit"):
+            kinds.update(cls.list_tags)
+        return frozenset(
+            kind for kind in kinds if not is_overwritten("%s_emit" % kind)
+        )
+
+    def _list_tags(self, node, list_type):
+        indent = self.indent * node.level
+        if node.parent.kind in ("document",):
+            # The first list item
+            start = '%s<%s>' % (indent, list_type)
+        else:
+            start = '%s%s<%s>' % (self.newline, indent, list_type)
+
+        if list_type == "li":
+            end = '</%s>' % list_type
+        else:
+            end = '%s%s</%s>' % (self.newline, indent, list_type)
+        return start, end
+
+    def get_tags(self, node):
+        """
+        Returns (start tag, end tag) of a node with children or None, if the
+        node should be emitted with emit_node()
+        """
+        kind = node.kind
+        if kind == "paragraph":
+            if self.toc is not None and len(node.children) == 1 \
+                    and node.children[0].kind in ("macro_inline", "macro_block"):
+                # Maybe the <<toc>> alone in a paragraph, see: paragraph_emit()
+                return None
+            return self.node_tags[kind]
+        elif kind in self.typeface_tags:
+            tag = self.typeface_tags[kind]
+            return ("<%s>" % tag, "</%s>" % tag)
+        elif kind in self.list_tags:
+            return self._list_tags(node, self.list_tags[kind])
+        return self.node_tags.get(kind)
+
+    def _tags_emit(self, node):
+        start, end = self.node_tags[node.kind]
+        return start + self.emit_children(node) + end
+
     # *_emit methods for emitting nodes of the document:
 
     def document_emit(self, node):
@@ -165,32 +368,20 @@ class HtmlEmitter(object):
         return self.html_escape(node.content)
 
     def separator_emit(self, node):
-        return '<hr />\n\n'
+        return '<hr />' + self.newline * 2
 
     def paragraph_emit(self, node):
-        return '<p>%s</p>\n' % self.emit_children(node)
+        content = self.emit_children(node)
+        if self.toc_node is not None and len(node.children) == 1 \
+                                    and node.children[0] is self.toc_node:
+            # The <<toc>> macro alone in a paragraph
+            return content + self.newline
+        start, end = self.node_tags["paragraph"]
+        return start + content + end
 
     def _list_emit(self, node, list_type):
-        if node.parent.kind in ("document",):
-            # The first list item
-            formatter = ''
-        else:
-            formatter = '\n'
-
-        if list_type == "li":
-            formatter += (
-                '%(i)s<%(t)s>%(c)s</%(t)s>'
-            )
-        else:
-            formatter += (
-                '%(i)s<%(t)s>%(c)s\n'
-                '%(i)s</%(t)s>'
-            )
-        return formatter % {
-            "i": "\t" * node.level,
-            "c": self.emit_children(node),
-            "t": list_type,
-        }
+        start, end = self._list_tags(node, list_type)
+        return start + self.emit_children(node) + end
 
     def bullet_list_emit(self, node):
         return self._list_emit(node, list_type="ul")
@@ -202,16 +393,16 @@ class HtmlEmitter(object):
         return self._list_emit(node, list_type="li")
 
     def table_emit(self, node):
-        return '<table>\n%s</table>\n' % self.emit_children(node)
+        return self._tags_emit(node)
 
     def table_row_emit(self, node):
-        return '<tr>\n%s</tr>\n' % self.emit_children(node)
+        return self._tags_emit(node)
 
     def table_cell_emit(self, node):
-        return '\t<td>%s</td>\n' % self.emit_children(node)
+        return self._tags_emit(node)
 
     def table_head_emit(self, node):
-        return '\t<th>%s</th>\n' % self.emit_children(node)
+        return self._tags_emit(node)
 
     #--------------------------------------------------------------------------
 
@@ -242,17 +433,15 @@ class HtmlEmitter(object):
     #--------------------------------------------------------------------------
 
     def header_emit(self, node):
-        header = '<h%d>%s</h%d>' % (
-                node.level, self.html_escape(node.content), node.level
-        )
+        content = self.html_escape(node.content)
+        header = '<h%d>%s</h%d>' % (node.level, content, node.level)
         if self.toc is not None:
-            self.toc.add_headline(node.level, node.content)
+            # The headline is added to the toc in render_toc()
+            self.headline_count += 1
             # add link attribute for toc navigation
-            header = '<a name="%s">%s</a>' % (
-                self.html_escape(node.content), header
-            )
+            header = '<a name="%s">%s</a>' % (content, header)
 
-        header += "\n"
+        header += self.newline
         return header
 
     def preformatted_emit(self, node):
@@ -265,8 +454,15 @@ class HtmlEmitter(object):
         else:
             inside = self.html_escape(target)
 
+        href, css_class = self.resolved_links.get(target, (None, None))
+        if href is None:
+            href = target
+        if css_class:
+            return '<a href="%s" class="%s">%s</a>' % (
+                self.attr_escape(href), self.attr_escape(css_class), inside)
+
         return '<a href="%s">%s</a>' % (
-            self.attr_escape(target), inside)
+            self.attr_escape(href), inside)
 
     def image_emit(self, node):
         target = node.content
@@ -276,6 +472,101 @@ class HtmlEmitter(object):
             self.attr_escape(target), text, text)
 
     def macro_emit(self, node):
+        try:
+            return self.macro_results[node]
+        except KeyError:
+            pass
+        if self.toc is not None and node.macro_name == "toc":
+            return self.render_toc(node)
+        return self.render_macro(node)
+    macro_inline_emit = macro_emit
+    macro_block_emit = macro_emit
+
+    def iter_macro_nodes(self, node):
+        """ Generate all macro nodes in document order. """
+        for child in node.children:
+            if child.kind in ("macro_inline", "macro_block"):
+                yield child
+            else:
+                for macro_node in self.iter_macro_nodes(child):
+                    yield macro_node
+
+    def use_macro_runner(self):
+        """ True, if the macros are called before the emitting, see: run_macros() """
+        return bool(self.macro_workers or self.macro_timeout is not None
+            or self.macro_time_limits or self.render_deadline is not None)
+
+    def run_macros(self):
+        """
+        Render all macros concurrently, before the document is emitted.
+        The toc macro must be called in document order, so it's skipped.
+        """
+        calls = []
+        timeouts = {}
+        for node in self.iter_macro_nodes(self.root):
+            if self.toc is not None and node.macro_name == "toc":
+                continue
+            calls.append((node, partial(self.render_macro, node)))
+            if node.macro_name in self.macro_time_limits:
+                timeouts[node] = self.macro_time_limits[node.macro_name]
+
+        runner = MacroRunner(
+            workers=self.macro_workers or 1,
+            timeout=self.macro_timeout, deadline=self.render_deadline
+        )
+        self.macro_results = runner.run(calls, timeouts)
+
+        for node, _ in calls:
+            duration = runner.durations[node]
+            timed_out = node not in self.macro_results
+            if self.macro_timing is not None:
+                self.macro_timing(node.macro_name, duration, timed_out)
+            elif self.verbose > 1:
+                self.stderr.write("Macro '%s' run time: %.1f ms%s\n" % (
+                    node.macro_name, duration * 1000,
+                    " (timeout)" if timed_out else ""
+                ))
+
+        for node in runner.timed_out:
+            self.macro_results[node] = self.error(
+                "Macro '%s' timeout after %s sec." % (
+                    node.macro_name, timeouts.get(node, self.macro_timeout)
+                )
+            )
+        for node in runner.deadline_exceeded:
+            self.macro_results[node] = self.error(
+                "Macro '%s' exceeded the render deadline of %s sec." % (
+                    node.macro_name, self.render_deadline
+                )
+            )
+
+    def render_toc(self, node):
+        """
+        Emit the toc in place: All headlines are collected by the parser,
+        so the toc is complete before the headlines after it are emitted.
+        The headlines are added to the toc in the same order as in the
+        document, before and after the toc macro call, because the toc
+        'depth' argument is used only for the headlines after the macro.
+        """
+        headlines = self.root.headlines
+        for level, content in headlines[self.toc_headlines:self.headline_count]:
+            self.toc.add_headline(level, content)
+        self.toc_headlines = self.headline_count
+
+        result = self.render_macro(node)
+        if not result.startswith("<<toc>>"):
+            # A error or the second <<toc>> macro
+            return result
+
+        for level, content in headlines[self.headline_count:]:
+            self.toc.add_headline(level, content)
+        self.toc_headlines = len(headlines)
+
+        self.toc_node = node
+        return self.toc.get_html(compact=self.compact) + result[len("<<toc>>"):]
+
+    def render_macro(self, node):
+        """ Call the macro and returns the html code or a error message. """
         #print(node.debug())
         macro_name = node.macro_name
         text = node.content
@@ -296,11 +587,16 @@ class HtmlEmitter(object):
         macro_kwargs["text"] = text
 
         exc_info = None
-        if isinstance(self.macros, dict):
+        if macro_name == "toc" and self.toc is not None:
+            macro = self.toc
+        elif isinstance(self.macros, dict):
             try:
                 macro = self.macros[macro_name]
             except KeyError as e:
                 exc_info = sys.exc_info()
+            except MacroImportError as err:
+                # e.g. a broken "module:function" path in a MacroRegistry
+                return self.error(TEXT_TYPE(err), err.exc_info)
         else:
             try:
                 macro = getattr(self.macros, macro_name)
@@ -313,8 +609,16 @@ class HtmlEmitter(object):
                 exc_info
             )
 
+        cache_key = get_cache_key(macro, macro_name, args, text)
+        if cache_key is not None:
+            result = self.macro_cache.get(cache_key)
+            if result is not None:
+                if node.kind == "macro_block":
+                    result += self.macro_separator
+                return result
+
         try:
-            result = macro(**macro_kwargs)
+            result = run_coroutine(macro(**macro_kwargs))
         except TypeError as err:
             msg = "Macro '%s' error: %s" % (macro_name, err)
             exc_info = sys.exc_info()
@@ -351,27 +655,31 @@ class HtmlEmitter(object):
                 msg += " - returns: %r, type %r" % (result, type(result))
             return self.error(msg)
 
+        if cache_key is not None:
+            self.macro_cache.set(cache_key, result)
+
         if node.kind == "macro_block":
-            result += "\n"
+            result += self.macro_separator
 
         return result
-    macro_inline_emit = macro_emit
-    macro_block_emit = macro_emit
 
     def break_emit(self, node):
         if node.parent.kind == "list_item":
-            return "<br />\n" + "\t" * node.parent.level
+            return "<br />" + self.newline + self.indent * node.parent.level
         elif node.parent.kind in ("table_head", "table_cell"):
-            return "<br />\n\t\t"
+            return "<br />" + self.newline + self.indent * 2
         else:
-            return "<br />\n"
+            return "<br />" + self.newline
 
     def line_emit(self, node):
+        if node.parent.kind == "document":
+            # Only a empty line between two blocks
+            return self.newline
         return "\n"
 
     def pre_block_emit(self, node):
         """ pre block, with newline at the end """
-        return "<pre>%s</pre>\n" % self.html_escape(node.content)
+        return "<pre>%s</pre>%s" % (self.html_escape(node.content), self.newline)
 
     def pre_inline_emit(self, node):
         """ pre without newline at the end """
@@ -391,13 +699,41 @@ class HtmlEmitter(object):
         emit = getattr(self, '%s_emit' % node.kind, self.default_emit)
         return emit(node)
 
-    def emit(self):
-        """Emit the document represented by self.root DOM tree."""
-        document = self.emit_node(self.root).strip()
-        if self.toc is not None:
-            return self.toc.emit(document)
-        else:
-            return document
+    def write_node(self, node, write):
+        """
+        Write the html code of a node with write(), e.g. a list.append():
+        The start and end tags are written around the children, so the
+        html code of the children is not copied into the html of the parents.
+        """
+        tags = None
+        if node.kind in self.write_kinds:
+            tags = self.get_tags(node)
+        if tags is None:
+            write(self.emit_node(node))
+            return
+
+        start, end = tags
+        write(start)
+        for child in node.children:
+            self.write_node(child, write)
+        write(end)
+
+    def emit(self, out=None, encoding=None):
+        """
+        Emit the document represented by self.root DOM tree.
+        If a file-like object is given, the html code would be written
+        into out (encoded, if a encoding is given) and None returned.
+        """
+        if self.use_macro_runner():
+            self.run_macros()
+        if out is None:
+            fragments = []
+            self.write_node(self.root, fragments.append)
+            return "".join(fragments).strip()
+
+        writer = OutputWriter(out, encoding=encoding)
+        self.write_node(self.root, writer.write)
+        writer.close()
 
     def error(self, text, exc_info=None):
         """
@@ -416,6 +752,9 @@ class HtmlEmitter(object):
 
 
 if __name__ == "__main__":
+    import doctest
+    print(doctest.testmod())
+
     txt = """Local test
 <<toc>>
 = headline 1 level 1
@@ -0,0 +1,211 @@
+# coding: utf-8
+
+
+"""
+    WikiCreole to html document tree converter
+
+    Build the same document tree, that HtmlParser would create from the
+    html code of the HtmlEmitter. So the html emitters (html2creole,
+    html2rest, html2textile) can be used without the html round trip.
+
+    :copyleft: 2008-2015 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+from creole.emitter.creol2html_emitter import HtmlEmitter
+from creole.parser.html_parser import HtmlParser, block_re
+from creole.html_tools.strip_html import strip_html_tree
+from creole.shared.document_tree import DocNode
+
+
+class HtmlTreeEmitter(HtmlEmitter):
+    """
+    Generate a html document tree (like HtmlParser) for the document
+    tree consisting of creole DocNodes.
+    """
+    def __init__(self, *args, **kwargs):
+        super(HtmlTreeEmitter, self).__init__(*args, **kwargs)
+        self.cur = None
+        self._list_level = 0
+        self._toc_node = None
+        self._line_start = True
+
+    #--------------------------------------------------------------------------
+
+    def _add_data(self, text):
+        if text:
+            DocNode("data", self.cur, text)
+
+    def _add_tag(self, kind, node, attrs=(), level=None):
+        parent = self.cur
+        self.cur = DocNode(kind, parent, None, attrs, level)
+        self.emit_children(node)
+        self.cur = parent
+
+    def _add_html(self, html):
+        """ add the document tree of the given html code, e.g. macro output """
+        html_stripped = html.strip()
+        if not html_stripped:
+            self._add_data(html)
+            return
+
+        start = html.index(html_stripped)
+        self._add_data(html[:start])
+        for child in HtmlParser().feed(html_stripped).children:
+            child.parent = self.cur
+            self.cur.children.append(child)
+        self._add_data(html[start + len(html_stripped):])
+
+    #--------------------------------------------------------------------------
+    # *_emit methods for emitting nodes of the document:
+
+    def document_emit(self, node):
+        previous = None
+        for child in node.children:
+            # The html code of a list doesn't end with a newline
+            self._line_start = previous is None or previous.kind not in ("bullet_list", "number_list")
+            self.emit_node(child)
+            previous = child
+
+    def text_emit(self, node):
+        self._add_data(node.content)
+
+    def separator_emit(self, node):
+        DocNode("hr", self.cur)
+
+    def paragraph_emit(self, node):
+        self._add_tag("p", node)
+
+    def _list_emit(self, node, list_type):
+        if list_type == "li":
+            self._add_tag(list_type, node, level=self._list_level)
+        else:
+            if node.parent.kind != "document":
+                self._add_data("\n") # nested list starts in a new line
+            self._list_level += 1
+            self._add_tag(list_type, node, level=self._list_level)
+            self._list_level -= 1
+
+    def table_emit(self, node):
+        self._add_tag("table", node)
+
+    def table_row_emit(self, node):
+        self._add_tag("tr", node)
+
+    def table_cell_emit(self, node):
+        self._add_tag("td", node)
+
+    def table_head_emit(self, node):
+        self._add_tag("th", node)
+
+    def _typeface(self, node, tag):
+        self._add_tag(tag, node)
+
+    def header_emit(self, node):
+        if self.toc is not None:
+            self.toc.add_headline(node.level, node.content)
+        headline = DocNode("headline", self.cur, level=node.level)
+        DocNode("data", headline, node.content)
+
+    def link_emit(self, node):
+        target = node.content
+        href, css_class = self.resolved_links.get(target, (None, None))
+        if href is None:
+            href = target
+        attrs = [("href", href)]
+        if css_class:
+            attrs.append(("class", css_class))
+
+        parent = self.cur
+        self.cur = DocNode("a", parent, None, attrs)
+        if node.children:
+            self.emit_children(node)
+        else:
+            self._add_data(node.content)
+        self.cur = parent
+
+    def image_emit(self, node):
+        text = self.get_text(node)
+        DocNode("img", self.cur, None, (
+            ("src", node.content), ("title", text), ("alt", text)
+        ))
+
+    def macro_emit(self, node):
+        result = super(HtmlTreeEmitter, self).macro_emit(node)
+        if (node.macro_name == "toc" and result.startswith("<<toc>>")
+                and self.toc is not None and self._toc_node is None):
+            # placeholder for the table of content, see _emit_toc()
+            # A block macro ends with the macro separator
+            self._toc_node = DocNode("toc", self.cur)
+            result = result[len("<<toc>>"):]
+        if result:
+            self._add_html(result)
+    macro_inline_emit = macro_emit
+    macro_block_emit = macro_emit
+
+    def render_toc(self, node):
+        # The toc would be inserted in emit(), see _emit_toc()
+        return self.render_macro(node)
+
+    def break_emit(self, node):
+        DocNode("br", self.cur)
+
+    def line_emit(self, node):
+        self._add_data("\n")
+
+    def pre_block_emit(self, node):
+        content = self.html_escape(node.content)
+        match = block_re.match("<pre>%s</pre>" % content)
+        if match is None or not self._line_start:
+            # HtmlParser cuts it out as a inline <pre> area
+            DocNode("inlinedata_pre", self.cur, content)
+            self._add_data("\n")
+        else:
+            DocNode("blockdata_pre", self.cur, match.group("pre_block"))
+
+    def pre_inline_emit(self, node):
+        tt = DocNode("tt", self.cur)
+        DocNode("data", tt, node.content)
+
+    def emit_children(self, node):
+        """Emit all the children of a node."""
+        for child in node.children:
+            self.emit_node(child)
+
+    def emit(self):
+        """Emit the document tree represented by self.root DOM tree."""
+        if self.use_macro_runner():
+            self.run_macros()
+        self.cur = DocNode("document", None)
+        self.emit_node(self.root)
+        if self.toc is not None:
+            self._emit_toc()
+        strip_html_tree(self.cur)
+        return self.cur
+
+    def _emit_toc(self):
+        """ replace the <<toc>> macro placeholder with the toc list """
+        node = self._toc_node
+        if node is None:
+            return
+
+        html = self.toc.get_html()
+        toc_nodes = HtmlParser().feed(html).children
+
+        parent = node.parent
+        if parent.kind == "p" and len(parent.children) == 1:
+            # The <<toc>> macro alone in a paragraph
+            node, parent = parent, parent.parent
+
+        for toc_node in toc_nodes:
+            toc_node.parent = parent
+        index = parent.children.index(node)
+        parent.children[index:index + 1] = toc_nodes
+
+
+if __name__ == '__main__':
+    import doctest
+    print(doctest.testmod())
@@ -28,8 +28,13 @@ class CreoleEmitter(BaseEmitter):
         self.table_head_prefix = "= "
         self.table_auto_width = True
 
-    def emit(self):
-        """Emit the document represented by self.root DOM tree."""
+    def emit(self, out=None, encoding=None):
+        """
+        Emit the document represented by self.root DOM tree.
+        With a file-like object, the markup is written into out.
+        """
+        if out is not None:
+            return self.write_to(out, encoding)
         return self.emit_node(self.root).strip() # FIXME
 
     #--------------------------------------------------------------------------
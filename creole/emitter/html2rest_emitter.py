@@ -77,10 +77,21 @@ class ReStructuredTextEmitter(BaseEmitter):
         """Emit all the children of a node."""
         return "".join(self.emit_children_list(node))
 
-    def emit(self):
-        """Emit the document represented by self.root DOM tree."""
+    def emit(self, out=None, encoding=None):
+        """
+        Emit the document represented by self.root DOM tree.
+        With a file-like object, the markup is written into out.
+        """
+        if out is not None:
+            return self.write_to(out, encoding, lstrip=False)
         return self.emit_node(self.root).rstrip()
 
+    def write_document(self, write):
+        super(ReStructuredTextEmitter, self).write_document(write)
+        if self._substitution_data:
+            # add rest at the end, see: document_emit()
+            write("%s\n\n" % self._get_block_data())
+
     def document_emit(self, node):
         self.last = node
         result = self.emit_children(node)
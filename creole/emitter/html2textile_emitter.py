@@ -29,8 +29,13 @@ class TextileEmitter(BaseEmitter):
         self.table_head_prefix = "_. "
         self.table_auto_width = False
 
-    def emit(self):
-        """Emit the document represented by self.root DOM tree."""
+    def emit(self, out=None, encoding=None):
+        """
+        Emit the document represented by self.root DOM tree.
+        With a file-like object, the markup is written into out.
+        """
+        if out is not None:
+            return self.write_to(out, encoding)
         return self.emit_node(self.root).strip() # FIXME
 
     #--------------------------------------------------------------------------
@@ -95,7 +100,10 @@ class TextileEmitter(BaseEmitter):
 
     def a_emit(self, node):
         link_text = self.emit_children(node)
-        url = node.attrs["href"]
+        url = node.attrs.get("href", None)
+        if url is None:
+            # e.g.: <a name="anchor-one">foo</a>
+            return link_text
         return '"%s":%s' % (link_text, url)
 
     def img_emit(self, node):
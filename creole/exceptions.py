@@ -13,3 +13,13 @@ from __future__ import division, absolute_import, print_function, unicode_litera
 
 class DocutilsImportError(ImportError):
     pass
+
+
+class MacroImportError(ImportError):
+    """
+    A "module:function" macro of a MacroRegistry can't be imported.
+    exc_info is the sys.exc_info() of the import error.
+    """
+    def __init__(self, message, exc_info=None):
+        super(MacroImportError, self).__init__(message)
+        self.exc_info = exc_info
@@ -20,17 +20,29 @@ except ImportError:
 
 from creole.py3compat import PY3
 
+if PY3:
+    unichr = chr
 
+
+# Only the entity groups are named, for the match.lastgroup dispatch:
 entities_rules = '|'.join([
-    r"(&\#(?P<number>\d+);)",
-    r"(&\#x(?P<hex>[a-fA-F0-9]+);)",
-    r"(&(?P<named>[a-zA-Z]+);)",
+    r"&\#(?P<number>\d+);",
+    r"&\#x(?P<hex>[a-fA-F0-9]+);",
+    r"&(?P<named>[a-zA-Z]+);",
 ])
 #print(entities_rules)
 entities_regex = re.compile(
     entities_rules, re.VERBOSE | re.UNICODE | re.MULTILINE
 )
 
+# Named entity -> replacement text
+NAMED_ENTITIES = dict(
+    (name, unichr(codepoint))
+    for name, codepoint in entities.name2codepoint.items()
+)
+# Replace non breaking spaces with normal spaces
+NAMED_ENTITIES["nbsp"] = " "
+
 
 class Deentity(object):
     """
@@ -50,47 +62,45 @@ class Deentity(object):
     >>> d.replace_named("amp")
     '&'
     """
+    def __init__(self):
+        # regex group name -> replace method
+        self._replace_methods = {
+            "number": self.replace_number,
+            "hex": self.replace_hex,
+            "named": self.replace_named,
+        }
+
     def replace_number(self, text):
         """ unicode number entity """
-        unicode_no = int(text)
-        if PY3:
-            return chr(unicode_no)
-        else:
-            return unichr(unicode_no)
+        return unichr(int(text))
 
     def replace_hex(self, text):
         """ hex entity """
-        unicode_no = int(text, 16)
-        if PY3:
-            return chr(unicode_no)
-        else:
-            return unichr(unicode_no)
+        return unichr(int(text, 16))
 
     def replace_named(self, text):
         """ named entity """
-        if text == "nbsp":
-            # Non breaking spaces is not in htmlentitydefs
-            return " "
-        else:
-            codepoint = entities.name2codepoint[text]
-            if PY3:
-                return chr(codepoint)
-            else:
-                return unichr(codepoint)
+        return NAMED_ENTITIES[text]
+
+    def _replace_entity(self, match):
+        name = match.lastgroup
+        try:
+            return self._replace_methods[name](match.group(name))
+        except (KeyError, ValueError, OverflowError):
+            # A unknown entity or not a valid unicode character
+            return match.group(0)
 
     def replace_all(self, content):
-        """ replace all html entities form the given text. """
-        def replace_entity(match):
-            groups = match.groupdict()
-            for name, text in groups.items():
-                if text is not None:
-                    replace_method = getattr(self, 'replace_%s' % name)
-                    return replace_method(text)
-
-            # Should never happen:
-            raise RuntimeError("deentitfy re rules wrong!")
-
-        return entities_regex.sub(replace_entity, content)
+        """
+        replace all html entities form the given text.
+        Unknown entities are kept as they are:
+
+        >>> Deentity().replace_all("&foo; &#99999999; &amp;")
+        '&foo; &#99999999; &'
+        """
+        if "&" not in content:
+            return content
+        return entities_regex.sub(self._replace_entity, content)
 
 
 if __name__ == '__main__':
@@ -16,6 +16,16 @@ from __future__ import division, absolute_import, print_function, unicode_litera
 import re
 
 from creole.parser.html_parser_config import BLOCK_TAGS
+from creole.shared.document_tree import DocNode
+
+
+# Nodes witch are single html tags, e.g.: <br />
+STARTEND_KINDS = ("br", "hr", "img")
+
+# Nodes witch are text in the html code
+TEXT_KINDS = ("data", "entityref", "charref")
+
+newline_re = re.compile(r"[^\S\n]*\n[^\S\n]*", re.UNICODE)
 
 
 strip_html_regex = re.compile(
@@ -108,6 +118,152 @@ def strip_html(html_code):
     return clean_data
 
 
+
+def _flat_tokens(node, tokens):
+    """
+    Build a flat list of (token type, node) tuples in html code order.
+    """
+    for child in node.children:
+        kind = child.kind
+        if kind in TEXT_KINDS:
+            tokens.append((kind, child))
+        elif kind in STARTEND_KINDS or kind.startswith(("blockdata_", "inlinedata_")):
+            tokens.append(("startend", child))
+        else:
+            tokens.append(("start", child))
+            _flat_tokens(child, tokens)
+            tokens.append(("end", child))
+    return tokens
+
+
+def _insert_data(node, text, after):
+    """ insert a new data node before/after the given node """
+    parent = node.parent
+    index = parent.children.index(node)
+    if after:
+        index += 1
+    data = DocNode("data", None, text)
+    data.parent = parent
+    parent.children.insert(index, data)
+    return data
+
+
+def strip_html_tree(root):
+    """
+    Delete whitespace from a html document tree, in the same way as
+    strip_html() does it for html code.
+
+    >>> root = DocNode("document")
+    >>> p = DocNode("p", root)
+    >>> data = DocNode("data", p, " one ")
+    >>> strong = DocNode("strong", p)
+    >>> data = DocNode("data", strong, " two ")
+    >>> data = DocNode("data", p, " three ")
+    >>> strip_html_tree(root)
+    >>> [child.content for child in p.children]
+    ['one ', None, ' three']
+    >>> strong.children[0].content
+    'two'
+    """
+    _cleanup_data(root)
+    tokens = _flat_tokens(root, [])
+
+    for index, (token_type, node) in enumerate(tokens):
+        if token_type == "data":
+            if index > 0 and tokens[index - 1][1].kind.startswith("blockdata_"):
+                # HtmlParser cuts out <pre> blocks with all following whitespace
+                node.content = node.content.lstrip()
+            # whitespace at the start of a line, or before a "\n" would be
+            # removed and the lines joined with " "
+            if "\n" in node.content:
+                node.content = newline_re.sub(" ", node.content)
+    if tokens and tokens[0][0] == "data":
+        tokens[0][1].content = tokens[0][1].content.lstrip()
+    if tokens and tokens[-1][0] == "data":
+        tokens[-1][1].content = tokens[-1][1].content.rstrip()
+
+    # Number of chars at the start of a data node, witch are inserted and
+    # can't be removed by the following tag:
+    protected = {}
+
+    index = 0
+    while index < len(tokens):
+        token_type, node = tokens[index]
+        if token_type in TEXT_KINDS:
+            index += 1
+            continue
+
+        whitespace_before = ""
+        data_before = None
+        if index > 0 and tokens[index - 1][0] == "data":
+            data_before = tokens[index - 1][1]
+            content = data_before.content
+            keep = protected.get(id(data_before), 0)
+            stripped = content[keep:].rstrip()
+            whitespace_before = content[keep + len(stripped):]
+            data_before.content = content[:keep] + stripped
+
+        whitespace_after = ""
+        data_after = None
+        if index + 1 < len(tokens) and tokens[index + 1][0] == "data":
+            data_after = tokens[index + 1][1]
+            content = data_after.content
+            stripped = content.lstrip()
+            whitespace_after = content[:len(content) - len(stripped)]
+            data_after.content = stripped
+
+        kind = node.kind
+        if kind in BLOCK_TAGS or kind == "headline":
+            index += 1
+            continue
+
+        space_start = whitespace_before.startswith(" ")
+        space_end = whitespace_after.endswith(" ")
+
+        if token_type == "start":
+            add_before = space_start or space_end
+            add_after = False
+        elif token_type == "end":
+            add_before = False
+            add_after = space_start or space_end
+        else:
+            add_before = space_start
+            add_after = space_end
+
+        if add_before:
+            if data_before is not None:
+                data_before.content += " "
+            else:
+                _insert_data(node, " ", after=False)
+
+        if add_after:
+            if data_after is None:
+                data_after = _insert_data(node, "", after=True)
+                tokens.insert(index + 1, ("data", data_after))
+            data_after.content = " " + data_after.content
+            protected[id(data_after)] = protected.get(id(data_after), 0) + 1
+
+        index += 1
+
+    _cleanup_data(root)
+
+
+def _cleanup_data(node):
+    """ remove empty data nodes and merge neighboring data nodes """
+    children = []
+    for child in node.children:
+        if child.kind == "data":
+            if not child.content:
+                continue
+            if children and children[-1].kind == "data":
+                children[-1].content += child.content
+                continue
+        else:
+            _cleanup_data(child)
+        children.append(child)
+    node.children = children
+
+
 if __name__ == '__main__':
     import doctest
     print(doctest.testmod())
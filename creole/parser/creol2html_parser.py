@@ -27,7 +27,7 @@ from __future__ import division, absolute_import, print_function, unicode_litera
 import re
 
 from creole.parser.creol2html_rules import BlockRules, INLINE_FLAGS, INLINE_RULES, \
-    SpecialRules, InlineRules
+    INLINE_TRIGGER_FLAGS, INLINE_TRIGGER_RULE, SpecialRules, InlineRules
 from creole.py3compat import TEXT_TYPE
 from creole.shared.document_tree import DocNode
 
@@ -58,16 +58,20 @@ class CreoleParser(object):
     # For inline elements:
     inline_re = re.compile('|'.join(INLINE_RULES), INLINE_FLAGS)
 
+    # For finding the next position where a inline element may start:
+    inline_trigger_re = re.compile(INLINE_TRIGGER_RULE, INLINE_TRIGGER_FLAGS)
 
-    def __init__(self, raw, block_rules=None, blog_line_breaks=True):
+
+    def __init__(self, raw, block_rules=None, blog_line_breaks=True, block_re=None):
         assert isinstance(raw, TEXT_TYPE)
         self.raw = raw
 
-        if block_rules is None:
-            block_rules = BlockRules(blog_line_breaks=blog_line_breaks)
+        if block_re is None:
+            # The compiled block rules can be reused, see: creole.Converter
+            block_re = self.compile_block_rules(block_rules, blog_line_breaks)
 
         # setup block element rules:
-        self.block_re = re.compile('|'.join(block_rules.rules), block_rules.re_flags)
+        self.block_re = block_re
 
         self.blog_line_breaks = blog_line_breaks
 
@@ -78,6 +82,27 @@ class CreoleParser(object):
 
         # Filled with all macros that's in the text
         self.root.used_macros = set()
+        self.root.used_links = set() # All link targets, see HtmlEmitter.link_resolver
+        self.root.headlines = [] # (level, text) of all headlines for the toc
+
+    # The compiled default block rules: blog_line_breaks -> block_re
+    _default_block_re = {}
+
+    @classmethod
+    def compile_block_rules(cls, block_rules=None, blog_line_breaks=True):
+        """
+        Returns the compiled block rules. The default rules are compiled
+        only once and shared by all parsers, e.g. by CreoleTextParser.
+        """
+        if block_rules is None:
+            try:
+                return cls._default_block_re[blog_line_breaks]
+            except KeyError:
+                block_rules = BlockRules(blog_line_breaks=blog_line_breaks)
+                block_re = re.compile('|'.join(block_rules.rules), block_rules.re_flags)
+                cls._default_block_re[blog_line_breaks] = block_re
+                return block_re
+        return re.compile('|'.join(block_rules.rules), block_rules.re_flags)
 
     #--------------------------------------------------------------------------
 
@@ -145,6 +170,7 @@ class CreoleParser(object):
         if not groups.get('escaped_url'):
             # this url is NOT escaped
             target = groups.get('url_target', "")
+            self.root.used_links.add(target)
             node = DocNode('link', self.cur)
             node.content = target
             DocNode('text', node, node.content)
@@ -162,6 +188,7 @@ class CreoleParser(object):
         """Handle all kinds of links."""
         target = groups.get('link_target', "")
         text = (groups.get('link_text', "") or "").strip()
+        self.root.used_links.add(target)
         parent = self.cur
         self.cur = DocNode('link', self.cur)
         self.cur.content = target
@@ -301,6 +328,7 @@ class CreoleParser(object):
         self._upto_block()
         node = DocNode('header', self.cur, groups['head_text'].strip())
         node.level = len(groups['head_head'])
+        self.root.headlines.append((node.level, node.content))
         self.text = None
     _head_head_repl = _head_repl
     _head_text_repl = _head_repl
@@ -418,6 +446,18 @@ class CreoleParser(object):
             self.text = DocNode('text', self.cur, "")
         self.text.content += groups.get('char', "")
 
+    def _add_text(self, text):
+        """
+        Add plain text, without any inline markup.
+        Same result as _char_repl() for every character, except newlines:
+        They are not matched by the "char" rule and therefore dropped.
+        """
+        text = text.replace("\n", "")
+        if text:
+            if self.text is None:
+                self.text = DocNode('text', self.cur, "")
+            self.text.content += text
+
     #--------------------------------------------------------------------------
 
     def _replace(self, match):
@@ -439,8 +479,30 @@ class CreoleParser(object):
                 return
 
     def parse_inline(self, raw):
-        """Recognize inline elements inside blocks."""
-        re.sub(self.inline_re, self._replace, raw)
+        """
+        Recognize inline elements inside blocks.
+
+        The complete inline_re would only be matched at positions where
+        a inline element may start (see INLINE_TRIGGER_RULE). The text
+        between these positions is added in one piece.
+        """
+        search_trigger = self.inline_trigger_re.search
+        match_inline = self.inline_re.match
+        pos = 0
+        end = len(raw)
+        while pos < end:
+            trigger = search_trigger(raw, pos)
+            if trigger is None:
+                self._add_text(raw[pos:])
+                break
+
+            start = trigger.start()
+            if start > pos:
+                self._add_text(raw[pos:start])
+
+            match = match_inline(raw, start)
+            self._replace(match)
+            pos = match.end()
 
     def parse_block(self, raw):
         """Recognize block elements."""
@@ -448,8 +510,10 @@ class CreoleParser(object):
 
     def parse(self):
         """Parse the text given as self.raw and return DOM tree."""
-        # convert all lineendings to \n
-        text = self.raw.replace("\r\n", "\n").replace("\r", "\n")
+        text = self.raw
+        if "\r" in text:
+            # convert all lineendings to \n
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
         self.parse_block(text)
         return self.root
 
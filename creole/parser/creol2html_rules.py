@@ -220,6 +220,16 @@ INLINE_RULES = (
     InlineRules.escape, InlineRules.char
 )
 
+# All characters witch can start one of the INLINE_RULES, except the "char"
+# fallback. A url can only start at the beginning or after whitespace.
+# Used to skip plain text in CreoleParser.parse_inline()
+INLINE_TRIGGER_FLAGS = INLINE_FLAGS | re.IGNORECASE
+INLINE_TRIGGER_RULE = r'''
+        [\[<{*/\#^,_\-~\\]
+    |
+        (?<!\S) (%s) ://
+''' % InlineRules.proto
+
 
 def _verify_rules(rules, flags):
     """
@@ -231,6 +241,9 @@ def _verify_rules(rules, flags):
     >>> block_rules = BlockRules()   
     >>> _verify_rules(block_rules.rules, block_rules.re_flags)
     Rule test ok.
+
+    >>> _verify_rules((INLINE_TRIGGER_RULE,), INLINE_TRIGGER_FLAGS)
+    Rule test ok.
     """
     # Test with re.compile
     rule_list = []
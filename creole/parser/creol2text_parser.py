@@ -0,0 +1,327 @@
+# coding: utf-8
+
+
+"""
+    Creole markup to plain text
+
+    Extract only the text content from creole markup, e.g. for a full-text
+    search index. The same block and inline rules as in CreoleParser are
+    used, but no document tree and no html code would be build.
+
+    :copyleft: 2008-2015 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import sys
+
+from creole.parser.creol2html_parser import CreoleParser
+from creole.py3compat import TEXT_TYPE
+
+
+# Before python 3.7 re.sub() skips a empty match directly after the
+# previous match, but finditer() doesn't.
+SKIP_ADJACENT_EMPTY = sys.version_info < (3, 7)
+
+
+def iter_block_matches(block_re, text):
+    """
+    Generate the matches of the block rules in the same way as re.sub()
+    finds them for CreoleParser.parse_block(), without collecting them.
+    """
+    last_end = None
+    for match in block_re.finditer(text):
+        if SKIP_ADJACENT_EMPTY and match.start() == match.end() == last_end:
+            continue
+        last_end = match.end()
+        yield match
+
+
+class CreoleTextParser(object):
+    """
+    Generate the plain text of all blocks in the creole markup.
+
+    >>> def text(markup, **kwargs):
+    ...     for block in CreoleTextParser(markup, **kwargs).iter_blocks():
+    ...         print(block)
+    >>> text('''
+    ... == Headline
+    ... A **[[/url/|link]]** and a {{image.png|image}}
+    ... * item 1
+    ... * item 2
+    ... ''')
+    Headline
+    A link and a image
+    item 1
+    item 2
+
+    Table cells are separated with tabs:
+
+    >>> list(CreoleTextParser('|=a|=b|\\n|cell|cell|').iter_blocks()) == ['a\\tb\\ncell\\tcell']
+    True
+
+    Pre blocks and the text of macros are optional:
+
+    >>> markup = '''
+    ... {{{
+    ... pre block
+    ... }}}
+    ... A <<macro>>text<</macro>> macro
+    ... '''
+    >>> text(markup)
+    pre block
+    A  macro
+    >>> text(markup, include_pre=False, include_macros=True)
+    A text macro
+    """
+    # Use the compiled rules of the CreoleParser:
+    inline_re = CreoleParser.inline_re
+    inline_trigger_re = CreoleParser.inline_trigger_re
+    link_re = CreoleParser.link_re
+    item_re = CreoleParser.item_re
+    cell_re = CreoleParser.cell_re
+    pre_escape_re = CreoleParser.pre_escape_re
+
+    def __init__(self, raw, block_rules=None, blog_line_breaks=True,
+            include_pre=True, include_macros=False, block_re=None):
+        assert isinstance(raw, TEXT_TYPE)
+        self.raw = raw
+
+        if block_re is None:
+            # The same compiled block rules as CreoleParser, see: creole.Converter
+            block_re = CreoleParser.compile_block_rules(block_rules, blog_line_breaks)
+        self.block_re = block_re
+        self.groupnames = set(self.block_re.groupindex)
+
+        self.include_pre = include_pre
+        self.include_macros = include_macros
+
+        self.block = None   # The kind of the current block
+        self.parts = []     # The text parts of the current block
+        self.blocks = []    # Complete blocks, not yielded yet
+        self.lists = []     # (kind, level) of all open lists in a list block
+        self.break_index = None # Index of the last line break in self.parts
+
+    def _end_block(self, kind=None):
+        """ complete the current block and start a new one """
+        text = "".join(self.parts).strip()
+        if text:
+            self.blocks.append(text)
+        self.parts = []
+        self.block = kind
+        self.lists = []
+        self.break_index = None
+
+    def cleanup_break(self, start=0):
+        """
+        remove the line break at the end, if it's added after the start
+        index, see: CreoleParser.cleanup_break()
+        """
+        index = len(self.parts) - 1
+        if index >= start and index == self.break_index:
+            del self.parts[-1]
+            self.break_index = None
+
+    def _add_block(self, text):
+        """ add a block, that can't contain other blocks, e.g. a headline """
+        self._end_block()
+        text = text.strip()
+        if text:
+            self.blocks.append(text)
+
+    #--------------------------------------------------------------------------
+    # The _*_repl methods called for matches in the block regexp:
+
+    def _macro_block_repl(self, match):
+        if self.include_macros:
+            self._add_block(match.group("macro_block_text"))
+        else:
+            self._end_block()
+
+    def _line_repl(self, match):
+        self._end_block()
+    _separator_repl = _line_repl
+
+    def _head_repl(self, match):
+        self._add_block(match.group("head_text"))
+
+    def _pre_block_repl(self, match):
+        if self.include_pre:
+            text = self.pre_escape_re.sub(r"\g<indent>\g<rest>",
+                match.group("pre_block_text")
+            )
+            self._add_block(text)
+        else:
+            self._end_block()
+
+    def _list_repl(self, match):
+        if self.block != "list":
+            self._end_block("list")
+        for item in self.item_re.finditer(match.group("list")):
+            bullet = item.group("item_head")
+            kind = "number_list" if bullet[-1] == "#" else "bullet_list"
+            level = len(bullet) - 1
+
+            # Find a open list of the same level, like CreoleParser._item_repl()
+            for index in range(len(self.lists) - 1, -1, -1):
+                if self.lists[index][1] == level:
+                    break
+            else:
+                index = None
+            if index is not None and self.lists[index][0] == kind:
+                del self.lists[index + 1:]
+            else:
+                # A new list in the current list item
+                self.cleanup_break()
+                self.lists.append((kind, level))
+
+            if self.parts:
+                self.parts.append("\n")
+            self.parse_inline(item.group("item_text"))
+
+    def _table_repl(self, match):
+        if self.block == "table":
+            self.parts.append("\n")
+        else:
+            self._end_block("table")
+        row = match.group("table").strip()
+        for no, cell in enumerate(self.cell_re.finditer(row)):
+            if no:
+                self.parts.append("\t")
+            text = cell.group("cell")
+            if text:
+                text = text.strip()
+            else:
+                text = cell.group("head").strip("= ")
+            self.parse_inline(text)
+
+    def _text_repl(self, match):
+        if self.block is None or self.block == "table":
+            self._end_block("paragraph")
+
+        text = match.group("text")
+        if "space" in self.groupnames and match.group("space"):
+            # wiki style line breaks: lines separated with one space
+            text = " " + text
+        self.parse_inline(text)
+
+        # Text lines in a list would be added to the last list item
+        if "break" in self.groupnames and match.group("break") \
+                                        and self.block == "paragraph":
+            self.parts.append("\n")
+    _break_repl = _text_repl
+    _space_repl = _text_repl
+
+    #--------------------------------------------------------------------------
+    # The _*_repl methods called for matches in the inline regexp:
+
+    def _link_repl(self, match):
+        text = (match.group("link_text") or "").strip()
+        if not text:
+            self.parts.append(match.group("link_target"))
+        elif "{{" in text or "\\\\" in text:
+            for part in self.link_re.finditer(text):
+                kind = part.lastgroup
+                if kind == "image":
+                    self._image_repl(part)
+                elif kind == "linebreak":
+                    self.parts.append("\n")
+                else:
+                    self.parts.append(part.group())
+        else:
+            self.parts.append(text)
+
+    def _url_repl(self, match):
+        self.parts.append(match.group("url_target"))
+
+    def _macro_inline_repl(self, match):
+        if self.include_macros:
+            self.parts.append(match.group("macro_inline_text").strip())
+        else:
+            self.parts.append("")
+
+    def _macro_tag_repl(self, match):
+        self.parts.append("")
+
+    def _pre_inline_repl(self, match):
+        self.parts.append(match.group("pre_inline_text"))
+
+    def _image_repl(self, match):
+        text = (match.group("image_text") or "").strip()
+        self.parts.append(text or match.group("image_target").strip())
+
+    def _typeface_repl(self, match):
+        start = len(self.parts)
+        self.parse_inline(match.group("%s_text" % match.lastgroup))
+        self.cleanup_break(start)
+    _emphasis_repl = _typeface_repl
+    _strong_repl = _typeface_repl
+    _monospace_repl = _typeface_repl
+    _underline_repl = _typeface_repl
+    _superscript_repl = _typeface_repl
+    _subscript_repl = _typeface_repl
+    _small_repl = _typeface_repl
+    _delete_repl = _typeface_repl
+
+    def _linebreak_repl(self, match):
+        self.break_index = len(self.parts)
+        self.parts.append("\n")
+
+    def _escape_repl(self, match):
+        self.parts.append(match.group("escaped_char"))
+
+    def _char_repl(self, match):
+        self.parts.append(match.group())
+
+    #--------------------------------------------------------------------------
+
+    def parse_inline(self, raw):
+        """
+        Add the text of the inline elements. Like CreoleParser.parse_inline()
+        the plain text between the inline elements is added in one piece.
+        """
+        search_trigger = self.inline_trigger_re.search
+        match_inline = self.inline_re.match
+        parts = self.parts
+        pos = 0
+        end = len(raw)
+        while pos < end:
+            trigger = search_trigger(raw, pos)
+            if trigger is None:
+                parts.append(raw[pos:].replace("\n", ""))
+                break
+
+            start = trigger.start()
+            if start > pos:
+                parts.append(raw[pos:start].replace("\n", ""))
+
+            match = match_inline(raw, start)
+            getattr(self, "_%s_repl" % match.lastgroup)(match)
+            pos = match.end()
+
+    def iter_blocks(self):
+        """
+        Generate the text of all blocks, e.g.: a paragraph, a headline or
+        a list. Blocks without text are skipped. A block is yielded as soon
+        as the next block starts, the markup is not matched in advance.
+        """
+        # convert all lineendings to \n
+        text = self.raw.replace("\r\n", "\n").replace("\r", "\n")
+
+        for match in iter_block_matches(self.block_re, text):
+            getattr(self, "_%s_repl" % match.lastgroup)(match)
+            if self.blocks:
+                for block in self.blocks:
+                    yield block
+                del self.blocks[:]
+
+        self._end_block()
+        for block in self.blocks:
+            yield block
+        del self.blocks[:]
+
+
+if __name__ == '__main__':
+    import doctest
+    print(doctest.testmod())
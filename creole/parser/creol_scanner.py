@@ -0,0 +1,117 @@
+# coding: utf-8
+
+
+"""
+    Creole markup scanner
+
+    Collect only the metadata of creole markup: headlines, link targets,
+    image targets and macros. No document tree and no html code would be
+    build.
+
+    :copyleft: 2008-2015 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+from creole.parser.creol2text_parser import CreoleTextParser
+
+
+class CreoleScanner(CreoleTextParser):
+    """
+    Scan the creole markup with the same rules as the CreoleParser and
+    collect all headlines, links, images and macros in document order.
+
+    >>> scanner = CreoleScanner('''
+    ... = Headline
+    ... A [[/url/|link]], a http://domain.tld url and {{image.png|image}}.
+    ... <<toc depth=2>>
+    ... == Sub headline
+    ... |[[/cell/]]|<<html>><b>macro</b><</html>>|
+    ... ''')
+    >>> scanner.scan()
+    >>> scanner.headlines
+    [(1, 'Headline'), (2, 'Sub headline')]
+    >>> scanner.links
+    ['/url/', 'http://domain.tld', '/cell/']
+    >>> scanner.images
+    ['image.png']
+    >>> scanner.macros
+    [('toc', 'depth=2'), ('html', '')]
+    """
+    def __init__(self, raw, block_rules=None, blog_line_breaks=True, block_re=None):
+        super(CreoleScanner, self).__init__(raw,
+            block_rules=block_rules, blog_line_breaks=blog_line_breaks,
+            include_pre=False, include_macros=False, block_re=block_re
+        )
+        self.headlines = [] # (level, text) tuples
+        self.links = []     # link targets
+        self.images = []    # image targets
+        self.macros = []    # (macro name, macro arguments) tuples
+
+    def _end_block(self, kind=None):
+        # The text of the blocks is not needed
+        self.parts = []
+        self.block = kind
+        self.lists = []
+        self.break_index = None
+
+    def _add_macro(self, match, name_key, args_key):
+        self.macros.append(
+            (match.group(name_key), match.group(args_key).strip())
+        )
+
+    #--------------------------------------------------------------------------
+
+    def _macro_block_repl(self, match):
+        self._add_macro(match, "macro_block_start", "macro_block_args")
+        super(CreoleScanner, self)._macro_block_repl(match)
+
+    def _head_repl(self, match):
+        self.headlines.append(
+            (len(match.group("head_head")), match.group("head_text").strip())
+        )
+        super(CreoleScanner, self)._head_repl(match)
+
+    #--------------------------------------------------------------------------
+
+    def _link_repl(self, match):
+        self.links.append(match.group("link_target"))
+        super(CreoleScanner, self)._link_repl(match)
+
+    def _url_repl(self, match):
+        if not match.group("escaped_url"):
+            self.links.append(match.group("url_target"))
+        super(CreoleScanner, self)._url_repl(match)
+
+    def _macro_inline_repl(self, match):
+        self._add_macro(match, "macro_inline_start", "macro_inline_args")
+        super(CreoleScanner, self)._macro_inline_repl(match)
+
+    def _macro_tag_repl(self, match):
+        self._add_macro(match, "macro_tag_name", "macro_tag_args")
+        super(CreoleScanner, self)._macro_tag_repl(match)
+
+    def _image_repl(self, match):
+        self.images.append(match.group("image_target").strip())
+        super(CreoleScanner, self)._image_repl(match)
+
+    def parse_inline(self, raw):
+        """
+        Skip the inline parsing, if the text can't contain a link, image,
+        url or macro.
+        """
+        if "[[" in raw or "{{" in raw or "<<" in raw or "://" in raw:
+            super(CreoleScanner, self).parse_inline(raw)
+
+    #--------------------------------------------------------------------------
+
+    def scan(self):
+        """ Scan the complete markup """
+        for block in self.iter_blocks():
+            pass
+
+
+if __name__ == '__main__':
+    import doctest
+    print(doctest.testmod())
@@ -0,0 +1,323 @@
+# coding: utf-8
+
+
+"""
+    ElementTree to html document tree
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Build the html document tree, that HtmlParser would create from the
+    html code of a ElementTree element, e.g. from xml.etree.ElementTree or
+    lxml. So a already parsed html page can be converted with the html
+    emitters (html2creole, html2rest, html2textile) without serializing
+    and parsing it again.
+
+    :copyleft: 2015 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import re
+
+from creole.html_tools.strip_html import strip_html_tree
+from creole.parser.html_parser import (
+    HtmlParser, BLOCK_KINDS, block_re, headline_tag_re, is_html_space
+)
+from creole.parser.html_parser_config import (
+    BLOCK_TAGS, EMPTY_TAGS, IGNORE_TAGS, INLINE_TAGS, LIST_TAGS,
+    TEXT_BLOCK_TAGS
+)
+from creole.py3compat import TEXT_TYPE, BINARY_TYPE
+from creole.shared.document_tree import DocNode
+
+
+# The end of a line after a </pre>, see block_re
+line_end_re = re.compile(r"[^\S\n]*(\n|$)", re.UNICODE)
+
+# Root elements, that are skipped with include_root=None, see: is_container()
+CONTAINER_TAGS = frozenset(("div", "body"))
+
+
+def _text(value):
+    """ ElementTree in python 2 returns ascii text as byte strings """
+    if isinstance(value, BINARY_TYPE):
+        return value.decode("ascii")
+    return value
+
+
+def _tag_name(tag):
+    """
+    returns the html tag without a namespace or None, e.g. for a comment
+    """
+    if not isinstance(tag, (TEXT_TYPE, BINARY_TYPE)):
+        return None
+    return _text(tag).rsplit("}", 1)[-1].lower()
+
+
+def _is_space(node):
+    """
+    ElementTree has replaced the entities, so only html whitespace is
+    removed, not e.g. a &nbsp;
+    """
+    return node.kind == "data" and is_html_space(node.content)
+
+
+def _escape(text, quote=False):
+    text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    if quote:
+        text = text.replace('"', "&quot;")
+    return text
+
+
+def _html_parts(element, parts):
+    """ Add the html code of the element and the tail to parts """
+    tag = _tag_name(element.tag)
+    if tag is not None:
+        attrs = "".join(
+            ' %s="%s"' % (_text(name), _escape(_text(value), quote=True))
+            for name, value in element.items()
+        )
+        parts.append("<%s%s>" % (tag, attrs))
+        parts.append(_escape(_text(element.text or "")))
+        for child in element:
+            _html_parts(child, parts)
+        parts.append("</%s>" % tag)
+    parts.append(_escape(_text(element.tail or "")))
+
+
+def inner_html(element):
+    """
+    returns the html code of the element content.
+
+    >>> import xml.etree.ElementTree as ET
+    >>> inner_html(ET.fromstring('<pre>a &lt; <b class="x">b</b> c</pre>')) == 'a &lt; <b class="x">b</b> c'
+    True
+    """
+    parts = [_escape(_text(element.text or ""))]
+    for child in element:
+        _html_parts(child, parts)
+    return "".join(parts)
+
+
+def is_container(element):
+    """
+    True, if the element is only a container for the html content, e.g.
+    the root element of creole2etree()
+
+    >>> import xml.etree.ElementTree as ET
+    >>> is_container(ET.fromstring("<body><p>text</p></body>"))
+    True
+    >>> is_container(ET.fromstring('<div class="box"><p>text</p></div>'))
+    False
+    """
+    return _tag_name(element.tag) in CONTAINER_TAGS and not element.attrib
+
+
+class EtreeParser(object):
+    """
+    Create the html document tree from a ElementTree element.
+
+    >>> import xml.etree.ElementTree as ET
+    >>> p = EtreeParser()
+    >>> p.parse(ET.fromstring("<div>\\n<p>html  <strong>code</strong></p>\\n</div>"))
+    <DocNode document: None>
+    >>> p.debug()
+    ________________________________________________________________________________
+      document tree:
+    ================================================================================
+    div
+        p
+            data: 'html '
+            strong
+                data: 'code'
+    ********************************************************************************
+
+    With include_root=False only the content of the element is used,
+    e.g. for a <body> element. With include_root=None a <div> or <body>
+    element without attributes is only a container for the content
+    (like the root element of creole2etree()):
+
+    >>> p = EtreeParser()
+    >>> p.parse(ET.fromstring("<div><h1>A</h1><p>text</p></div>"), include_root=None)
+    <DocNode document: None>
+    >>> [node.kind for node in p.root.children]
+    ['headline', 'p']
+
+    The text of a <pre> element is stored as html code, like HtmlParser
+    does it. The differences to HtmlParser().feed(html code of the element):
+        * ElementTree has already replaced the entities, so a &nbsp;
+          at the start or the end of a text is removed like other
+          whitespace.
+        * Comments and processing instructions are skipped.
+    """
+    def __init__(self, debug=False):
+        self.debugging = debug
+        self.root = DocNode("document", None)
+        self._list_level = 0
+        self._started = False # True after the first tag or text
+        self._line_start = True # True, if the html code ends with a newline
+
+    def parse(self, element, include_root=True):
+        if include_root is None:
+            include_root = not is_container(element)
+        if include_root:
+            self._add_element(element, self.root, is_last=True)
+        else:
+            self._add_content(element, self.root)
+
+        # The ignored tags are removed after strip_html_tree(), because
+        # strip_html() removes the whitespace around them, too.
+        strip_html_tree(self.root)
+        _cleanup_tree(self.root)
+        return self.root
+
+    #-------------------------------------------------------------------------
+
+    def _add_data(self, text, parent):
+        if not text:
+            return
+        text = _text(text)
+        DocNode("data", parent, content=text)
+        if text.strip():
+            self._started = True
+        if self._started:
+            self._line_start = text.endswith("\n")
+
+    def _add_tag(self):
+        self._started = True
+        self._line_start = False
+
+    def _add_content(self, element, node):
+        """
+        add the text and the child elements. Returns the node for the
+        following content: A ancestor, if a block element closed node.
+        """
+        self._add_data(element.text, node)
+        children = list(element)
+        for index, child in enumerate(children):
+            node = self._add_element(child, node, is_last=index == len(children) - 1)
+            self._add_data(child.tail, node)
+        return node
+
+    def _close_inline(self, node):
+        """
+        Like HtmlParser: A block element closes the inline elements, e.g.:
+            <a name="A"><h1>A</h1></a>
+        Returns the parent for the block and the closed nodes, outer first.
+        """
+        closed = []
+        while node.kind in INLINE_TAGS:
+            closed.insert(0, node)
+            siblings = node.parent.children
+            if not node.children and siblings and siblings[-1] is node:
+                del siblings[-1]
+                if siblings and _is_space(siblings[-1]):
+                    del siblings[-1]
+            node = node.parent
+        return node, closed
+
+    def _add_element(self, element, parent, is_last):
+        """ Returns the node for the following content, see _add_content() """
+        tag = _tag_name(element.tag)
+        if tag is None: # a comment or a processing instruction
+            return parent
+
+        if self.debugging:
+            print("element: %r attrs: %r" % (tag, element.attrib))
+
+        attrs = [(_text(name), _text(value)) for name, value in element.items()]
+
+        if tag == "pre":
+            self._add_pre(element, parent, is_last)
+            return parent
+
+        self._add_tag()
+        if tag in EMPTY_TAGS:
+            DocNode(tag, parent, None, attrs)
+            return parent
+
+        closed = ()
+        if tag in BLOCK_TAGS:
+            parent, closed = self._close_inline(parent)
+            children = parent.children
+            if (len(children) > 1 and _is_space(children[-1])
+                    and children[-2].kind in BLOCK_KINDS):
+                # The whitespace between two blocks, like HtmlParser
+                del children[-1]
+
+        headline = headline_tag_re.match(tag)
+        if headline:
+            node = DocNode("headline", parent, level=int(headline.group(1)))
+        elif tag in LIST_TAGS:
+            self._list_level += 1
+            node = DocNode(tag, parent, None, attrs, level=self._list_level)
+        elif tag == "li":
+            node = DocNode(tag, parent, None, attrs, level=self._list_level)
+        else:
+            node = DocNode(tag, parent, None, attrs)
+
+        content_node = node
+        if closed and tag in TEXT_BLOCK_TAGS:
+            # Reopen the closed inline elements, like HtmlParser
+            for inline_node in closed:
+                content_node = DocNode(
+                    inline_node.kind, content_node, None, inline_node.attrs
+                )
+
+        end = self._add_content(element, content_node)
+
+        if tag in LIST_TAGS:
+            self._list_level -= 1
+        self._add_tag()
+
+        if tag not in BLOCK_TAGS and end is not node:
+            # node was closed by a block element
+            return end
+        return parent
+
+    def _add_pre(self, element, parent, is_last):
+        """
+        Like HtmlParser.feed(): A <pre> area in own lines is a block,
+        otherwise it's inline.
+        """
+        content = inner_html(element)
+        match = block_re.match("<pre>%s</pre>" % content)
+        if element.tail:
+            line_end = line_end_re.match(_text(element.tail)) is not None
+        else:
+            line_end = is_last
+
+        if match is not None and self._line_start and line_end:
+            DocNode("blockdata_pre", parent, match.group("pre_block"))
+        else:
+            DocNode("inlinedata_pre", parent, content)
+        self._add_tag()
+
+    # Display the current document tree, like HtmlParser
+    debug = HtmlParser.__dict__["debug"]
+
+
+def _cleanup_tree(node):
+    """
+    Remove the IGNORE_TAGS nodes and replace the non breaking spaces
+    with normal spaces, like HtmlParser.
+    """
+    children = []
+    for child in node.children:
+        if child.kind == "data":
+            if "\xa0" in child.content:
+                child.content = child.content.replace("\xa0", " ")
+        else:
+            _cleanup_tree(child)
+            if child.kind in IGNORE_TAGS:
+                for grandchild in child.children:
+                    grandchild.parent = node
+                children.extend(child.children)
+                continue
+        children.append(child)
+    node.children = children
+
+
+if __name__ == '__main__':
+    import doctest
+    print(doctest.testmod())
@@ -15,11 +15,15 @@ from __future__ import division, absolute_import, print_function, unicode_litera
 import re
 import warnings
 
-from creole.parser.html_parser_config import BLOCK_TAGS, IGNORE_TAGS
+from creole.parser.html_parser_config import (
+    BLOCK_TAGS, EMPTY_TAGS, IGNORE_TAGS, INLINE_TAGS, LIST_TAGS,
+    TEXT_BLOCK_TAGS
+)
+from creole.html_tools.deentity import Deentity
 from creole.html_tools.strip_html import strip_html
 from creole.py3compat import TEXT_TYPE, BINARY_TYPE
 from creole.shared.document_tree import DocNode, DebugList
-from creole.shared.html_parser import HTMLParser
+from creole.shared.html_parser import get_tokenizer
 
 
 #------------------------------------------------------------------------------
@@ -44,12 +48,40 @@ inline_re = re.compile(r'''
 
 headline_tag_re = re.compile(r"h(\d)", re.UNICODE)
 
+# The node kinds of block tags, without empty tags like <br />
+BLOCK_KINDS = (BLOCK_TAGS - EMPTY_TAGS) | frozenset(("headline",))
+
+# The whitespace characters of the html code, a &nbsp; is not whitespace
+HTML_SPACE = " \t\n\r\f"
+
+
+def is_html_space(text):
+    """
+    True, if the text contains only html whitespace
+    >>> is_html_space(" \\n"), is_html_space("\\xa0")
+    (True, False)
+    """
+    return not text.strip(HTML_SPACE)
+
 #------------------------------------------------------------------------------
 
 
-class HtmlParser(HTMLParser):
+class HtmlParser(object):
     """
     parse html code and create a document tree.
+
+    The html code is split by a tokenizer backend, see:
+    creole.shared.html_parser.TOKENIZERS
+    With convert_charrefs=True the tokenizer converts the entities.
+
+    The entities are replaced while parsing and adjacent text is merged
+    into one data node. With keep_entities=True the entityref and charref
+    nodes are created, like before:
+
+    >>> HtmlParser().feed("<p>a&nbsp;b&amp;c</p>").children[0].children
+    [<DocNode data: 'a b&c'>]
+    >>> HtmlParser(keep_entities=True).feed("<p>a&nbsp;b&amp;c</p>").children[0].children
+    [<DocNode data: 'a'>, <DocNode entityref: 'nbsp'>, <DocNode data: 'b'>, <DocNode entityref: 'amp'>, <DocNode data: 'c'>]
     
     >>> p = HtmlParser()
     >>> p.feed("<p>html <strong>code</strong></p>")
@@ -82,8 +114,16 @@ class HtmlParser(HTMLParser):
     _block_placeholder = "blockdata"
     _inline_placeholder = "inlinedata"
 
-    def __init__(self, debug=False):
-        HTMLParser.__init__(self)
+    def __init__(self, debug=False, tokenizer=None, convert_charrefs=False,
+            keep_entities=False):
+        self.tokenizer = get_tokenizer(tokenizer)(
+            self, convert_charrefs=convert_charrefs
+        )
+        self.keep_entities = keep_entities
+        self.deentity = Deentity()
+        self._data = [] # text for the next data node
+        self._data_entities = False # True, if self._data contains a entity
+        self._entity_data = set() # The data nodes with text from entities
 
         self.debugging = debug
         if self.debugging:
@@ -99,7 +139,9 @@ class HtmlParser(HTMLParser):
         self.root = DocNode("document", None)
         self.cur = self.root
 
-        self.__list_level = 0
+        # The open elements as (html tag, DocNode), the document at the bottom
+        self._stack = [(None, self.root)]
+        self._open_tags = {} # html tag -> number of open elements
 
     def _pre_cut(self, data, type, placeholder):
         if self.debugging:
@@ -154,74 +196,161 @@ class HtmlParser(HTMLParser):
 #            print(clean_data.replace(">", ">\n"))
 #            print("-"*79)
 
-        HTMLParser.feed(self, data)
+        self.tokenizer.feed(data)
+        self.tokenizer.close()
+        self._flush_data()
 
         return self.root
 
 
     #-------------------------------------------------------------------------
 
-    def _upto(self, node, kinds):
+    def _push(self, tag, node):
+        """ open a element: the following nodes are added to it """
+        self._stack.append((tag, node))
+        self._open_tags[tag] = self._open_tags.get(tag, 0) + 1
+        self.cur = node
+
+    def _pop(self, tag):
         """
-        Look up the tree to the first occurence
-        of one of the listed kinds of nodes or root.
-        Start at the node node.
+        close the last open element of the tag and all elements in it,
+        e.g. a not closed <strong> in a <p>
         """
-        while node is not None and node.parent is not None:
-            node = node.parent
-            if node.kind in kinds:
+        while True:
+            open_tag, node = self._stack.pop()
+            self._open_tags[open_tag] -= 1
+            if open_tag == tag:
                 break
+        self.cur = self._stack[-1][1]
+        self.debug_msg("go up to", self.cur)
 
-        return node
+    def _close_inline(self):
+        """
+        close the open inline elements before a block element and returns
+        the closed (html tag, DocNode) pairs, outer first. e.g.:
+            <a name="A"><h1>A</h1></a>
+        A empty inline element and the whitespace before it are removed.
+        """
+        closed = []
+        while self._stack[-1][0] in INLINE_TAGS:
+            tag, node = self._stack[-1]
+            self._pop(tag)
+            closed.insert(0, (tag, node))
+            siblings = node.parent.children
+            if not node.children and siblings and siblings[-1] is node:
+                del siblings[-1]
+                if siblings and self._is_space(siblings[-1]):
+                    del siblings[-1]
+        return closed
+
+    def _is_space(self, node):
+        """ True for a data node with only whitespace of the html code """
+        return (node.kind == "data" and node not in self._entity_data
+            and is_html_space(node.content))
+
+    def _reopen_inline(self, closed):
+        """
+        open new elements for the inline elements closed by a block element
+        inside of it, e.g.: <a href="/url/"><div>text</div></a>
+        """
+        for tag, node in closed:
+            self._push(tag, DocNode(tag, self.cur, None, node.attrs))
 
-    def _go_up(self):
-        kinds = list(BLOCK_TAGS) + ["document"]
-        self.cur = self._upto(self.cur, kinds)
-        self.debug_msg("go up to", self.cur)
+    def _list_level(self):
+        return self._open_tags.get("ul", 0) + self._open_tags.get("ol", 0)
 
     #-------------------------------------------------------------------------
 
+    def _flush_data(self):
+        """ create the data node with the collected text """
+        if self._data:
+            node = DocNode("data", self.cur, content="".join(self._data))
+            if self._data_entities:
+                self._entity_data.add(node)
+                self._data_entities = False
+            self._data = []
+
     def handle_starttag(self, tag, attrs):
         self.debug_msg("starttag", "%r atts: %s" % (tag, attrs))
+        if (tag in BLOCK_TAGS and self.cur.children
+                and self.cur.children[-1].kind in BLOCK_KINDS
+                and not self._data_entities
+                and is_html_space("".join(self._data))):
+            # The whitespace between two blocks, e.g. after the ignored </a>
+            # of <a name="A"><h1>A</h1></a>
+            self._data = []
+        self._flush_data()
 
         if tag in IGNORE_TAGS:
             return
 
-        headline = headline_tag_re.match(tag)
-        if headline:
-            self.cur = DocNode(
-                "headline", self.cur, level=int(headline.group(1))
-            )
-            return
-
-        if tag in ("li", "ul", "ol"):
-            if tag in ("ul", "ol"):
-                self.__list_level += 1
-            self.cur = DocNode(tag, self.cur, None, attrs, level=self.__list_level)
-        elif tag in ("img", "br"):
-            # Work-a-round if img or br  tag is not marked as startendtag:
+        if tag in EMPTY_TAGS:
+            # Work-a-round if e.g. a img or br tag is not marked as startendtag:
             # wrong: <img src="/image.jpg"> doesn't work if </img> not exist
             # right: <img src="/image.jpg" />
             DocNode(tag, self.cur, None, attrs)
+            return
+
+        closed = ()
+        if tag in BLOCK_TAGS and self._stack[-1][0] in INLINE_TAGS:
+            closed = self._close_inline()
+
+        headline = headline_tag_re.match(tag)
+        if headline:
+            node = DocNode("headline", self.cur, level=int(headline.group(1)))
+        elif tag in LIST_TAGS:
+            node = DocNode(tag, self.cur, None, attrs, level=self._list_level() + 1)
+        elif tag == "li":
+            node = DocNode(tag, self.cur, None, attrs, level=self._list_level())
         else:
-            self.cur = DocNode(tag, self.cur, None, attrs)
+            node = DocNode(tag, self.cur, None, attrs)
+        self._push(tag, node)
+        if closed and tag in TEXT_BLOCK_TAGS:
+            self._reopen_inline(closed)
 
     def handle_data(self, data):
         self.debug_msg("data", "%r" % data)
         if isinstance(data, BINARY_TYPE):
             data = unicode(data)
-        DocNode("data", self.cur, content=data)
+        self._data.append(data)
 
     def handle_charref(self, name):
         self.debug_msg("charref", "%r" % name)
-        DocNode("charref", self.cur, content=name)
+        if self.keep_entities:
+            self._flush_data()
+            DocNode("charref", self.cur, content=name)
+            return
+
+        try:
+            if name[0] in "xX":
+                text = self.deentity.replace_hex(name[1:])
+            else:
+                text = self.deentity.replace_number(name)
+        except (ValueError, OverflowError):
+            # Not a valid unicode character
+            text = "&#%s;" % name
+        self._data.append(text)
+        self._data_entities = True
 
     def handle_entityref(self, name):
         self.debug_msg("entityref", "%r" % name)
-        DocNode("entityref", self.cur, content=name)
+        if self.keep_entities:
+            self._flush_data()
+            DocNode("entityref", self.cur, content=name)
+            return
+
+        try:
+            text = self.deentity.replace_named(name)
+        except KeyError:
+            if self.debugging:
+                print("unknown html entity found: %r" % name)
+            text = "&%s" % name # like BaseEmitter.entityref_emit()
+        self._data.append(text)
+        self._data_entities = True
 
     def handle_startendtag(self, tag, attrs):
         self.debug_msg("startendtag", "%r atts: %s" % (tag, attrs))
+        self._flush_data()
         attr_dict = dict(attrs)
         if tag in (self._block_placeholder, self._inline_placeholder):
             id = int(attr_dict["id"])
@@ -236,30 +365,22 @@ class HtmlParser(HTMLParser):
             DocNode(tag, self.cur, None, attrs)
 
     def handle_endtag(self, tag):
-        if tag in IGNORE_TAGS:
-            return
-
+        self._flush_data()
         self.debug_msg("endtag", "%r" % tag)
 
-        if tag == "br": # handled in starttag
+        if not self._open_tags.get(tag):
+            # e.g. </br>, </tbody> or a end tag without a start tag
+            self.debug_msg("ignore", "%r not open" % tag)
             return
 
-        self.debug_msg("starttag", "%r" % self.get_starttag_text())
-
-        if tag in ("ul", "ol"):
-            self.__list_level -= 1
-
-        if tag in BLOCK_TAGS or self.cur is None:
-            self._go_up()
-        else:
-            self.cur = self.cur.parent
+        self._pop(tag)
 
     #-------------------------------------------------------------------------
 
     def debug_msg(self, method, txt):
         if not self.debugging:
             return
-        print("%-8s %8s: %s" % (self.getpos(), method, txt))
+        print("%-8s %8s: %s" % (self.tokenizer.getpos(), method, txt))
 
     def debug(self, start_node=None):
         """
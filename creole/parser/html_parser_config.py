@@ -13,7 +13,7 @@
 
 from __future__ import division, absolute_import, print_function, unicode_literals
 
-BLOCK_TAGS = (
+BLOCK_TAGS = frozenset((
     "address", "blockquote", "center", "dir", "div", "dl", "fieldset",
     "form",
     "h1", "h2", "h3", "h4", "h5", "h6",
@@ -21,5 +21,29 @@ BLOCK_TAGS = (
     "ul", "ol", "li", "table", "th", "tr", "td",
     "p", "pre",
     "br"
-)
-IGNORE_TAGS = ("tbody",)
+))
+IGNORE_TAGS = frozenset(("tbody",))
+
+# Tags without content and end tag, e.g.: <br> or <img src="/image.jpg">
+EMPTY_TAGS = frozenset((
+    "area", "base", "br", "col", "hr", "img", "input", "link", "meta",
+    "param",
+))
+
+LIST_TAGS = frozenset(("ul", "ol"))
+
+# Inline tags, closed by the start of a block tag. e.g. the <a name="...">
+# around the headlines with a creole2html table of contents. They are
+# reopened inside the block, if it has inline content (TEXT_BLOCK_TAGS)
+INLINE_TAGS = frozenset((
+    "a", "abbr", "acronym", "b", "big", "cite", "code", "dfn", "em", "font",
+    "i", "kbd", "q", "s", "samp", "small", "span", "strike", "strong",
+    "sub", "sup", "tt", "u", "var",
+))
+
+# Block tags with inline content, e.g.: <a href="/url/"><h2>Title</h2></a>
+TEXT_BLOCK_TAGS = frozenset((
+    "address", "blockquote", "center", "dd", "div", "dt",
+    "h1", "h2", "h3", "h4", "h5", "h6",
+    "ins", "li", "noscript", "p", "td", "th",
+))
@@ -49,7 +49,7 @@ import os
 import sys
 import warnings
 
-from creole import creole2html, html2rest
+from creole import creole2rest
 from creole.shared.unknown_tags import raise_unknown_node, transparent_unknown_nodes
 from creole.py3compat import PY3
 
@@ -95,13 +95,9 @@ def get_long_description(package_root, filename="README.creole", raise_errors=No
         long_description_origin = f.read().strip()
         f.close()
 
-        # convert creole into html
-        long_description_html = creole2html(long_description_origin)
-
-        # convert html to ReSt
-        long_description_rest_unicode = html2rest(
-            long_description_html,
-            emitter_kwargs={"unknown_emit":unknown_emit}
+        # convert creole into ReSt
+        long_description_rest_unicode = creole2rest(
+            long_description_origin, unknown_emit=unknown_emit
         )
         if PY3:
             long_description_rest = long_description_rest_unicode
@@ -16,6 +16,7 @@ from creole.parser.html_parser_config import BLOCK_TAGS
 from creole.html_tools.deentity import Deentity
 from creole.py3compat import TEXT_TYPE
 from creole.shared.markup_table import MarkupTable
+from creole.shared.output_writer import OutputWriter
 from creole.shared.unknown_tags import transparent_unknown_nodes
 
 
@@ -190,6 +191,27 @@ class BaseEmitter(object):
         """Emit all the children of a node."""
         return "".join(self.emit_children_list(node))
 
+    def write_document(self, write):
+        """
+        Write the document with write() block by block, with the same
+        result as write(self.emit_node(self.root))
+        """
+        self.last = self.root
+        for child in self.root.children:
+            content = self.emit_node(child)
+            assert isinstance(content, TEXT_TYPE)
+            write(content)
+
+    def write_to(self, out, encoding=None, lstrip=True):
+        """
+        Write the document into the file-like object out, encoded if a
+        encoding is given. The whitespace at the end (and at the start if
+        lstrip is True) is removed, like in emit()
+        """
+        writer = OutputWriter(out, encoding=encoding, lstrip=lstrip)
+        self.write_document(writer.write)
+        writer.close()
+
     def emit_children_list(self, node):
         """Emit all the children of a node."""
         self.last = node
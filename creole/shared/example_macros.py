@@ -15,13 +15,8 @@ from __future__ import division, absolute_import, print_function, unicode_litera
 
 from xml.sax.saxutils import escape
 
-try:
-    from pygments import highlight
-    PYGMENTS = True
-except ImportError:
-    PYGMENTS = False
-
-from creole.shared.utils import get_pygments_lexer, get_pygments_formatter
+from creole.shared.macro_cache import cacheable
+from creole.shared.utils import PYGMENTS, highlight_code
 
 
 def html(text):
@@ -40,6 +35,7 @@ def pre(text):
     return '<pre>%s</pre>' % escape(text)
 
 
+@cacheable
 def code(ext, text):
     """
     Macro tag <<code ext=".some_extension">>...<</code>>
@@ -57,11 +53,8 @@ def code(ext, text):
     except IndexError:
         source_type = ''
 
-    lexer = get_pygments_lexer(source_type, code)
-    formatter = get_pygments_formatter()
-
     try:
-        highlighted_text = highlight(text, lexer, formatter).decode('utf-8')
+        highlighted_text = highlight_code(source_type, text)
     except:
         highlighted_text = pre(text)
     finally:
@@ -1,32 +1,239 @@
 # coding: utf-8
 
 """
-    HTMLParser for Python 2.x and 3.x
-    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-
-    The HTMLParser has problems with the correct handling of <script>...</script>
-    and <style>...</style> areas.
-       
-    It was fixed with v2.7.3 and 3.2.3, see:
-        http://www.python.org/download/releases/2.7.3/
-        http://www.python.org/download/releases/3.2.3/
-    see also:
-        http://bugs.python.org/issue670664#msg146770
-        
-    :copyleft: 2011-2012 by python-creole team, see AUTHORS for more details.
+    html tokenizer backends
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    A tokenizer splits html code into events and calls the handler methods
+    like the stdlib HTMLParser would call its own methods:
+
+        handler.handle_starttag(tag, attrs)
+        handler.handle_startendtag(tag, attrs)
+        handler.handle_endtag(tag)
+        handler.handle_data(data)
+        handler.handle_charref(name)
+        handler.handle_entityref(name)
+
+    Adjacent text is passed in one handle_data() call. Comments,
+    declarations and processing instructions are skipped.
+
+    Available backends, see: TOKENIZERS
+        "html.parser" - the stdlib HTMLParser (default)
+        "lxml" - the libxml2 html parser, only if lxml is installed.
+            Much faster, but it resolves all entities into text, repairs
+            invalid nesting (e.g. a <ul> in a <p>) and skips the
+            <html>, <head> and <body> tags.
+
+    :copyleft: 2011-2015 by python-creole team, see AUTHORS for more details.
     :license: GNU GPL v3 or above, see LICENSE for more details.
 """
 
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+from creole.parser.html_parser_config import EMPTY_TAGS
+from creole.py3compat import TEXT_TYPE, BINARY_TYPE
 
 try:
-    import HTMLParser as OriginHTMLParser
+    from html.parser import HTMLParser # python 3
 except ImportError:
-    from html import parser as OriginHTMLParser # python 3
+    from HTMLParser import HTMLParser
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+
+class StdlibTokenizer(HTMLParser):
+    """
+    Tokenizer with the stdlib HTMLParser.
+    With convert_charrefs=True all entities are passed as text.
+
+    >>> from creole.shared.html_parser import DebugHandler
+    >>> tokenizer = StdlibTokenizer(DebugHandler())
+    >>> tokenizer.feed("<p>a &amp; b<br />c</p>"); tokenizer.close()
+    starttag: 'p' []
+    data: 'a '
+    entityref: 'amp'
+    data: ' b'
+    startendtag: 'br' []
+    data: 'c'
+    endtag: 'p'
+    >>> tokenizer = StdlibTokenizer(DebugHandler(), convert_charrefs=True)
+    >>> tokenizer.feed("<p>a &amp; &#98;</p>"); tokenizer.close()
+    starttag: 'p' []
+    data: 'a & b'
+    endtag: 'p'
+    """
+    def __init__(self, handler, convert_charrefs=False):
+        try:
+            HTMLParser.__init__(self, convert_charrefs=convert_charrefs)
+            self._convert_charrefs = False # done by HTMLParser
+        except TypeError: # python 2
+            HTMLParser.__init__(self)
+            self._convert_charrefs = convert_charrefs
+
+        self.handler = handler
+        self._data = [] # text, passed with the next event
+
+    def _flush(self):
+        if self._data:
+            data = "".join(self._data)
+            self._data = []
+            self.handler.handle_data(data)
+
+    def close(self):
+        HTMLParser.close(self)
+        self._flush()
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        self.handler.handle_starttag(tag, attrs)
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush()
+        self.handler.handle_startendtag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        self._flush()
+        self.handler.handle_endtag(tag)
+
+    def handle_data(self, data):
+        self._data.append(data)
+
+    def handle_charref(self, name):
+        if self._convert_charrefs:
+            self._data.append(self.unescape("&#%s;" % name))
+        else:
+            self._flush()
+            self.handler.handle_charref(name)
+
+    def handle_entityref(self, name):
+        if self._convert_charrefs:
+            self._data.append(self.unescape("&%s;" % name))
+        else:
+            self._flush()
+            self.handler.handle_entityref(name)
+
+
+class _LxmlTarget(object):
+    """ The parser target for LxmlTokenizer """
+    SKIP_TAGS = frozenset(("html", "head", "body"))
+
+    # Tags without content: Passed as startendtag, like <br />
+    EMPTY_TAGS = EMPTY_TAGS | frozenset(("blockdata", "inlinedata"))
+
+    def __init__(self, handler):
+        self.handler = handler
+        self._data = []
+
+    def _flush(self):
+        if self._data:
+            data = "".join(self._data)
+            self._data = []
+            self.handler.handle_data(data)
+
+    def start(self, tag, attrib):
+        if tag in self.SKIP_TAGS:
+            return
+        self._flush()
+        attrs = list(attrib.items())
+        if tag in self.EMPTY_TAGS:
+            self.handler.handle_startendtag(tag, attrs)
+        else:
+            self.handler.handle_starttag(tag, attrs)
+
+    def end(self, tag):
+        if tag in self.SKIP_TAGS or tag in self.EMPTY_TAGS:
+            return
+        self._flush()
+        self.handler.handle_endtag(tag)
+
+    def data(self, data):
+        self._data.append(data)
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        self._flush()
+
+
+class LxmlTokenizer(object):
+    """
+    Tokenizer with the lxml html parser. The entities are always passed
+    as text, so convert_charrefs is ignored.
+    """
+    def __init__(self, handler, convert_charrefs=True):
+        self._parser = etree.HTMLParser(target=_LxmlTarget(handler))
+
+    def feed(self, data):
+        self._parser.feed(data)
+
+    def close(self):
+        self._parser.close()
+
+    def getpos(self):
+        return None
+
+    def get_starttag_text(self):
+        return None
+
+
+TOKENIZERS = {
+    "html.parser": StdlibTokenizer,
+}
+if etree is not None:
+    TOKENIZERS["lxml"] = LxmlTokenizer
+
+DEFAULT_TOKENIZER = "html.parser"
+
+
+def get_tokenizer(tokenizer=None):
+    """
+    returns the tokenizer class for the name in TOKENIZERS.
+    A tokenizer class is returned unchanged.
+
+    >>> get_tokenizer() is StdlibTokenizer
+    True
+    >>> get_tokenizer("foo") # doctest: +ELLIPSIS
+    Traceback (most recent call last):
+        ...
+    ValueError: Unknown html tokenizer 'foo', available: html.parser...
+    """
+    if tokenizer is None:
+        tokenizer = DEFAULT_TOKENIZER
+    if not isinstance(tokenizer, (TEXT_TYPE, BINARY_TYPE)):
+        return tokenizer
+    try:
+        return TOKENIZERS[tokenizer]
+    except KeyError:
+        raise ValueError("Unknown html tokenizer %r, available: %s" % (
+            tokenizer, ", ".join(sorted(TOKENIZERS))
+        ))
+
+
+class DebugHandler(object):
+    """ Print all events, for debugging a tokenizer """
+    def handle_starttag(self, tag, attrs):
+        print("starttag: %r %r" % (tag, attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        print("startendtag: %r %r" % (tag, attrs))
+
+    def handle_endtag(self, tag):
+        print("endtag: %r" % tag)
+
+    def handle_data(self, data):
+        print("data: %r" % data)
+
+    def handle_charref(self, name):
+        print("charref: %r" % name)
+
+    def handle_entityref(self, name):
+        print("entityref: %r" % name)
 
 
-if hasattr(OriginHTMLParser, "cdata_elem"):
-    # Current python version is patched -> use the original
-    HTMLParser = OriginHTMLParser
-else:
-    # Current python version is not patched -> use own patched version
-    from creole.shared.HTMLParsercompat import HTMLParser
+if __name__ == "__main__":
+    import doctest
+    print(doctest.testmod())
@@ -0,0 +1,95 @@
+# coding: utf-8
+
+
+"""
+    python creole input reader
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Read a text file in one pass: The file is memory mapped, decoded in
+    chunks and the line endings are normalized while decoding. Used by the
+    *_file() functions and the CLI.
+
+    :copyleft: 2015 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import codecs
+import io
+import mmap
+import os
+
+
+# Bytes decoded at once
+CHUNK_SIZE = 1024 * 1024
+
+
+def map_file(f):
+    """
+    Returns a read only memory map of the binary file f or None, if the
+    file can't be mapped, e.g. a empty file or a pipe.
+    """
+    try:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, EnvironmentError, io.UnsupportedOperation):
+        return None
+
+
+def iter_file_chunks(f, chunk_size=CHUNK_SIZE, mapped=None):
+    """
+    Generate the content of the binary file f in chunks. Slices of the
+    memory map are used, if given.
+    """
+    if mapped is None:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    for start in range(0, len(mapped), chunk_size):
+        yield mapped[start:start + chunk_size]
+
+
+def read_text_file(filename, encoding="utf-8", errors="strict", chunk_size=CHUNK_SIZE):
+    """
+    Returns the decoded content of the file with "\\n" line endings, like
+    codecs.open(filename, "r", encoding).read().replace("\\r\\n", "\\n").replace("\\r", "\\n")
+    but without a copy of the whole file for every step.
+
+    >>> import tempfile
+    >>> f = tempfile.NamedTemporaryFile(delete=False)
+    >>> _ = f.write("\\xe4\\r\\nb\\rc\\r\\r\\n".encode("utf-8"))
+    >>> f.close()
+    >>> read_text_file(f.name, chunk_size=2) == "\\xe4\\nb\\nc\\n\\n"
+    True
+    >>> os.remove(f.name)
+    """
+    with open(filename, "rb") as f:
+        mapped = map_file(f)
+        try:
+            if mapped is not None and mapped.find(b"\r") == -1:
+                # Nothing to normalize: Decode the mapped file at once,
+                # without a copy of the bytes.
+                return codecs.decode(mapped, encoding, errors)
+
+            decoder = codecs.getincrementaldecoder(encoding)(errors)
+            decoder = io.IncrementalNewlineDecoder(decoder, translate=True)
+            chunks = [
+                decoder.decode(chunk)
+                for chunk in iter_file_chunks(f, chunk_size, mapped)
+            ]
+        finally:
+            if mapped is not None:
+                mapped.close()
+
+    chunks.append(decoder.decode(b"", final=True))
+    return "".join(chunks)
+
+
+if __name__ == "__main__":
+    import doctest
+    print(doctest.testmod())
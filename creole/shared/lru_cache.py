@@ -0,0 +1,97 @@
+# coding: utf-8
+
+
+"""
+    python creole LRU cache
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    A small, thread safe, size bounded cache (functools.lru_cache doesn't
+    exist in python 2)
+
+    :copyleft: 2015 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+from collections import OrderedDict
+import threading
+
+
+class LRUCache(object):
+    """
+    Store up to maxsize items and discard the least recently used one.
+
+    >>> cache = LRUCache(maxsize=2)
+    >>> cache.set("a", 1)
+    >>> cache.set("b", 2)
+    >>> cache.get("a")
+    1
+    >>> cache.set("c", 3) # "b" is the least recently used item
+    >>> cache.get("b") is None
+    True
+    >>> cache.keys() == ["a", "c"]
+    True
+    >>> cache.hits, cache.misses
+    (1, 1)
+    >>> cache.info() == {"hits": 1, "misses": 1, "size": 2, "maxsize": 2}
+    True
+    >>> cache.clear()
+    >>> len(cache), cache.hits, cache.misses
+    (0, 0, 0)
+    """
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data[key] = value # mark as the most recently used
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def keys(self):
+        with self._lock:
+            return list(self._data.keys())
+
+    def info(self):
+        """ Returns the cache statistics as a dict """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+
+if __name__ == "__main__":
+    import doctest
+    print(doctest.testmod())
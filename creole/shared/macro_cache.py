@@ -0,0 +1,72 @@
+# coding: utf-8
+
+
+"""
+    python creole macro result cache
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Macros marked with @cacheable are called only once for the same
+    arguments and text. The results are shared between all HtmlEmitter
+    instances and threads.
+
+    :copyleft: 2015 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+from creole.shared.lru_cache import LRUCache
+
+
+# The default cache used by HtmlEmitter.macro_emit()
+macro_cache = LRUCache(maxsize=256)
+
+
+def cacheable(func=None, version=None):
+    """
+    Mark a macro as cacheable: The result depends only on the arguments
+    and the text. Change the version to invalidate old cache entries,
+    e.g. if the macro code changed.
+
+    >>> @cacheable
+    ... def upper(text):
+    ...     return text.upper()
+    >>> get_cache_key(upper, "upper", "", "text")[2:]
+    ('', 'text', None)
+
+    >>> @cacheable(version=2)
+    ... def lower(text):
+    ...     return text.lower()
+    >>> get_cache_key(lower, "lower", "", "TEXT")[2:]
+    ('', 'TEXT', 2)
+
+    Macros without the decorator are not cached:
+
+    >>> get_cache_key(lambda text: text, "foo", "", "text") is None
+    True
+    """
+    def decorator(func):
+        func.creole_cacheable = True
+        func.creole_cache_version = version
+        return func
+
+    if func is None:
+        return decorator
+    return decorator(func)
+
+
+def get_cache_key(macro, macro_name, macro_args, text):
+    """
+    Returns the cache key for a macro call or None if the macro is not
+    cacheable. The macro itself is a part of the key, so the same macro
+    name in other macro dicts/objects doesn't collide.
+    """
+    if not getattr(macro, "creole_cacheable", False):
+        return None
+    version = getattr(macro, "creole_cache_version", None)
+    return (macro, macro_name, macro_args, text, version)
+
+
+if __name__ == "__main__":
+    import doctest
+    print(doctest.testmod())
@@ -0,0 +1,144 @@
+# coding: utf-8
+
+
+"""
+    python creole lazy macro registry
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Register macros as "module:function" strings. The module would be
+    imported on the first use of the macro, e.g. pygments is imported only
+    if a page contains <<code>>.
+
+    :copyleft: 2015 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+from importlib import import_module
+import sys
+import threading
+import time
+
+from creole.exceptions import MacroImportError
+
+
+ENTRY_POINT_GROUP = "creole.macros"
+
+
+def iter_entry_points(group):
+    """
+    Generate (name, "module:function") of all installed entry points
+    in the given group, without importing the modules.
+    """
+    try:
+        from importlib.metadata import entry_points # Python 3.8+
+    except ImportError:
+        try:
+            import pkg_resources
+        except ImportError:
+            return
+        for entry_point in pkg_resources.iter_entry_points(group):
+            yield entry_point.name, "%s:%s" % (
+                entry_point.module_name, ".".join(entry_point.attrs)
+            )
+        return
+
+    entry_points = entry_points()
+    if hasattr(entry_points, "select"):
+        entry_points = entry_points.select(group=group)
+    else:
+        entry_points = entry_points.get(group, [])
+    for entry_point in entry_points:
+        yield entry_point.name, entry_point.value
+
+
+def import_macro(import_path):
+    """
+    Import a object from a "module:function" string.
+
+    >>> import_macro("creole.shared.example_macros:pre")("<text>")
+    '<pre>&lt;text&gt;</pre>'
+    """
+    module_name, _, attrs = import_path.partition(":")
+    obj = import_module(module_name)
+    for attr in attrs.split("."):
+        obj = getattr(obj, attr)
+    return obj
+
+
+class MacroRegistry(dict):
+    """
+    A macro dict for HtmlEmitter with lazy imported macros: Values can be
+    callables or "module:function" strings.
+
+    >>> from creole import creole2html
+    >>> macros = MacroRegistry(
+    ...     pre="creole.shared.example_macros:pre",
+    ...     code="creole.shared.example_macros:code",
+    ... )
+    >>> creole2html("<<pre>>a < b<</pre>>", macros=macros)
+    '<pre>a &lt; b</pre>'
+    >>> list(macros.load_times.keys()) == ["pre"] # <<code>> is not loaded
+    True
+
+    A macro that can't be imported raises a MacroImportError, it's not
+    handled like a missing macro.
+
+    Macros of installed packages can be registered in the setup.py with the
+    entry point group "creole.macros", e.g.:
+        entry_points={"creole.macros": ["code = creole.shared.example_macros:code"]}
+    and found with:
+
+    >>> macros = MacroRegistry.from_entry_points()
+    """
+    def __init__(self, *args, **kwargs):
+        super(MacroRegistry, self).__init__(*args, **kwargs)
+        self.load_times = {} # macro name: import time in seconds
+
+        # The imported macros: {"module:function": macro}. The registry
+        # entries are not changed, so it can be shared between threads.
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_entry_points(cls, group=ENTRY_POINT_GROUP):
+        return cls(iter_entry_points(group))
+
+    def __getitem__(self, macro_name):
+        macro = super(MacroRegistry, self).__getitem__(macro_name)
+        if callable(macro):
+            return macro
+
+        import_path = macro
+        try:
+            return self._loaded[import_path]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if import_path in self._loaded: # imported by a other thread
+                return self._loaded[import_path]
+
+            start_time = time.time()
+            try:
+                macro = import_macro(import_path)
+            except (ImportError, AttributeError) as err:
+                # Not a KeyError: The macro exists, but the import path is broken
+                raise MacroImportError("Can't load macro '%s' from '%s': %s" % (
+                    macro_name, import_path, err
+                ), sys.exc_info())
+            self.load_times[macro_name] = time.time() - start_time
+            self._loaded[import_path] = macro
+        return macro
+
+    def get(self, macro_name, default=None):
+        try:
+            return self[macro_name]
+        except KeyError:
+            return default
+
+
+if __name__ == "__main__":
+    import doctest
+    print(doctest.testmod())
@@ -0,0 +1,189 @@
+# coding: utf-8
+
+
+"""
+    python creole macro runner
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Run macro calls concurrently in threads, e.g. macros that wait for a
+    database or a web service, and abandon calls that run too long. Used
+    by HtmlEmitter, if macro_workers or a time limit is set.
+
+    :copyleft: 2015 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+from collections import deque
+import sys
+import threading
+import time
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue # python 2
+
+try:
+    import asyncio
+except ImportError:
+    asyncio = None # python 2
+
+
+timer = getattr(time, "monotonic", time.time) # no monotonic clock in python 2
+
+
+def run_coroutine(result):
+    """
+    Returns the result of a coroutine, e.g. from a 'async def' macro.
+    All other results are returned unchanged.
+    """
+    if asyncio is None or not asyncio.iscoroutine(result):
+        return result
+
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(result)
+    finally:
+        loop.close()
+
+
+class MacroRunner(object):
+    """
+    Call the given functions with max. workers threads at the same time.
+    A call that runs longer than timeout seconds or isn't finished at the
+    deadline (seconds after the start of run()) would be abandoned:
+    Python threads can't be killed, but the result is not awaited.
+    A abandoned call keeps its (daemon) thread until it returns, but it
+    doesn't count against workers: the next call starts at once in a new
+    thread. Only started calls can time out, calls that are not started
+    before the deadline are listed in deadline_exceeded.
+
+    >>> import time
+    >>> def slow(no):
+    ...     def func():
+    ...         time.sleep(0.05 * no)
+    ...         return "result %i" % no
+    ...     return func
+    >>> runner = MacroRunner(workers=4, timeout=0.5)
+    >>> results = runner.run([(no, slow(no)) for no in (3, 2, 1, 20)])
+    >>> for no in sorted(results):
+    ...     print(results[no])
+    result 1
+    result 2
+    result 3
+    >>> runner.timed_out
+    [20]
+
+    A timeout for single calls and a deadline for all calls:
+
+    >>> runner = MacroRunner(workers=1, deadline=0.5)
+    >>> results = runner.run([(no, slow(no)) for no in (1, 2, 3, 20)], timeouts={2: 0.01})
+    >>> for no in sorted(results):
+    ...     print(results[no])
+    result 1
+    result 3
+    >>> runner.timed_out, runner.deadline_exceeded
+    ([2], [20])
+    >>> sorted(runner.durations)
+    [1, 2, 3, 20]
+    """
+    def __init__(self, workers=4, timeout=None, deadline=None):
+        assert workers > 0, "workers must be greater than 0!"
+        self.workers = workers
+        self.timeout = timeout
+        self.deadline = deadline
+        self.timed_out = [] # The keys of the abandoned calls
+        self.deadline_exceeded = [] # The keys of the calls after the deadline
+        self.durations = {} # key: run time in seconds
+
+    def _call(self, done, key, func):
+        try:
+            result = func()
+        except Exception:
+            done.put((key, None, sys.exc_info()[1]))
+        else:
+            done.put((key, result, None))
+
+    def _start(self, done, key, func):
+        thread = threading.Thread(target=self._call, args=(done, key, func))
+        thread.daemon = True # Don't wait for abandoned calls on exit
+        thread.start()
+
+    def run(self, calls, timeouts=None):
+        """
+        Call all (key, func) pairs and returns the results as a dict:
+        {key: result}. Timed out calls are missing in the dict.
+        timeouts is a optional dict with {key: timeout} for single calls.
+        A exception raised in a call would be re-raised.
+        """
+        if timeouts is None:
+            timeouts = {}
+        if self.deadline is None:
+            deadline = None
+        else:
+            deadline = timer() + self.deadline
+
+        done = queue.Queue()
+        pending = deque(calls)
+        running = {} # key: (start time, timeout)
+        abandoned = set() # The keys of the abandoned calls, that still run
+        results = {}
+        while pending or running:
+            while pending and len(running) < self.workers:
+                key, func = pending.popleft()
+                now = timer()
+                if deadline is not None and now >= deadline:
+                    # Don't start new calls after the deadline
+                    self.deadline_exceeded.append(key)
+                    self.durations[key] = 0
+                    continue
+                running[key] = (now, timeouts.get(key, self.timeout))
+                self._start(done, key, func)
+
+            ends = [
+                start + timeout
+                for start, timeout in running.values() if timeout is not None
+            ]
+            if deadline is not None:
+                ends.append(deadline)
+            if ends:
+                wait = max(min(ends) - timer(), 0)
+            else:
+                wait = None
+
+            try:
+                key, result, error = done.get(timeout=wait)
+            except queue.Empty:
+                now = timer()
+                for key, (start, timeout) in list(running.items()):
+                    if timeout is not None and now - start >= timeout:
+                        self.timed_out.append(key)
+                    elif deadline is not None and now >= deadline:
+                        self.deadline_exceeded.append(key)
+                    else:
+                        continue
+                    # The thread is left alone, a new thread takes the slot
+                    del running[key]
+                    abandoned.add(key)
+                    self.durations[key] = now - start
+                continue
+
+            if key in abandoned:
+                # The late result of a abandoned call is dropped
+                abandoned.remove(key)
+                continue
+            start, timeout = running.pop(key)
+            self.durations[key] = timer() - start
+
+            if error is not None:
+                raise error
+            results[key] = result
+
+        return results
+
+
+if __name__ == "__main__":
+    import doctest
+    print(doctest.testmod())
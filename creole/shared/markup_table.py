@@ -51,7 +51,13 @@ class MarkupTable(object):
             cells.append(line_cells)
 
         # Build a list of max len for every column
-        widths = [max(map(len, col)) for col in zip(*cells)]
+        widths = []
+        for row in cells:
+            for index, cell in enumerate(row):
+                if index < len(widths):
+                    widths[index] = max(widths[index], len(cell))
+                else:
+                    widths.append(len(cell))
 
         return cells, widths
 
@@ -0,0 +1,94 @@
+# coding: utf-8
+
+
+"""
+    python creole output writer
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Write the fragments of a conversion into a file-like object, instead of
+    building one string for the whole document. Used by the emitters, if
+    a 'out' file is given.
+
+    :copyleft: 2015 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import codecs
+
+
+# Characters collected before a out.write() call
+BUFFER_SIZE = 256 * 1024
+
+
+class OutputWriter(object):
+    """
+    Collect text fragments and write them in big chunks into out, with the
+    same result as out.write("".join(fragments).strip()): Whitespace at
+    the start is skipped and whitespace at the end is written only, if
+    more text follows. With a encoding, the text is encoded and written
+    into a binary file.
+
+    >>> from io import BytesIO
+    >>> out = BytesIO()
+    >>> writer = OutputWriter(out, encoding="utf-8")
+    >>> for fragment in ("\\n ", "<p>", "\\xe4", "</p>\\n", "\\n", "<p>b</p>", "\\n"):
+    ...     writer.write(fragment)
+    >>> writer.close()
+    >>> out.getvalue() == "<p>\\xe4</p>\\n\\n<p>b</p>".encode("utf-8")
+    True
+
+    With lstrip=False only the whitespace at the end is removed, like
+    with rstrip().
+    """
+    def __init__(self, out, encoding=None, lstrip=True, buffer_size=BUFFER_SIZE):
+        self.out = out
+        if encoding is None:
+            self.encoder = None
+        else:
+            # A incremental encoder writes e.g. the utf-16 BOM only once
+            self.encoder = codecs.getincrementalencoder(encoding)()
+        self.buffer_size = buffer_size
+
+        self.started = not lstrip # True, if text was written
+        self.buffer = []
+        self.buffered = 0 # The number of characters in self.buffer
+        self.whitespace = "" # Written only, if more text follows
+
+    def write(self, text):
+        self.buffer.append(text)
+        self.buffered += len(text)
+        if self.buffered >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """ Write the buffered text, without the whitespace at the end. """
+        text = self.whitespace + "".join(self.buffer)
+        self.buffer = []
+        self.buffered = 0
+        if not self.started:
+            text = text.lstrip()
+            self.started = bool(text)
+
+        stripped = text.rstrip()
+        self.whitespace = text[len(stripped):]
+        if not stripped:
+            return
+        if self.encoder is None:
+            self.out.write(stripped)
+        else:
+            self.out.write(self.encoder.encode(stripped))
+
+    def close(self):
+        """ Write the rest, the out file is not closed. """
+        self.flush()
+        if self.encoder is not None:
+            rest = self.encoder.encode("", True)
+            if rest:
+                self.out.write(rest)
+
+
+if __name__ == "__main__":
+    import doctest
+    print(doctest.testmod())
@@ -11,17 +11,37 @@
 
 from __future__ import division, absolute_import, print_function, unicode_literals
 
+import hashlib
 import shlex
 import json
+import re
+import threading
 
 from creole.py3compat import TEXT_TYPE, PY3
+from creole.shared.lru_cache import LRUCache
 
-try:
-    from pygments import lexers
-    from pygments.formatters import HtmlFormatter
-    PYGMENTS = True
-except ImportError:
-    PYGMENTS = False
+
+def module_exists(module_name):
+    """
+    Check if a top level module can be imported, without importing it.
+
+    >>> module_exists("json"), module_exists("not_exists")
+    (True, False)
+    """
+    try:
+        from importlib.util import find_spec # python 3
+    except ImportError:
+        import imp
+        try:
+            imp.find_module(module_name)
+        except ImportError:
+            return False
+        return True
+    return find_spec(module_name) is not None
+
+
+# pygments is imported on the first highlighted code, see highlight_code()
+PYGMENTS = module_exists("pygments")
 
 
 # For string2dict()
@@ -31,26 +51,79 @@ KEYWORD_MAP = {
     "None": None,
 }
 
-def string2dict(raw_content, encoding="utf-8"):
-    """
-    convert a string into a dictionary. e.g.:
+# The same syntax as shlex.split() in POSIX mode without comments
+ARGS_TOKEN_RE = re.compile(r"""
+    (?P<space> [ \t\r\n]+ )
+    |
+    (?P<word> [^ \t\r\n'"\\]+ )
+    |
+    '(?P<single> [^']* )'
+    |
+    "(?P<double> (?:[^"\\]|\\.)* )"
+    |
+    \\(?P<escaped> . )
+""", re.VERBOSE | re.DOTALL)
+DOUBLE_QUOTE_ESCAPE_RE = re.compile(r'\\(["\\])')
 
-    >>> string2dict('key="value"')
-    {'key': 'value'}
 
-    >>> string2dict('key1="value1" key2="value2"') == {'key2': 'value2', 'key1': 'value1'}
+def split_args(raw_content):
+    """
+    Split macro arguments like shlex.split(), but faster.
+
+    >>> split_args('key1="value 1" key2=\\'value 2\\' key3=a\\\\ b') == ['key1=value 1', 'key2=value 2', 'key3=a b']
     True
 
-    See test_creole2html.TestString2Dict()
+    Invalid syntax raise the same ValueError as shlex.split():
+
+    >>> split_args('key="value')
+    Traceback (most recent call last):
+    ...
+    ValueError: No closing quotation
     """
+    match_token = ARGS_TOKEN_RE.match
+    tokens = []
+    parts = None # The parts of the current token
+    pos = 0
+    end = len(raw_content)
+    while pos < end:
+        match = match_token(raw_content, pos)
+        if match is None:
+            # Let shlex raise the error
+            return shlex.split(raw_content)
+        pos = match.end()
+
+        kind = match.lastgroup
+        if kind == "space":
+            if parts is not None:
+                tokens.append("".join(parts))
+                parts = None
+            continue
+
+        if parts is None:
+            parts = []
+        if kind == "double":
+            parts.append(
+                DOUBLE_QUOTE_ESCAPE_RE.sub(r"\1", match.group("double"))
+            )
+        else:
+            parts.append(match.group(kind))
+
+    if parts is not None:
+        tokens.append("".join(parts))
+    return tokens
+
+
+# string2dict() results as tuples: {(raw_content, encoding): ((key, value), ...)}
+string2dict_cache = LRUCache(maxsize=512)
+
+def _string2items(raw_content, encoding):
     if not PY3 and isinstance(raw_content, TEXT_TYPE):
         # shlex.split doesn't work with unicode?!?
+        # Note: Encode it anyway, to get the same results as shlex.split()
         raw_content = raw_content.encode(encoding)
 
-    parts = shlex.split(raw_content)
-
-    result = {}
-    for part in parts:
+    items = []
+    for part in split_args(raw_content):
         key, value = part.split("=", 1)
 
         if value in KEYWORD_MAP:
@@ -63,9 +136,35 @@ def string2dict(raw_content, encoding="utf-8"):
             except ValueError:
                 pass
 
-        result[key] = value
+        items.append((key, value))
 
-    return result
+    return tuple(items)
+
+
+def string2dict(raw_content, encoding="utf-8"):
+    """
+    convert a string into a dictionary. e.g.:
+
+    >>> string2dict('key="value"')
+    {'key': 'value'}
+
+    >>> string2dict('key1="value1" key2="value2"') == {'key2': 'value2', 'key1': 'value1'}
+    True
+
+    The same macro arguments are parsed only once, see string2dict_cache,
+    but every call returns a new dict:
+
+    >>> string2dict('key="value"') is string2dict('key="value"')
+    False
+
+    See test_creole2html.TestString2Dict()
+    """
+    cache_key = (raw_content, encoding)
+    items = string2dict_cache.get(cache_key)
+    if items is None:
+        items = _string2items(raw_content, encoding)
+        string2dict_cache.set(cache_key, items)
+    return dict(items)
 
 
 def dict2string(d):
@@ -87,23 +186,85 @@ def dict2string(d):
     return " ".join(attr_list)
 
 
+# The pygments formatter and the caches are created together on the first
+# highlighted code, see _init_highlighting()
+_pygments_formatter = None # The formatter options are always the same
+lexer_cache = None # {source_type: lexer or None if unknown}
+highlight_cache = None # {(source_type, sha1 of the code): html}
+_highlighting_lock = threading.Lock()
+_MISSING = object()
+
+def _init_highlighting():
+    global _pygments_formatter, lexer_cache, highlight_cache
+    with _highlighting_lock:
+        if highlight_cache is None:
+            from pygments.formatters import HtmlFormatter
+            _pygments_formatter = HtmlFormatter(lineos = True, encoding='utf-8',
+                                 style='colorful', outencoding='utf-8',
+                                 cssclass='pygments')
+            lexer_cache = LRUCache(maxsize=64)
+            highlight_cache = LRUCache(maxsize=128)
+
+
 def get_pygments_formatter():
     if PYGMENTS:
-        return HtmlFormatter(lineos = True, encoding='utf-8',
-                             style='colorful', outencoding='utf-8',
-                             cssclass='pygments')
+        if highlight_cache is None:
+            _init_highlighting()
+        return _pygments_formatter
 
 
 def get_pygments_lexer(source_type, code):
     if PYGMENTS:
-        try:
-            return lexers.get_lexer_by_name(source_type)
-        except:
+        from pygments import lexers
+        from pygments.util import ClassNotFound
+
+        if highlight_cache is None:
+            _init_highlighting()
+        lexer = lexer_cache.get(source_type, _MISSING)
+        if lexer is _MISSING:
+            try:
+                lexer = lexers.get_lexer_by_name(source_type)
+            except ClassNotFound:
+                lexer = None
+            lexer_cache.set(source_type, lexer)
+
+        if lexer is None:
+            # Note: guess_lexer() runs the analyser of all lexers
             return lexers.guess_lexer(code)
+        return lexer
     else:
         return None
 
 
+# Optional multiprocessing.Pool() for code with more than
+# LARGE_CODE_SIZE characters, used in highlight_code()
+highlight_pool = None
+LARGE_CODE_SIZE = 50000
+
+def _highlight(source_type, code):
+    from pygments import highlight
+    lexer = get_pygments_lexer(source_type, code)
+    return highlight(code, lexer, get_pygments_formatter()).decode('utf-8')
+
+def highlight_code(source_type, code):
+    """
+    Returns the pygments html code for the source code. The result for
+    the same source type and code is cached in highlight_cache.
+    Large code would be highlighted in the highlight_pool, if it's set.
+    """
+    if highlight_cache is None:
+        _init_highlighting()
+    cache_key = (source_type, hashlib.sha1(code.encode('utf-8')).hexdigest())
+    html = highlight_cache.get(cache_key)
+    if html is None:
+        if highlight_pool is not None and len(code) >= LARGE_CODE_SIZE:
+            html = highlight_pool.apply(_highlight, (source_type, code))
+        else:
+            html = _highlight(source_type, code)
+        highlight_cache.set(cache_key, html)
+    return html
+
+
 if __name__ == "__main__":
     import doctest
     print(doctest.testmod())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+    Converter unittest
+    ~~~~~~~~~~~~~~~~~~
+
+    A reused Converter must return the same results as the functions.
+
+    :copyleft: 2015 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import unittest
+
+from creole import Converter, creole2html, creole2rest, creole2textile, \
+    html2creole, html2rest, html2textile
+from creole.emitter.creol2html_emitter import HtmlEmitter
+from creole.shared.unknown_tags import escape_unknown_nodes
+from creole.tests.test_macros import unittest_macro2
+from creole.tests.utils.base_unittest import BaseCreoleTest
+
+
+class ConverterTests(BaseCreoleTest):
+    def setUp(self):
+        self.markup = self._prepare_text("""
+            = Headline
+            A **bold** [[/url/|link]] and
+            a new line with <<test char="|">>a b<</test>>.
+
+            * item
+            |= head |= head |
+            | cell  | cell  |
+        """)
+        self.html = creole2html(self.markup, macros={"test": unittest_macro2})
+
+    def test_creole2html(self):
+        for blog_line_breaks in (True, False):
+            converter = Converter(blog_line_breaks=blog_line_breaks,
+                macros={"test": unittest_macro2}
+            )
+            for _ in range(2):
+                self.assertEqual(converter.render(self.markup), creole2html(self.markup,
+                    blog_line_breaks=blog_line_breaks, macros={"test": unittest_macro2}
+                ))
+
+    def test_creole2markup(self):
+        converter = Converter(macros={"test": unittest_macro2})
+        self.assertEqual(converter.creole2rest(self.markup),
+            creole2rest(self.markup, macros={"test": unittest_macro2})
+        )
+        self.assertEqual(converter.creole2textile(self.markup),
+            creole2textile(self.markup, macros={"test": unittest_macro2})
+        )
+
+    def test_html2markup(self):
+        html = self.html + "<unknown>tag</unknown>"
+        converter = Converter(unknown_emit=escape_unknown_nodes)
+        self.assertEqual(converter.html2creole(html),
+            html2creole(html, unknown_emit=escape_unknown_nodes)
+        )
+        self.assertEqual(converter.html2rest(self.html), html2rest(self.html))
+        self.assertEqual(converter.html2textile(html),
+            html2textile(html, unknown_emit=escape_unknown_nodes)
+        )
+
+    def test_emitter_kwargs(self):
+        # The HtmlEmitter arguments are used for all creole2* methods
+        def link_resolver(targets):
+            return dict((target, ("/wiki/%s/" % target, "missing")) for target in targets)
+
+        converter = Converter(link_resolver=link_resolver, macro_workers=2,
+            macros={"test": unittest_macro2}
+        )
+        html = converter.render('[[Page]] <<test char="-">>a b<</test>>')
+        self.assertEqual(html,
+            '<p><a href="/wiki/Page/" class="missing">Page</a> a-b</p>'
+        )
+        self.assertEqual(converter.creole2rest("[[Page]]"), html2rest(converter.render("[[Page]]")))
+        self.assertEqual(converter.creole2textile("[[Page]]"), html2textile(converter.render("[[Page]]")))
+
+        link = converter.creole2etree('[[Page]] <<test char="-">>a b<</test>>').find("p/a")
+        self.assertEqual(link.attrib, {"href": "/wiki/Page/", "class": "missing"})
+        self.assertEqual(link.tail, " a-b")
+
+    def test_emitter_tables(self):
+        # The tag tables are computed once, not for every render
+        converter = Converter(compact=True)
+        get_tables = HtmlEmitter.__dict__["get_tables"]
+
+        def fail(cls, compact=False):
+            raise AssertionError("get_tables() called")
+        HtmlEmitter.get_tables = classmethod(fail)
+        try:
+            self.assertEqual(converter.render("* one\n** two"),
+                "<ul><li>one<ul><li>two</li></ul></li></ul>"
+            )
+            self.assertEqual(converter.creole2rest("**bold**"), "**bold**")
+        finally:
+            HtmlEmitter.get_tables = get_tables
+
+
+if __name__ == '__main__':
+    unittest.main()
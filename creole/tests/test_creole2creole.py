@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+    creole2creole unittest
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Check the creole markup normalizer. Normalize the normalized markup
+    again must not change it.
+
+    :copyleft: 2015 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import unittest
+
+from creole import creole2creole
+from creole.tests.utils.base_unittest import BaseCreoleTest
+
+
+class Creole2creoleTests(BaseCreoleTest):
+    def assert_creole2creole(self, normalized_string, creole_string):
+        normalized_string = self._prepare_text(normalized_string)
+        creole_string = self._prepare_text(creole_string)
+
+        normalized = creole2creole(creole_string)
+        self.assertEqual(normalized, normalized_string)
+
+        # normalize again must not change anything
+        self.assertEqual(creole2creole(normalized), normalized)
+
+    def test_headlines_and_paragraphs(self):
+        self.assert_creole2creole(
+            normalized_string="""
+                = Headline
+
+                A **bold**
+                text.
+
+                == Sub headline
+            """,
+            creole_string="""
+                =Headline=
+                A **bold**
+                text.
+
+
+                ==   Sub headline ==
+            """,
+        )
+
+    def test_lists(self):
+        self.assert_creole2creole(
+            normalized_string="""
+                * item 1
+                ** item 1.1
+                * item 2
+
+                # one
+                # two
+            """,
+            creole_string="""
+                *item 1
+                  ** item 1.1
+                *   item 2
+
+                #one
+                #two
+            """,
+        )
+
+    def test_table(self):
+        self.assert_creole2creole(
+            normalized_string="""
+                |= head 1 |= head 2  |
+                | cell 1  | **cell** |
+            """,
+            creole_string="""
+                |=head 1|=head 2|
+                |cell 1|**cell**|
+            """,
+        )
+
+    def test_escaping(self):
+        self.assert_creole2creole(
+            normalized_string="""
+                ~* no list and ~**no bold**
+
+                ~= no headline ~{{{no pre}}} ~ ~http://no.link
+            """,
+            creole_string="""
+                ~* no list and ~**no bold**
+
+                ~= no headline ~{{{no pre}}} ~~ ~http://no.link
+            """,
+        )
+
+    def test_macros_and_pre(self):
+        self.assert_creole2creole(
+            normalized_string="""
+                A <<inline>> macro tag.
+
+                <<code ext=".py">>
+                print("creole")
+                <</code>>
+
+                {{{
+                **no bold**
+                ~}}}
+                }}}
+            """,
+            creole_string="""
+                A <<inline>> macro tag.
+                <<code ext=".py">>
+                print("creole")
+                <</code>>
+                {{{
+                **no bold**
+                ~}}}
+                }}}
+            """,
+        )
+
+    def test_links_and_images(self):
+        self.assert_creole2creole(
+            normalized_string="""
+                [[/url/|link]] [[http://domain.tld]] http://domain.tld
+                {{/image.png|image}}
+            """,
+            creole_string="""
+                [[/url/ | link ]] [[http://domain.tld]] http://domain.tld
+                {{/image.png | image}}
+            """,
+        )
+
+    def test_previous(self):
+        previous = creole2creole("= Headline\n\n*one\n\n**two**")
+        self.assertEqual(previous, "= Headline\n\n* one\n\n**two**")
+
+        self.assertEqual(
+            creole2creole("=Headline=\n\n*one\n*new\n\n**two**", previous=previous),
+            "= Headline\n\n* one\n* new\n\n**two**"
+        )
+        self.assertEqual(
+            creole2creole("**two**\n\n\n= Headline", previous=previous),
+            "**two**\n\n= Headline"
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -18,9 +18,14 @@
 
 from __future__ import division, absolute_import, print_function, unicode_literals
 
+import re
+import shlex
 import sys
+import threading
+import time
 import unittest
 import warnings
+from xml.dom import minidom
 
 try:
     from StringIO import StringIO
@@ -38,8 +43,12 @@ from creole.tests import test_macros
 from creole.py3compat import PY3
 
 from creole import creole2html
-from creole.shared import example_macros
-from creole.shared.utils import string2dict, dict2string
+from creole.emitter.creol2html_emitter import HtmlEmitter
+from creole.parser.creol2html_parser import CreoleParser
+from creole.shared import example_macros, utils
+from creole.shared.lru_cache import LRUCache
+from creole.shared.macro_cache import cacheable, macro_cache
+from creole.shared.utils import string2dict, dict2string, split_args
 
 
 class TestCreole2html(BaseCreoleTest):
@@ -49,6 +58,8 @@ class TestCreole2html(BaseCreoleTest):
     def setUp(self):
         # For fallback tests
         example_macros.PYGMENTS = PYGMENTS
+        # The cached code macro results depends on PYGMENTS
+        macro_cache.clear()
 
     def test_stderr(self):
         """
@@ -151,6 +162,291 @@ class TestCreole2html(BaseCreoleTest):
             }
         )
 
+    def test_macro_cache(self):
+        calls = []
+        @cacheable(version=1)
+        def test(text, foo):
+            calls.append(text)
+            return "%s|%s" % (foo, text)
+
+        cache = LRUCache(maxsize=10)
+        markup = "x <<test foo=1>>a<</test>> <<test foo=1>>a<</test>> <<test foo=2>>a<</test>>"
+        for _ in range(2):
+            html = creole2html(markup, macros={"test": test}, macro_cache=cache)
+            self.assertEqual(html, "<p>x 1|a 1|a 2|a</p>")
+        self.assertEqual(calls, ["a", "a"])
+        self.assertEqual(cache.info(),
+            {"hits": 4, "misses": 2, "size": 2, "maxsize": 10}
+        )
+
+        # A new version invalidates the cached results
+        test.creole_cache_version = 2
+        creole2html(markup, macros={"test": test}, macro_cache=cache)
+        self.assertEqual(calls, ["a", "a", "a", "a"])
+
+    def test_macro_workers(self):
+        def wait(text, sec):
+            time.sleep(sec / 100)
+            return text
+
+        markup = self._prepare_text("""
+            <<wait sec=20>>block<</wait>>
+            inline <<wait sec=30>>1<</wait>> and <<wait sec=10>>2<</wait>>
+            * <<wait sec=5>>item<</wait>> <<wait sec=200>>timeout<</wait>>
+        """)
+        start_time = time.time()
+        html = creole2html(markup, macros={"wait": wait},
+            macro_workers=5, macro_timeout=0.5
+        )
+        duration = time.time() - start_time
+        self.assertEqual(html, self._prepare_text("""
+            block
+            <p>inline 1 and 2</p>
+            <ul>
+            	<li>item [Error: Macro 'wait' timeout after 0.5 sec.]
+            </li>
+            </ul>
+        """))
+        # The macros don't wait for each other, only for the timeout
+        self.assertTrue(duration < 1.0, duration)
+
+    def test_render_deadline(self):
+        def wait(text, sec):
+            time.sleep(sec / 100)
+            return text
+
+        timing = []
+        def macro_timing(macro_name, duration, timed_out):
+            timing.append((macro_name, timed_out))
+
+        start_time = time.time()
+        html = creole2html(
+            "x <<wait sec=5>>a<</wait>> <<fast sec=30>>b<</fast>>"
+            " <<wait sec=1>>c<</wait>> <<wait sec=500>>d<</wait>> <<wait sec=0>>e<</wait>>",
+            macros={"wait": wait, "fast": wait},
+            macro_time_limits={"fast": 0.1}, render_deadline=0.5,
+            macro_timing=macro_timing,
+        )
+        duration = time.time() - start_time
+        self.assertEqual(html,
+            "<p>x a [Error: Macro 'fast' timeout after 0.1 sec.]\n c"
+            " [Error: Macro 'wait' exceeded the render deadline of 0.5 sec.]\n"
+            " [Error: Macro 'wait' exceeded the render deadline of 0.5 sec.]\n</p>"
+        )
+        self.assertTrue(duration < 1.0, duration)
+        self.assertEqual(timing, [
+            ("wait", False), ("fast", True), ("wait", False), ("wait", True), ("wait", True)
+        ])
+
+    def test_macro_time_limit_hung(self):
+        # A hung macro with a time limit doesn't block the render
+        release = threading.Event()
+        def hang(text):
+            release.wait(5)
+            return text
+
+        start_time = time.time()
+        try:
+            html = creole2html(
+                "x <<hang>>a<</hang>> <<fast>>b<</fast>> <<fast>>c<</fast>>",
+                macros={"hang": hang, "fast": lambda text: text},
+                macro_time_limits={"hang": 0.2},
+            )
+        finally:
+            release.set()
+        duration = time.time() - start_time
+        self.assertEqual(html,
+            "<p>x [Error: Macro 'hang' timeout after 0.2 sec.]\n b c</p>"
+        )
+        self.assertTrue(duration < 0.4, duration)
+
+    def test_macro_workers_limit(self):
+        # Not more than macro_workers macros run at the same time
+        running = []
+        max_running = []
+        lock = threading.Lock()
+        def wait(text):
+            with lock:
+                running.append(text)
+                max_running.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.remove(text)
+            return text
+
+        html = creole2html(
+            "x " + " ".join("<<wait>>%i<</wait>>" % no for no in range(6)),
+            macros={"wait": wait}, macro_workers=2, macro_timeout=1.0,
+        )
+        self.assertEqual(html, "<p>x 0 1 2 3 4 5</p>")
+        self.assertEqual(max(max_running), 2)
+
+    def test_macro_workers_timeout_started(self):
+        # Only macros that were started are reported as timed out
+        started = []
+        lock = threading.Lock()
+        release = threading.Event()
+        def hang(text):
+            with lock:
+                started.append(text)
+            release.wait(5)
+            return text
+
+        try:
+            html = creole2html(
+                " ".join("<<hang>>%i<</hang>>" % no for no in range(6)),
+                macros={"hang": hang}, macro_workers=2, macro_timeout=0.05,
+            )
+        finally:
+            release.set()
+        self.assertEqual(
+            html.count("[Error: Macro 'hang' timeout after 0.05 sec.]"), 6, html
+        )
+        with lock:
+            self.assertEqual(sorted(started), ["0", "1", "2", "3", "4", "5"])
+
+    def test_macro_workers_abandoned(self):
+        # A hung macro doesn't delay the other macros
+        release = threading.Event()
+        def hang(text):
+            release.wait(5)
+            return text
+
+        start_time = time.time()
+        try:
+            html = creole2html(
+                "x <<hang>>a<</hang>> <<fast>>b<</fast>> <<fast>>c<</fast>>",
+                macros={"hang": hang, "fast": lambda text: text},
+                macro_workers=1, macro_timeout=0.1,
+            )
+        finally:
+            release.set()
+        duration = time.time() - start_time
+        self.assertEqual(html,
+            "<p>x [Error: Macro 'hang' timeout after 0.1 sec.]\n b c</p>"
+        )
+        self.assertTrue(duration < 0.5, duration)
+
+    def test_macro_timing_stderr(self):
+        my_stderr = StringIO()
+        creole2html("<<test>>a<</test>>",
+            macros={"test": lambda text: text}, macro_workers=2,
+            verbose=2, stderr=my_stderr,
+        )
+        self.assertTrue(
+            my_stderr.getvalue().startswith("Macro 'test' run time: "),
+            my_stderr.getvalue()
+        )
+
+    def test_link_resolver(self):
+        calls = []
+        def link_resolver(targets):
+            calls.append(targets)
+            return {
+                "ExistingPage": ("/wiki/ExistingPage/", None),
+                "NewPage": ("/wiki/NewPage/", "missing"),
+                "http://domain.tld": (None, "external"),
+            }
+
+        html = creole2html(self._prepare_text("""
+            [[ExistingPage]], [[NewPage|new]] and [[NewPage]]
+            * http://domain.tld and ~http://escaped.tld
+            * [[/unresolved/]]
+        """), link_resolver=link_resolver)
+        self.assertEqual(html, self._prepare_text("""
+            <p><a href="/wiki/ExistingPage/">ExistingPage</a>, <a href="/wiki/NewPage/" class="missing">new</a> and <a href="/wiki/NewPage/" class="missing">NewPage</a></p>
+            <ul>
+            \t<li><a href="http://domain.tld" class="external">http://domain.tld</a> and http://escaped.tld</li>
+            \t<li><a href="/unresolved/">/unresolved/</a></li>
+            </ul>
+        """))
+        # called only once with all link targets
+        self.assertEqual(calls, [
+            set(["ExistingPage", "NewPage", "http://domain.tld", "/unresolved/"])
+        ])
+
+    def test_emitter_subclass(self):
+        """ Overwritten *_emit methods must be used by HtmlEmitter.write_node() """
+        class MyEmitter(HtmlEmitter):
+            def strong_emit(self, node):
+                return '<b>%s</b>' % self.emit_children(node)
+
+            def _list_emit(self, node, list_type):
+                return '<%s />' % list_type
+
+        document = CreoleParser(self._prepare_text("""
+            A **bold** //word//
+            * list
+        """)).parse()
+        self.assertEqual(MyEmitter(document).emit(), self._prepare_text("""
+            <p>A <b>bold</b> <i>word</i></p>
+            <ul />
+        """))
+
+    def _dom_tree(self, html):
+        """
+        Returns the DOM tree of the html code as nested tuples. Whitespace
+        is normalized like the browsers do, except in <pre>: Whitespace
+        is only removed at the start and the end of blocks and lines.
+        """
+        blocks = set((
+            "div", "p", "pre", "ul", "ol", "li", "table", "tr", "th", "td", "hr",
+            "h1", "h2", "h3", "h4", "h5", "h6", "br",
+        ))
+        def is_block(node):
+            return node.nodeType != node.TEXT_NODE and node.tagName in blocks
+
+        def convert(node, in_pre=False):
+            if node.nodeType == node.TEXT_NODE:
+                if in_pre:
+                    return node.data
+                text = re.sub(r"\s+", " ", node.data)
+                if is_block(node.previousSibling or node.parentNode):
+                    text = text.lstrip()
+                if is_block(node.nextSibling or node.parentNode):
+                    text = text.rstrip()
+                return text or None
+            in_pre = in_pre or node.tagName == "pre"
+            children = [convert(child, in_pre) for child in node.childNodes]
+            return (
+                node.tagName,
+                sorted(node.attributes.items()),
+                [child for child in children if child is not None],
+            )
+        document = minidom.parseString(("<div>%s</div>" % html).encode("utf-8"))
+        return convert(document.documentElement)
+
+    def test_compact(self):
+        markup = self._prepare_text("""
+            <<toc>>
+            = Headline
+            Text **bold //italic//** with\\\\a break and a [[/url/|link]].
+            == Lists
+            * one\\\\two
+            ** three {{image.png|image}}
+            # four
+            ----
+            |= head |= er |
+            | cell\\\\break | {{{inline}}} |
+
+            {{{
+            <pre>
+              code
+            }}}
+            x <<html>><b>macro</b><</html>>
+            last
+
+            <<html>><b>m</b><</html>>
+            <<html>><b>m</b><</html>>
+        """)
+        html = creole2html(markup, macros=example_macros)
+        compact_html = creole2html(markup, macros=example_macros, compact=True)
+
+        self.assertTrue(len(compact_html) < len(html))
+        self.assertNotIn("\t", compact_html)
+        self.assertEqual(compact_html.count("\n"), 3) # only in <pre>
+        self.assertEqual(self._dom_tree(compact_html), self._dom_tree(html))
+
     def test_macro_wrong_arguments_with_error_report(self):
         """
         simple test for the "macro API"
@@ -225,6 +521,24 @@ class TestCreole2html(BaseCreoleTest):
             macros={'code': example_macros.code}
         )
 
+    def test_code_macro_highlight_cache(self):
+        if not PYGMENTS:
+            warnings.warn("Skip test, because 'pygments' is not installed.")
+            return
+
+        html1 = creole2html('<<code ext=".py">>\nprint("a")\n<</code>>',
+            macros={'code': example_macros.code}
+        )
+        hits = utils.highlight_cache.info()["hits"]
+        # other ext, but the same source type and code
+        html2 = creole2html('<<code ext="py">>\nprint("a")\n<</code>>',
+            macros={'code': example_macros.code}
+        )
+        self.assertEqual(html1, html2)
+        self.assertEqual(utils.highlight_cache.info()["hits"], hits + 1)
+        self.assertTrue(utils.get_pygments_lexer("py", "") is utils.get_pygments_lexer("py", ""))
+        self.assertTrue(utils.get_pygments_formatter() is utils.get_pygments_formatter())
+
     def test_code_macro_fallback(self):
         # force to use fallback. Will be reset in self.setUp()
         example_macros.PYGMENTS = False
@@ -735,6 +1049,32 @@ class TestCreole2htmlMarkup(BaseCreoleTest):
             <p>ok?</p>
         """)
 
+    def test_toc_in_paragraph_with_depth(self):
+        """
+        The toc is emitted in place. The depth is only used for the
+        headlines after the toc macro.
+        """
+        self.assert_creole2html(r"""
+            === first
+
+            See: <<toc depth=2>>
+            == second
+            === third
+        """, """
+            <a name="first"><h3>first</h3></a>
+
+            <p>See: <ul>
+                <ul>
+                    <ul>
+                        <li><a href="#first">first</a></li>
+                    </ul>
+                    <li><a href="#second">second</a></li>
+                </ul>
+            </ul></p>
+            <a name="second"><h2>second</h2></a>
+            <a name="third"><h3>third</h3></a>
+        """)
+
     def test_image(self):
         """ test image tag with different picture text """
         self.assert_creole2html(r"""
@@ -777,6 +1117,18 @@ class TestCreole2htmlMarkup(BaseCreoleTest):
             """
         )
 
+    def test_inline_markup_in_plain_text(self):
+        """
+        Plain text between the inline markup would be added in one piece.
+        """
+        self.assert_creole2html(r"""
+            plain text http://a.tld/~foo ~http://b.tld one-dash a/b **bold**~
+            a_b __underline__ {{/image.png}} end
+        """, """
+            <p>plain text <a href="http://a.tld/~foo">http://a.tld/~foo</a> http://b.tld one-dash a/b <strong>bold</strong>~<br />
+            a_b <u>underline</u> <img src="/image.png" title="/image.png" alt="/image.png" /> end</p>
+        """)
+
     def test_wiki_style_line_breaks1(self):
         html = creole2html(
             markup_string=self._prepare_text("""
@@ -931,6 +1283,28 @@ class TestStr2Dict(unittest.TestCase):
             {'key3': 3, 'key2': 2, 'key1': 1}
         )
 
+    def test_split_args_like_shlex(self):
+        for raw_content in (
+                'key1="value1" key2="value2"',
+                'A="B" C=1 D=1.1 E=True F=False G=None',
+                '''key1="'1'" key2='"2"' key3="""'3'""" ''',
+                'title="a \\"quoted\\" \\\\ \\word" path=C:\\\\dir\\ name',
+                "  a=''\tb=\"\"\nc=x'y z'\"\" # no comment ",
+                "",
+            ):
+            if not PY3:
+                raw_content = raw_content.encode("utf-8")
+            self.assertEqual(split_args(raw_content), shlex.split(raw_content))
+
+        for raw_content in ('key="value', "key='value", 'key=value\\'):
+            self.assertRaises(ValueError, split_args, raw_content)
+
+    def test_cached_copy(self):
+        result = string2dict('key="value" no=1')
+        result["key"] = "changed"
+        self.assertEqual(string2dict('key="value" no=1'), {'key': 'value', 'no': 1})
+
+
 class TestDict2String(unittest.TestCase):
     def test_basic(self):
         self.assertEqual(
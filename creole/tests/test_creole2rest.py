@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+    creole2rest unittest
+    ~~~~~~~~~~~~~~~~~~~~
+
+    Check the direct creole -> ReSt conversion without the html round trip.
+    The result must be the same as creole2html -> html2rest.
+
+    :copyleft: 2015 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import unittest
+
+from creole import creole2rest
+from creole.shared.unknown_tags import raise_unknown_node, \
+    escape_unknown_nodes, transparent_unknown_nodes
+from creole.tests.utils.base_unittest import BaseCreoleTest
+
+
+class Creole2restTests(BaseCreoleTest):
+    def test_typeface(self):
+        self.assert_creole2rest(
+            rest_string="""
+                This is **bold** and *italic* and ``pre_inline``!
+            """,
+            creole_string="""
+                This is **bold** and //italic// and {{{pre_inline}}}!
+            """,
+        )
+
+    def test_headlines_and_paragraphs(self):
+        self.assert_creole2rest(
+            rest_string="""
+                ========
+                headline
+                ========
+
+                first block, line 1
+                line 2
+
+                second block
+            """,
+            creole_string="""
+                = headline
+
+                first block, line 1
+                line 2
+
+                second block
+            """,
+        )
+
+    def test_links_and_images(self):
+        self.assert_creole2rest(
+            rest_string="""
+                A `link <http://domain.tld>`_ and a |image| image.
+
+                .. |image| image:: /path/to/image.png
+            """,
+            creole_string="""
+                A [[http://domain.tld|link]] and a {{/path/to/image.png|image}} image.
+            """,
+        )
+
+    def test_lists_and_pre_block(self):
+        self.assert_creole2rest(
+            rest_string="""
+                * item 1
+
+                    * item 1.1
+
+                * item 2
+
+                ::
+
+                    a <pre> block
+            """,
+            creole_string="""
+                * item 1
+                ** item 1.1
+                * item 2
+
+                {{{
+                a <pre> block
+                }}}
+            """,
+        )
+
+    def test_table(self):
+        self.assert_creole2rest(
+            rest_string="""
+                +--------+--------+
+                | head 1 | head 2 |
+                +========+========+
+                | cell 1 | cell 2 |
+                +--------+--------+
+            """,
+            creole_string="""
+                |= head 1 |= head 2 |
+                | cell 1  | cell 2  |
+            """,
+        )
+
+    def test_macro_html(self):
+        self.assert_creole2rest(
+            rest_string="""
+                A **bold** macro.
+            """,
+            creole_string="""
+                A <<html>><strong>bold</strong><</html>> macro.
+            """,
+            macros={"html": lambda text: text},
+        )
+
+    def test_toc_block_macro(self):
+        self.assert_creole2rest(
+            rest_string="""
+                * `a <#a>`_
+
+                    * `b <#b>`_
+
+                =
+                a
+                =
+
+                -
+                b
+                -
+            """,
+            creole_string="""
+                <<toc>>
+                <</toc>>
+                = a
+                == b
+            """,
+        )
+
+    def test_unknown_emit(self):
+        self.assertRaises(NotImplementedError,
+            creole2rest, "A ^^sup^^ text.", unknown_emit=raise_unknown_node
+        )
+        self.assert_creole2rest(
+            rest_string="""
+                A &lt;sup&gt;sup&lt;/sup&gt; text.
+            """,
+            creole_string="""
+                A ^^sup^^ text.
+            """,
+            unknown_emit=escape_unknown_nodes,
+        )
+        self.assert_creole2rest(
+            rest_string="""
+                A sup text.
+            """,
+            creole_string="""
+                A ^^sup^^ text.
+            """,
+            unknown_emit=transparent_unknown_nodes,
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
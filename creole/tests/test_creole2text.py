@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+    creole2text unittest
+    ~~~~~~~~~~~~~~~~~~~~
+
+    Check the plain text extraction from creole markup.
+
+    :copyleft: 2015 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import types
+import unittest
+
+from creole import creole2text, iter_creole2text
+from creole.parser.creol2html_parser import CreoleParser
+from creole.parser.creol2text_parser import CreoleTextParser
+from creole.tests.utils.base_unittest import BaseCreoleTest
+
+
+class Creole2textTests(BaseCreoleTest):
+    def assert_creole2text(self, text_string, creole_string, **kwargs):
+        text_string = self._prepare_text(text_string)
+        creole_string = self._prepare_text(creole_string)
+        self.assertEqual(creole2text(creole_string, **kwargs), text_string)
+
+    def test_typeface_and_links(self):
+        self.assert_creole2text(
+            text_string="""
+                This is bold and italic, a link, a http://domain.tld url
+                and a image.
+            """,
+            creole_string="""
+                This is **bold** and //italic//, a [[/url/|link]], a http://domain.tld url
+                and a {{/image.png|image}}.
+            """,
+        )
+
+    def test_blocks(self):
+        self.assert_creole2text(
+            text_string="""
+                Headline
+
+                first block
+
+                item 1
+                item 1.1
+                item 2
+
+                second block
+            """,
+            creole_string="""
+                = Headline =
+                first block
+                ----
+                * item 1
+                ** item 1.1
+                * item 2
+
+                second block
+            """,
+        )
+
+    def test_table(self):
+        self.assertEqual(
+            creole2text("|= head 1 |= head 2 |\n| cell 1 | **cell 2** |"),
+            "head 1\thead 2\ncell 1\tcell 2"
+        )
+
+    def test_pre_and_macros(self):
+        creole_string = self._prepare_text("""
+            {{{
+            **no bold**
+            ~}}}
+            }}}
+            A <<html>><b>macro</b><</html>> text.
+            <<code>>
+            print("creole")
+            <</code>>
+        """)
+        self.assertEqual(
+            creole2text(creole_string),
+            '**no bold**\n}}}\n\nA  text.'
+        )
+        self.assertEqual(
+            creole2text(creole_string, include_pre=False, include_macros=True),
+            'A <b>macro</b> text.\n\nprint("creole")'
+        )
+
+    def test_iter_creole2text(self):
+        blocks = iter_creole2text("= one\n\ntwo\n\n----\n\n{{{\nthree\n}}}")
+        self.assertTrue(isinstance(blocks, types.GeneratorType))
+        self.assertEqual(list(blocks), ["one", "two", "three"])
+
+    def test_stream_blocks(self):
+        # The blocks are yielded while the markup is matched
+        matched = []
+        class BlockRe(object):
+            groupindex = CreoleParser.compile_block_rules().groupindex
+            def finditer(self, text):
+                for match in CreoleParser.compile_block_rules().finditer(text):
+                    matched.append(match.lastgroup)
+                    yield match
+
+        blocks = CreoleTextParser("= one\n\ntwo\n\nthree", block_re=BlockRe()).iter_blocks()
+        self.assertEqual(next(blocks), "one")
+        self.assertEqual(matched, ["head"])
+        self.assertEqual(list(blocks), ["two", "three"])
+
+    def test_shared_block_rules(self):
+        parser = CreoleTextParser("text")
+        self.assertTrue(parser.block_re is CreoleParser("text").block_re)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+    creole2textile unittest
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    Check the direct creole -> textile conversion without the html round
+    trip. The result must be the same as creole2html -> html2textile.
+
+    :copyleft: 2015 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import unittest
+
+from creole.tests.utils.base_unittest import BaseCreoleTest
+
+
+class Creole2textileTests(BaseCreoleTest):
+    def test_typeface(self):
+        self.assert_creole2textile(
+            textile_string="""
+                This is *bold*, __italic__ and ^superscript^!
+            """,
+            creole_string="""
+                This is **bold**, //italic// and ^^superscript^^!
+            """,
+        )
+
+    def test_headlines_and_paragraphs(self):
+        self.assert_creole2textile(
+            textile_string="""
+                h1. headline
+
+                first block, line 1
+                line 2
+
+                second block
+            """,
+            creole_string="""
+                = headline
+
+                first block, line 1
+                line 2
+
+                second block
+            """,
+        )
+
+    def test_links_and_images(self):
+        self.assert_creole2textile(
+            textile_string="""
+                A "link":http://domain.tld and a !/path/to/image.png(image)! image.
+            """,
+            creole_string="""
+                A [[http://domain.tld|link]] and a {{/path/to/image.png|image}} image.
+            """,
+        )
+
+    def test_lists(self):
+        self.assert_creole2textile(
+            textile_string="""
+                * item 1
+                ** item 1.1
+                * item 2
+
+                # one
+                # two
+            """,
+            creole_string="""
+                * item 1
+                ** item 1.1
+                * item 2
+
+                # one
+                # two
+            """,
+        )
+
+    def test_table_and_pre_block(self):
+        self.assert_creole2textile(
+            textile_string="""
+                |_. head 1|_. head 2|
+                |cell 1|cell 2|
+                <pre>
+                a <pre> block
+                </pre>
+            """,
+            creole_string="""
+                |= head 1 |= head 2 |
+                | cell 1  | cell 2  |
+
+                {{{
+                a <pre> block
+                }}}
+            """,
+        )
+
+    def test_toc_block_macro(self):
+        self.assert_creole2textile(
+            textile_string="""
+                * "a":#a
+
+                h1. a
+            """,
+            creole_string="""
+                <<toc>>
+                <</toc>>
+                = a
+            """,
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+    ElementTree unittest
+    ~~~~~~~~~~~~~~~~~~~~
+
+    A ElementTree element must be converted like its html code.
+
+    :copyleft: 2015 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import codecs
+import os
+import unittest
+import warnings
+import xml.etree.ElementTree as ET
+
+import creole
+from creole import (
+    Converter, creole2etree, creole2html, html2creole, html2rest, parse_etree
+)
+from creole.tests.utils.base_unittest import BaseCreoleTest
+
+try:
+    import lxml.etree
+    import lxml.html
+except ImportError:
+    lxml = None
+
+
+README = os.path.join(os.path.dirname(creole.__file__), "..", "README.creole")
+
+
+def read_readme():
+    with codecs.open(README, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class EtreeParserTests(BaseCreoleTest):
+    def assert_etree(self, html, html2markup=html2creole):
+        # The <div> root is skipped, so only the content is converted
+        element = ET.fromstring("<div>%s</div>" % html)
+        self.assertEqual(html2markup(element), html2markup(html))
+
+    def test_readme(self):
+        html = creole2html(read_readme())
+        self.assert_etree(html)
+        self.assert_etree(html, html2rest)
+
+    def test_pre(self):
+        self.assert_etree("<p>text</p>\n<pre>\none\n  <b>two</b>\n</pre>\n<p>text</p>")
+        self.assert_etree("<p>inline <pre>pre</pre> text</p>")
+
+    def test_toc_headlines(self):
+        self.assert_etree(creole2html("<<toc>>\n= A\n== B\ntext\n== C"))
+        self.assert_etree(creole2html("<<toc>>\n= A\n\ntext"), html2rest)
+
+    def test_inline_around_block(self):
+        self.assert_etree('<a href="/x"><div>text</div></a>')
+        self.assert_etree('<a href="/page"><h2>Title</h2></a>\n<p>text</p>')
+        self.assert_etree("<b><p>bold para</p></b>")
+        self.assert_etree('<a href="/x"><div><p>a</p><p>b</p></div></a>', html2rest)
+
+    def test_html2creole(self):
+        # The element is used like its html code
+        html = '<ul><li>a <a href="/url/">link</a></li><li>b</li></ul>'
+        self.assertEqual(html2creole(ET.fromstring(html)), html2creole(html))
+        self.assertEqual(html2rest(ET.fromstring(html)), html2rest(html))
+
+    def test_include_root(self):
+        element = ET.fromstring("<body><p>a <strong>b</strong></p></body>")
+        document = parse_etree(element, include_root=False)
+        self.assertEqual([node.kind for node in document.children], ["p"])
+
+        element = ET.fromstring("<div><h1>A</h1><h2>B</h2></div>")
+        self.assertEqual(html2creole(element), "= A\n\n== B")
+        self.assertEqual(html2creole(element, include_root=True),
+            html2creole("<div><h1>A</h1><h2>B</h2></div>")
+        )
+        self.assertEqual(Converter().html2rest(element, include_root=True),
+            html2rest(element, include_root=True)
+        )
+
+        # A <div> with attributes is not only a container
+        element = ET.fromstring('<div class="box"><h1>A</h1><h2>B</h2></div>')
+        self.assertEqual(html2creole(element),
+            html2creole('<div class="box"><h1>A</h1><h2>B</h2></div>')
+        )
+
+    def test_converter(self):
+        element = ET.fromstring("<div><p>This is <strong>creole</strong>!</p></div>")
+        self.assertEqual(Converter().html2creole(element), "This is **creole**!")
+
+    def test_lxml(self):
+        if lxml is None:
+            warnings.warn("Skip test, because 'lxml' is not installed.")
+            return
+
+        html = creole2html(read_readme())
+        element = lxml.html.fromstring("<div>%s</div>" % html)
+        self.assertEqual(html2creole(element), html2creole(html))
+
+
+class EtreeEmitterTests(BaseCreoleTest):
+    def assert_round_trip(self, markup, etree=None):
+        root = creole2etree(markup, etree=etree)
+        self.assertEqual(html2creole(root), html2creole(creole2html(markup)))
+        self.assertEqual(html2rest(root), html2rest(creole2html(markup)))
+
+    def test_readme(self):
+        self.assert_round_trip(read_readme())
+
+    def test_headlines(self):
+        self.assert_round_trip("= A\n== B")
+        root = Converter().creole2etree("= A\n== B", root_tag="body")
+        self.assertEqual(Converter().html2creole(root), "= A\n\n== B")
+
+    def test_html(self):
+        root = creole2etree("= Head\n\n{{{\n<pre>\n}}}\n\n[[/url/|a link]]")
+        self.assertEqual(
+            ET.tostring(root).decode("ascii"),
+            '<div><h1>Head</h1>\n<pre>\n&lt;pre&gt;\n</pre>\n'
+            '<p><a href="/url/">a link</a></p></div>'
+        )
+
+    def test_unknown_entity(self):
+        # A unknown entity in a <pre> is kept as text, like in creole2html
+        root = creole2etree("<<html>><pre>&foo; &lt;</pre><</html>>",
+            macros={"html": lambda text: text}
+        )
+        self.assertEqual(root.find("pre").text, "&foo; <")
+
+    def test_root_tag(self):
+        root = Converter().creole2etree("text", root_tag="body")
+        self.assertEqual(root.tag, "body")
+
+    def test_lxml(self):
+        if lxml is None:
+            warnings.warn("Skip test, because 'lxml' is not installed.")
+            return
+
+        self.assert_round_trip(read_readme(), etree=lxml.etree)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -80,6 +80,20 @@ class TextileTests(BaseCreoleTest):
             """,
         )
 
+    def test_anchor_without_href(self):
+        # e.g. the anchors in the headlines of a creole2html <<toc>> page
+        self.assert_html2textile(
+            textile_string="""
+                h1. A
+
+                text
+            """,
+            html_string="""
+                <a name="A"><h1>A</h1></a>
+                <p>text</p>
+            """,
+        )
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+    html parser unittest
+    ~~~~~~~~~~~~~~~~~~~~
+
+    The html tokenizer backends must build the same document tree.
+
+    :copyleft: 2015 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import codecs
+import os
+import unittest
+import warnings
+
+import creole
+from creole import Converter, creole2html, html2creole, html2rest
+from creole.parser.html_parser import HtmlParser
+from creole.shared.html_parser import TOKENIZERS
+from creole.tests.utils.base_unittest import BaseCreoleTest
+
+
+README = os.path.join(os.path.dirname(creole.__file__), "..", "README.creole")
+
+
+class HtmlParserTests(BaseCreoleTest):
+    def assert_children(self, html, expected, **kwargs):
+        root = HtmlParser(**kwargs).feed(html)
+        self.assertEqual(
+            [(node.kind, node.content) for node in root.children[0].children],
+            expected
+        )
+
+    def test_coalesced_data(self):
+        self.assert_children('<a href="/url/">Search & Destroy</a>', [
+            ("data", "Search & Destroy"),
+        ])
+        self.assert_children("<p>a &amp; b</p>", [
+            ("data", "a "), ("entityref", "amp"), ("data", " b"),
+        ], keep_entities=True)
+
+    def test_entities(self):
+        self.assert_children("<p>a&nbsp;&lt;&#x41;&#X42;&#67;&auml;&foo;<br />b&#1114112;</p>", [
+            ("data", "a <ABC\xe4&foo"), ("br", None), ("data", "b&#1114112;"),
+        ])
+
+    def test_convert_charrefs(self):
+        self.assert_children("<p>a &amp; &#98;&#x63;</p>", [
+            ("data", "a & bc"),
+        ], convert_charrefs=True)
+
+    def test_incomplete_charref(self):
+        # The text after a invalid charref was lost
+        self.assert_children("<p>a &#xzz; b</p>", [("data", "a &#xzz; b")])
+
+    def test_not_closed_tags(self):
+        # The </p> closes the <strong>, the not opened </em> is ignored
+        self.assert_children("<div><p><strong>a</em>b</p>c</div>", [
+            ("p", None), ("data", "c"),
+        ])
+        # <hr> and <img> without a end tag
+        self.assert_children("<div>a<hr>b<img src='/x.png'>c</div>", [
+            ("data", "a"), ("hr", None), ("data", "b"), ("img", None), ("data", "c"),
+        ])
+
+    def test_block_in_inline(self):
+        # The <h1> closes the empty <a>, it's reopened in the headline.
+        # The whitespace around the </a> is removed
+        html = '<div><a name="A"><h1>A</h1></a>\n<a name="B"><h2>B</h2></a>\n<p>c</p></div>'
+        self.assert_children(html, [
+            ("headline", None), ("headline", None), ("p", None),
+        ])
+        headline = HtmlParser().feed(html).children[0].children[0]
+        self.assertEqual([node.kind for node in headline.children], ["a"])
+        self.assertEqual(headline.children[0].attrs, {"name": "A"})
+
+    def test_entity_space_before_block(self):
+        # A <br /> is not a block and a &nbsp; is not whitespace
+        html = "<ul><li>a<ul><li><br />&nbsp;<ul><li>c</li></ul></li></ul></li></ul>"
+        self.assertEqual(html2rest(html), "* a\n\n    *  \n\n        * c")
+        self.assertTrue(
+            html2rest(html.replace("&nbsp;", "&#160;")).endswith("\n\n        * c")
+        )
+        self.assert_children("<div><p>a</p>&#32;<p>b</p></div>", [
+            ("p", None), ("data", " "), ("p", None),
+        ])
+
+    def test_inline_around_block(self):
+        # The inline elements are reopened inside of the block
+        self.assertEqual(html2creole('<a href="/x"><div>text</div></a>'), "[[/x|text]]")
+        self.assertEqual(html2creole('<a href="/page"><h2>Title</h2></a>'), "== [[/page|Title]]")
+        self.assertEqual(html2creole("<b><p>bold para</p></b>"), "**bold para**")
+        self.assertEqual(html2creole('<a href="/x"><div><p>a</p></div></a>'), "[[/x|a]]")
+        self.assertEqual(html2rest('<a href="/x"><div>text</div></a>'), "`text </x>`_")
+
+    def test_toc_headlines(self):
+        # creole2html puts the headlines into anchors for the <<toc>>
+        html = creole2html("<<toc>>\n= A\n== B\ntext\n== C")
+        self.assertEqual(html2creole(html),
+            "* [[#A|A]]\n** [[#B|B]]\n** [[#C|C]]\n\n"
+            "= A\n\n== B\n\ntext\n\n== C"
+        )
+        self.assertEqual(html2rest(html),
+            "* `A <#A>`_\n\n    * `B <#B>`_\n\n    * `C <#C>`_\n\n"
+            "=\nA\n=\n\n-\nB\n-\n\ntext\n\n-\nC\n-"
+        )
+
+    def test_list_level(self):
+        root = HtmlParser().feed("<ul><li>a<ol><li>b</li></ol></li></ul><ul><li>c</li></ul>")
+        ul1, ul2 = root.children
+        ol = ul1.children[0].children[1]
+        self.assertEqual(
+            [ul1.level, ul1.children[0].level, ol.level, ol.children[0].level, ul2.level],
+            [1, 1, 2, 2, 1]
+        )
+
+    def test_unknown_tokenizer(self):
+        self.assertRaises(ValueError, HtmlParser, tokenizer="foo")
+
+    def test_lxml(self):
+        if "lxml" not in TOKENIZERS:
+            warnings.warn("Skip test, because 'lxml' is not installed.")
+            return
+
+        with codecs.open(README, "r", encoding="utf-8") as f:
+            html = creole2html(f.read())
+        self.assertEqual(
+            Converter(html_tokenizer="lxml").html2creole(html), html2creole(html)
+        )
+        self.assert_children("<p>a &amp; b<br>c</p>", [
+            ("data", "a & b"), ("br", None), ("data", "c"),
+        ], tokenizer="lxml")
+
+
+if __name__ == '__main__':
+    unittest.main()
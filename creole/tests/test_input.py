@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+    input file unittest
+    ~~~~~~~~~~~~~~~~~~~
+
+    The *_file() functions must read the files like codecs.open() with
+    normalized line endings.
+
+    :copyleft: 2015 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import codecs
+import io
+import os
+import tempfile
+import unittest
+
+import creole
+from creole import creole2html, html2creole, html2rest, html2textile, \
+    creole2html_file, html2creole_file, html2rest_file, html2textile_file
+from creole.shared.input_reader import iter_file_chunks, read_text_file
+from creole.tests.utils.base_unittest import BaseCreoleTest
+
+
+README = os.path.join(os.path.dirname(creole.__file__), "..", "README.creole")
+
+
+class InputTests(BaseCreoleTest):
+    def setUp(self):
+        self.filenames = []
+
+    def tearDown(self):
+        for filename in self.filenames:
+            os.remove(filename)
+
+    def create_file(self, content):
+        f = tempfile.NamedTemporaryFile(delete=False)
+        f.write(content)
+        f.close()
+        self.filenames.append(f.name)
+        return f.name
+
+    def test_read_text_file(self):
+        for text in ("\xe4€\r\n\r\n\r\ra\rb\nc\r\n\r", "\xe4€\n\na\n"):
+            for encoding in ("utf-8", "utf-16", "latin-1", "utf-8-sig"):
+                try:
+                    content = text.encode(encoding)
+                except UnicodeEncodeError:
+                    content = text.replace("€", "E").encode(encoding)
+                filename = self.create_file(content)
+                expected = codecs.open(filename, "r", encoding=encoding).read()
+                expected = expected.replace("\r\n", "\n").replace("\r", "\n")
+                # Multi byte characters and \r\n split between the chunks:
+                for chunk_size in (1, 2, 3, 5, 1024):
+                    self.assertEqual(
+                        read_text_file(filename, encoding, chunk_size=chunk_size), expected
+                    )
+
+    def test_empty_file(self):
+        self.assertEqual(read_text_file(self.create_file(b"")), "")
+
+    def test_not_mapped(self):
+        f = io.BytesIO(b"one two")
+        self.assertEqual(list(iter_file_chunks(f, chunk_size=4)), [b"one ", b"two"])
+
+    def test_file_functions(self):
+        with codecs.open(README, "r", encoding="utf-8") as f:
+            markup = f.read()
+        html = creole2html(markup)
+
+        filename = self.create_file(markup.replace("\n", "\r\n").encode("utf-8"))
+        self.assertEqual(creole2html_file(filename), html)
+
+        filename = self.create_file(html.encode("utf-16"))
+        self.assertEqual(html2creole_file(filename, "utf-16"), html2creole(html))
+        self.assertEqual(html2rest_file(filename, "utf-16"), html2rest(html))
+        self.assertEqual(html2textile_file(filename, "utf-16"), html2textile(html))
+
+        out = io.BytesIO()
+        creole2html_file(filename=self.create_file(b"**bold**"), out=out, encoding="utf-8")
+        self.assertEqual(out.getvalue(), b"<p><strong>bold</strong></p>")
+
+
+if __name__ == '__main__':
+    unittest.main()
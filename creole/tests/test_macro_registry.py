@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+    macro registry unittest
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    Check the lazy import of macros.
+
+    :copyleft: 2015 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import os
+import sys
+import unittest
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO # python 3
+
+import creole
+from creole import creole2html
+from creole.shared.macro_registry import MacroRegistry
+from creole.tests import test_macros
+from creole.tests.utils.base_unittest import BaseCreoleTest
+from creole.tests.utils.unittest_subprocess import SubprocessMixin
+
+
+class MacroRegistryTests(BaseCreoleTest, SubprocessMixin):
+    def test_lazy_import(self):
+        macros = MacroRegistry(
+            test="creole.tests.test_macros:unittest_macro2",
+            html="creole.shared.example_macros:html",
+            callable=test_macros.unittest_macro1,
+        )
+        html = creole2html(
+            "a <<test char='|'>>b c<</test>> <<callable>><</callable>>",
+            macros=macros
+        )
+        self.assertEqual(html, "<p>a b|c [test macro1 - kwargs: text=\"\"]</p>")
+        self.assertEqual(list(macros.load_times.keys()), ["test"])
+        self.assertTrue(macros["test"] is test_macros.unittest_macro2)
+        # The registry entries are not changed
+        self.assertEqual(dict(macros)["test"], "creole.tests.test_macros:unittest_macro2")
+
+    def test_load_error(self):
+        # A broken import path is not reported as a missing macro
+        macros = MacroRegistry(
+            missing_module="creole.not_exists:macro",
+            missing_func="creole.shared.example_macros:not_exists",
+        )
+        my_stderr = StringIO()
+        html = creole2html(
+            "<<missing_module>><</missing_module>>\n"
+            "<<missing_func>><</missing_func>>\n"
+            "<<unknown>><</unknown>>",
+            macros=macros, verbose=2, stderr=my_stderr,
+        )
+        lines = html.splitlines()
+        self.assertEqual(len(lines), 3, html)
+        self.assertTrue(lines[0].startswith(
+            "[Error: Can't load macro 'missing_module' from 'creole.not_exists:macro': "
+        ), lines[0])
+        self.assertTrue(lines[1].startswith(
+            "[Error: Can't load macro 'missing_func' from 'creole.shared.example_macros:not_exists': "
+        ), lines[1])
+        self.assertEqual(lines[2], "[Error: Macro 'unknown' doesn't exist]")
+        self.assertEqual(macros.load_times, {})
+
+        # The traceback of the import error is written to stderr
+        self.assertIn("No module named", my_stderr.getvalue())
+        self.assertIn("AttributeError", my_stderr.getvalue())
+
+    def test_entry_points(self):
+        macros = MacroRegistry.from_entry_points("creole.tests.not_exists")
+        self.assertEqual(macros, {})
+
+    def test_toc(self):
+        macros = MacroRegistry()
+        html = creole2html("<<toc>>\n= headline", macros=macros)
+        self.assertIn('<li><a href="#headline">headline</a></li>', html)
+
+    def test_pygments_not_imported(self):
+        # pygments and the highlight caches are created only for a <<code>> macro
+        code = (
+            "import sys;"
+            "sys.path.insert(0, %r);"
+            "from creole import creole2html;"
+            "from creole.shared import utils;"
+            "from creole.shared.macro_registry import MacroRegistry;"
+            "macros = MacroRegistry(code='creole.shared.example_macros:code');"
+            "creole2html(u'= a\\n\\n**b** {{{c}}}', macros=macros);"
+            "sys.stdout.write(str(('pygments' in sys.modules, utils.highlight_cache)))"
+        ) % os.path.dirname(os.path.dirname(os.path.abspath(creole.__file__)))
+        popen_args, retcode, stdout = self.subprocess(
+            popen_args=[sys.executable, "-c", code], verbose=False
+        )
+        self.assertEqual(retcode, 0, stdout)
+        self.assertEqual(stdout, "(False, None)")
+
+
+if __name__ == '__main__':
+    unittest.main()
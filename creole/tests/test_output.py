@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+    output file unittest
+    ~~~~~~~~~~~~~~~~~~~~
+
+    The conversions with out=file must write the same as the returned
+    strings.
+
+    :copyleft: 2015 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import codecs
+import io
+import os
+import unittest
+
+import creole
+from creole import creole2html, html2creole, html2rest, html2textile
+from creole.shared.output_writer import OutputWriter
+from creole.tests.utils.base_unittest import BaseCreoleTest
+
+
+README = os.path.join(os.path.dirname(creole.__file__), "..", "README.creole")
+
+
+class OutputTests(BaseCreoleTest):
+    def setUp(self):
+        with codecs.open(README, "r", encoding="utf-8") as f:
+            self.markup = f.read()
+        self.html = creole2html(self.markup)
+
+    def assert_out(self, func, text, **kwargs):
+        expected = func(text, **kwargs)
+
+        out = io.StringIO()
+        self.assertEqual(func(text, out=out, **kwargs), None)
+        self.assertEqual(out.getvalue(), expected)
+
+        for encoding in ("utf-8", "utf-16"):
+            out = io.BytesIO()
+            func(text, out=out, encoding=encoding, **kwargs)
+            self.assertEqual(out.getvalue(), expected.encode(encoding))
+
+    def test_creole2html(self):
+        self.assert_out(creole2html, self.markup)
+        self.assert_out(creole2html, "\n\n<<toc>>\n= Headline\n\n", compact=True)
+        self.assert_out(creole2html, "")
+
+    def test_html2creole(self):
+        self.assert_out(html2creole, self.html)
+
+    def test_html2rest(self):
+        self.assert_out(html2rest, self.html)
+        # The substitution definitions are added after the blocks
+        self.assert_out(html2rest, '<p><img src="/a.png" /> and <a href="/url/">link</a></p>')
+
+    def test_html2textile(self):
+        self.assert_out(html2textile, self.html)
+
+    def test_buffer_size(self):
+        out = io.StringIO()
+        writer = OutputWriter(out, buffer_size=5)
+        for fragment in (" \n", "<p>", "one two", "</p>", "\n\n", "\n", "<p>3</p>", " \n "):
+            writer.write(fragment)
+            # The buffer is written, if it's longer than buffer_size:
+            self.assertTrue(len("".join(writer.buffer)) <= 5)
+        writer.close()
+        self.assertEqual(out.getvalue(), "<p>one two</p>\n\n\n<p>3</p>")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+    scan unittest
+    ~~~~~~~~~~~~~
+
+    Check the metadata scan of creole markup.
+
+    :copyleft: 2015 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import unittest
+
+from creole import scan
+from creole.tests.utils.base_unittest import BaseCreoleTest
+
+
+class ScanTests(BaseCreoleTest):
+    def test_scan(self):
+        result = scan(self._prepare_text("""
+            = Headline =
+            A [[/url/|**link**]], a http://domain.tld and a ~http://escaped.tld url.
+            === Level 3
+            * a [[http://domain.tld|{{/image.png|image}}]] in a list
+            |= head | [[/cell/]] |
+            <<code ext=".py">>
+            print("[[no link]]")
+            <</code>>
+            {{{
+            [[no link]]
+            }}}
+            {{{[[no link]]}}} and <<html>>[[no link]]<</html>>
+            <<toc depth=2>>
+        """))
+        self.assertEqual(result["headlines"], [(1, "Headline"), (3, "Level 3")])
+        self.assertEqual(result["links"], [
+            "/url/", "http://domain.tld", "http://domain.tld", "/cell/"
+        ])
+        self.assertEqual(result["images"], ["/image.png"])
+        self.assertEqual(result["macros"], [
+            ("code", 'ext=".py"'), ("html", ""), ("toc", "depth=2")
+        ])
+
+    def test_empty(self):
+        self.assertEqual(scan("no markup"), {
+            "headlines": [], "links": [], "images": [], "macros": [],
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
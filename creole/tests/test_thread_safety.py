@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+    thread safety unittest
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Render documents with shared macros in many threads at the same time.
+
+    :copyleft: 2015 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import threading
+import unittest
+
+from creole import creole2html, Converter
+from creole.shared.macro_cache import cacheable
+from creole.shared.macro_registry import MacroRegistry
+from creole.tests.utils.base_unittest import BaseCreoleTest
+
+
+@cacheable
+def upper(text):
+    return text.upper()
+
+
+class ThreadSafetyTests(BaseCreoleTest):
+    def test_shared_macros(self):
+        macros = MacroRegistry(
+            upper=upper,
+            html="creole.shared.example_macros:html",
+            test="creole.tests.test_macros:unittest_macro1",
+        )
+        documents = []
+        for no in range(20):
+            documents.append(self._prepare_text("""
+                <<toc depth=%(no)i>>
+                = Document %(no)i
+                == Part %(no)i
+                A <<upper>>macro %(no)i<</upper>> and <<test no=%(no)i>><</test>>
+                <<html>><b>%(no)i</b><</html>>
+                === Sub part
+            """ % {"no": no % 4 + 1}))
+
+        entries = dict(macros)
+        expected = [creole2html(document, macros=macros) for document in documents]
+        self.assertEqual(dict(macros), entries) # nothing changed or added, e.g. the toc
+
+        converter = Converter(macros=macros)
+        errors = []
+        def render():
+            try:
+                for _ in range(10):
+                    for document, html in zip(documents, expected):
+                        for result in (
+                                creole2html(document, macros=macros),
+                                converter.render(document)
+                            ):
+                            if result != html:
+                                errors.append(result)
+            except Exception as err:
+                errors.append(err)
+
+        threads = [threading.Thread(target=render) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(dict(macros), entries)
+
+    def test_toc_not_shared(self):
+        macros = {}
+        html1 = creole2html("<<toc>>\n= one", macros=macros)
+        html2 = creole2html("<<toc>>\n= two", macros=macros)
+        self.assertEqual(html2, html1.replace("one", "two"))
+        self.assertEqual(macros, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,6 +13,7 @@ from __future__ import division, absolute_import, print_function, unicode_litera
 
 import unittest
 
+from creole.html_tools.deentity import Deentity
 from creole.tests.utils.utils import MarkupTest
 from creole.shared.markup_table import MarkupTable
 
@@ -96,6 +97,19 @@ class UtilsTests(MarkupTest):
             """
         )
 
+    def test_deentity(self):
+        d = Deentity()
+        text = "no entities & no change"
+        self.assertTrue(d.replace_all(text) is text)
+        self.assertEqual(d.replace_all("a&nbsp;&#x41;&#66;&auml;"), "a AB\xe4")
+        self.assertEqual(d.replace_all("&foo; &#99999999;"), "&foo; &#99999999;")
+
+        # The replace methods can be overwritten:
+        class UpperDeentity(Deentity):
+            def replace_named(self, text):
+                return text.upper()
+        self.assertEqual(UpperDeentity().replace_all("&lt;&#x41;"), "LTA")
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -33,7 +33,8 @@ else:
 
 
 from creole.exceptions import DocutilsImportError
-from creole import creole2html, html2creole, html2textile, html2rest
+from creole import creole2html, html2creole, html2textile, html2rest, creole2rest, \
+    creole2textile
 
 try:
     from creole.rest_tools.clean_writer import rest2html
@@ -246,6 +247,28 @@ class BaseCreoleTest(MarkupTest):
 
         return textile_string, html_string
 
+    def assert_creole2textile(self, textile_string, creole_string, \
+                        debug=False, **kwargs):
+        """
+        Check creole2textile and compare it with the html round trip:
+            creole2html -> html2textile
+        """
+        textile_string = self._prepare_text(textile_string)
+        creole_string = self._prepare_text(creole_string)
+
+        textile_string2 = creole2textile(creole_string, debug=debug, **kwargs)
+        if debug:
+            print("-" * 79)
+            print(textile_string2)
+            print("-" * 79)
+
+        self.assertEqual(textile_string2, textile_string, msg="creole2textile")
+
+        unknown_emit = kwargs.pop("unknown_emit", None)
+        html_string = creole2html(creole_string, **kwargs)
+        textile_string3 = html2textile(html_string, unknown_emit=unknown_emit)
+        self.assertEqual(textile_string2, textile_string3, msg="creole2html -> html2textile")
+
     def cross_compare_textile(self, textile_string, html_string, \
                         strip_lines=False, debug=False, parser_kwargs={}, emitter_kwargs={}):
         """
@@ -346,6 +369,28 @@ class BaseCreoleTest(MarkupTest):
             prepare_strings=False,
         )
 
+    def assert_creole2rest(self, rest_string, creole_string, \
+                        debug=False, **kwargs):
+        """
+        Check creole2rest and compare it with the html round trip:
+            creole2html -> html2rest
+        """
+        rest_string = self._prepare_text(rest_string)
+        creole_string = self._prepare_text(creole_string)
+
+        rest_string2 = creole2rest(creole_string, debug=debug, **kwargs)
+        if debug:
+            print("-" * 79)
+            print(rest_string2)
+            print("-" * 79)
+
+        self.assertEqual(rest_string2, rest_string, msg="creole2rest")
+
+        unknown_emit = kwargs.pop("unknown_emit", None)
+        html_string = creole2html(creole_string, **kwargs)
+        rest_string3 = html2rest(html_string, unknown_emit=unknown_emit)
+        self.assertEqual(rest_string2, rest_string3, msg="creole2html -> html2rest")
+
     def cross_compare(self,
             html_string,
             creole_string=None,